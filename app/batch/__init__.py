@@ -17,4 +17,5 @@
 from .exceptions import *
 from .batch_shared import get_basic_batch_context
 from .scope_overrun import get_batch_scope_overrun_data
-from .scope_increase import get_batch_scope_increase_data
+from .scope_increase import get_batch_scope_increase_data, get_batch_scope_increase_events, validate_scope_increase_params
+from .precompute import ReportKey, ReportStore, ReportScheduler, get_shared_store_dir, store_scope_increase_events
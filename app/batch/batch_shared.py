@@ -14,17 +14,23 @@
 # limitations under the License.
 
 
+import asyncio
 from datetime import date, timedelta
 from dataclasses import dataclass, field
+from itertools import chain
 from typing import Any, Callable
 
 from youtrack.entities import Version
+from youtrack.helper import YouTrackHelper
+from youtrack.utils.exceptions import TooMuchIssuesInBatchError
+from youtrack.utils.query import SearchQueryBuilder
 from youtrack.utils.duration import Duration
 from youtrack.utils.anomalies import Anomaly
 from youtrack.instance import YouTrackInstanceConfig
 
 from .exceptions import BadQueryError, BadDatesError
 from ..settings import Settings, AppSettings, ProjectSettings
+from ..utils.log import logger
 from ..utils.once import once
 
 
@@ -83,14 +89,28 @@ def get_basic_batch_context(translator, settings: Settings, sub_mode: str):
     }
 
 
-def validate_input_params(yt_config: YouTrackInstanceConfig, project: str, components: list[str]):
-    if project not in yt_config.projects.keys():
+def validate_input_params(yt_config: YouTrackInstanceConfig, projects: list[str], components: list[str]) -> dict[str, list[str]]:
+    """Компоненты по каждому проекту. Каждый выбранный компонент должен быть хотя бы в одном проекте,
+    а у каждого проекта (если компоненты выбраны) — хотя бы один выбранный компонент"""
+    if not projects:
         raise BadQueryError(query_params=['project'])
+    unknown_projects = [i for i in projects if i not in yt_config.projects.keys()]
+    if len(unknown_projects):
+        raise BadQueryError(query_params=unknown_projects)
 
-    unknown_components = set(components) - set(yt_config.projects[project].components)
+    known_components = set(chain.from_iterable(yt_config.projects[i].components for i in projects))
+    unknown_components = set(components) - known_components
     if len(unknown_components):
         raise BadQueryError(query_params=list(unknown_components))
 
+    ret: dict[str, list[str]] = {}
+    for project in dict.fromkeys(projects):  # без повторов, порядок как в запросе
+        project_components = [i for i in components if i in yt_config.projects[project].components]
+        if components and not project_components:
+            raise BadQueryError(query_params=[project])
+        ret[project] = project_components
+    return ret
+
 
 def validate_dates(begin: str, end: str) -> tuple[date, date]:
     try:
@@ -117,6 +137,73 @@ def get_required_issue_fields() -> list[str]:
     ]
 
 
+@dataclass
+class ProjectSlice:
+    """Задачи одного проекта из batch-выборки"""
+    project: str
+    query: str
+    query_url: str
+    issues: list[JSON]
+
+
+@dataclass
+class BatchSelection:
+    helper: YouTrackHelper
+    slices: list[ProjectSlice]
+    query: str  # общий запрос по всем проектам, для ссылки в YouTrack
+    query_url: str
+
+    @property
+    def issues(self) -> list[JSON]:
+        return list(chain.from_iterable(i.issues for i in self.slices))
+
+
+async def fetch_batch_selection(settings: Settings, projects: list[str], components: list[str], begin: str, end: str) -> BatchSelection:
+    """Решённые за период задачи с затраченным временем, по каждому проекту — отдельным запросом.
+
+    Проекты запрашиваются параллельно, выборка каждого кэшируется отдельно:
+    пересекающиеся по проектам отчёты переиспользуют уже полученное.
+    Больше `YouTrackHelper.MAX_ISSUE_COUNT` задач суммарно по всем проектам — `TooMuchIssuesInBatchError`."""
+    components_by_project = validate_input_params(yt_config=settings.yt_config,
+                                                  projects=projects,
+                                                  components=components)
+    begin_date, end_date = validate_dates(begin=begin, end=end)
+
+    helper = YouTrackHelper(instance_url=settings.app_config.host,
+                            api_key=settings.app_config.api_key)
+    builders = [SearchQueryBuilder(project=project,
+                                   components=project_components,
+                                   resolve_date_begin=begin_date,
+                                   resolve_date_end=end_date,
+                                   only_started=True) for project, project_components in components_by_project.items()]
+
+    async def fetch_slice(builder: SearchQueryBuilder) -> ProjectSlice:
+        query = builder.Build()
+
+        async def fetch() -> list[JSON]:
+            return list(await helper.get_raw_issues_by_query(query=query, fields=get_required_issue_fields()))
+
+        issues = await settings.batch_cache.get(key=(settings.app_config.host, query),
+                                                factory=fetch,
+                                                ttl_sec=settings.app_config.batch_cache_ttl)
+        return ProjectSlice(project=builder.project,
+                            query=query,
+                            query_url=str(helper.get_issues_search_url(query)),
+                            issues=issues)
+
+    slices = await asyncio.gather(*[fetch_slice(i) for i in builders])
+    query = SearchQueryBuilder.BuildAny(builders)
+    # Ограничение каждого запроса не ограничивает выборку по нескольким проектам
+    total_issue_count = sum(len(i.issues) for i in slices)
+    if total_issue_count > YouTrackHelper.MAX_ISSUE_COUNT:
+        logger.error(f'Tried to get more than {YouTrackHelper.MAX_ISSUE_COUNT} issues ({total_issue_count}) with query: {query}')
+        raise TooMuchIssuesInBatchError(count=total_issue_count)
+    return BatchSelection(helper=helper,
+                          slices=list(slices),
+                          query=query,
+                          query_url=str(helper.get_issues_search_url(query)))
+
+
 @dataclass
 class BatchShortIssueInfo:
     scope: Duration|None = None
@@ -201,8 +288,3 @@ def batch_output_transformer(parsed: BatchShortIssueInfo, raw: JSON) -> JSON:
                   'bg_color': i['color']['background'],
                   'fg_color': i['color']['foreground']} for i in raw['tags']]
     }
-
-
-def batched(seq, n):
-    for i in range(0, len(seq), n):
-        yield seq[i:i + n]
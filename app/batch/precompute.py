@@ -0,0 +1,327 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import hashlib
+import json
+import os
+import time as time_module
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import asdict, dataclass, replace
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from youtrack.utils.others import get_private_runtime_dir
+from youtrack.utils.timestamp import Timestamp
+
+from ..settings import Settings
+from ..utils.log import logger
+from ..utils.metrics import metrics
+from .batch_shared import JSON, _get_predefined_date_presets, _get_date_presets
+from .scope_overrun import get_batch_scope_overrun_data
+from .scope_increase import get_batch_scope_increase_reports
+
+
+PRECOMPUTED_MODES = ('scope-overrun', 'scope-increase')
+
+_precomputed_reports = metrics.gauge('batch_precomputed_reports', 'Precomputed batch reports in the store')
+_precompute_failures = metrics.counter('batch_precompute_failures_total', 'Batch reports that failed to precompute')
+_precompute_duration = metrics.gauge('batch_precompute_duration_seconds', 'Duration of the last precompute run')
+
+
+@dataclass(frozen=True)
+class ReportKey:
+    """Параметры batch-отчёта, по которым он ищется в хранилище"""
+    mode: str
+    lang: str
+    projects: tuple[str, ...]
+    components: tuple[str, ...]
+    begin: str
+    end: str
+
+    @staticmethod
+    def from_request(mode: str,
+                     lang: str,
+                     projects: Iterable[str],
+                     components: Iterable[str],
+                     begin: str|None,
+                     end: str|None) -> 'ReportKey':
+        # Порядок компонентов на отчёт не влияет, порядок проектов — влияет на порядок подытогов
+        return ReportKey(mode=mode,
+                         lang=lang,
+                         projects=tuple(dict.fromkeys(projects)),
+                         components=tuple(sorted(set(components))),
+                         begin=begin or '',
+                         end=end or '')
+
+    @staticmethod
+    def from_dict(value: JSON) -> 'ReportKey':
+        return ReportKey(**value | {'projects': tuple(value['projects']), 'components': tuple(value['components'])})
+
+    @property
+    def file_name(self) -> str:
+        return hashlib.sha256(repr(self).encode()).hexdigest()[:32] + '.json'
+
+
+@dataclass
+class StoredReport:
+    data: JSON
+    computed_at: Timestamp
+
+
+def get_shared_store_dir(key: str) -> Path:
+    """Каталог хранилища для ключа (например, хост YouTrack): один и тот же у всех процессов пользователя на машине"""
+    return get_private_runtime_dir() / f'reports-{hashlib.sha256(key.encode()).hexdigest()[:16]}'
+
+
+class ReportStore:
+    """Предрассчитанные отчёты. Хранятся только отчёты из текущего плана (проект × пресет дат)
+
+    С `directory` план и отчёты лежат в файлах (JSON) и общие для всех процессов с этим каталогом:
+    считает отчёты один процесс, а отдают все. В памяти - только уже прочитанные, пока файл не изменился.
+    """
+
+    PLAN_FILE = 'plan.json'
+
+    def __init__(self, directory: Path|None = None):
+        self.directory = directory
+        self.__planned: set[ReportKey] = set()
+        self.__plan_version: int|None = None  # st_mtime_ns файла плана
+        self.__reports: dict[ReportKey, tuple[int|None, StoredReport]] = {}  # + st_mtime_ns файла отчёта
+        if directory is not None:
+            directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        self.__sync_plan()
+        if self.directory is None:
+            return len(self.__reports)
+        return sum((self.directory / i.file_name).exists() for i in self.__planned)
+
+    def plan(self, keys: Iterable[ReportKey]) -> None:
+        """Новый план: отчёты, которые в него не попали (например, «за неделю» до сегодняшнего дня), удаляются"""
+        self.__planned = set(keys)
+        self.__reports = {k: v for k, v in self.__reports.items() if k in self.__planned}
+        if self.directory is not None:
+            self.__write(self.PLAN_FILE, [asdict(i) for i in self.__planned])
+            planned_files = {i.file_name for i in self.__planned} | {self.PLAN_FILE}
+            for i in self.directory.glob('*.json'):
+                if i.name not in planned_files:
+                    i.unlink(missing_ok=True)
+        _precomputed_reports.set(len(self))
+
+    def is_planned(self, key: ReportKey) -> bool:
+        self.__sync_plan()
+        return key in self.__planned
+
+    def get(self, key: ReportKey) -> StoredReport|None:
+        if not self.is_planned(key):
+            return None
+        if self.directory is None:
+            return self.__reports[key][1] if key in self.__reports else None
+        try:
+            version = (self.directory / key.file_name).stat().st_mtime_ns
+            if key in self.__reports and self.__reports[key][0] == version:
+                return self.__reports[key][1]
+            stored = json.loads((self.directory / key.file_name).read_bytes())
+        except FileNotFoundError:
+            return None
+        report = StoredReport(data=stored['data'], computed_at=Timestamp.from_yt(stored['computed_at']))
+        self.__reports[key] = (version, report)
+        return report
+
+    def put(self, key: ReportKey, data: JSON) -> None:
+        if not self.is_planned(key):
+            return
+        report = StoredReport(data=data, computed_at=Timestamp.now())
+        if self.directory is None:
+            self.__reports[key] = (None, report)
+        else:
+            self.__write(key.file_name, {'data': data, 'computed_at': report.computed_at.to_yt()})
+        _precomputed_reports.set(len(self))
+
+    def __sync_plan(self) -> None:
+        """План мог обновить другой процесс"""
+        if self.directory is None:
+            return
+        try:
+            version = (self.directory / self.PLAN_FILE).stat().st_mtime_ns
+            if version == self.__plan_version:
+                return
+            self.__planned = {ReportKey.from_dict(i) for i in json.loads((self.directory / self.PLAN_FILE).read_bytes())}
+        except FileNotFoundError:
+            version, self.__planned = None, set()
+        self.__plan_version = version
+
+    def __write(self, name: str, value: JSON) -> None:
+        """Атомарно: читатели видят либо старый файл, либо новый целиком"""
+        tmp = self.directory / f'.{name}.{os.getpid()}.tmp'
+        tmp.write_text(json.dumps(value, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.directory / name)
+
+
+def get_precompute_plan(settings: Settings, langs: Iterable[str]) -> list[ReportKey]:
+    """Отчёты по каждому проекту (все компоненты) для каждого пресета дат"""
+    presets = {(i.begin, i.end) for i in _get_predefined_date_presets(translator=lambda text: text)}
+    presets |= {(i['begin'], i['end']) for i in _get_date_presets(settings=settings)}
+    ret: list[ReportKey] = []
+    for lang in langs:
+        for mode in PRECOMPUTED_MODES:
+            for project in settings.yt_config.projects.values():
+                for begin, end in sorted(presets):
+                    ret.append(ReportKey.from_request(mode=mode,
+                                                      lang=lang,
+                                                      projects=[project.short_name],
+                                                      components=project.components,
+                                                      begin=begin,
+                                                      end=end))
+    return ret
+
+
+async def compute_reports(translators: list, settings: Settings, key: ReportKey) -> list[JSON]:
+    """Отчёт `key` (кроме языка) на каждом из языков `translators`: данные из YouTrack загружаются один раз"""
+    params = dict(settings=settings,
+                  projects=list(key.projects),
+                  components=list(key.components),
+                  begin=key.begin,
+                  end=key.end)
+    if key.mode == 'scope-overrun':
+        # Данные отчёта от языка не зависят, переводится только шаблон
+        data = await get_batch_scope_overrun_data(translator=translators[0], **params)
+        return [data] * len(translators)
+    if key.mode == 'scope-increase':
+        return await get_batch_scope_increase_reports(translators=translators, **params)
+    raise ValueError(f'Unknown batch mode: {key.mode}')
+
+
+async def store_scope_increase_events(events: AsyncIterator[tuple[str, JSON]],
+                                      store: ReportStore,
+                                      key: ReportKey) -> AsyncIterator[tuple[str, JSON]]:
+    """Пропускает события `get_batch_scope_increase_events` и по `done` сохраняет собранный из них отчёт
+    (в том же виде, что `get_batch_scope_increase_data`)"""
+    dataset: JSON = {'entries': [], 'failures': []}
+    async for name, data in events:
+        if name == 'start':
+            dataset |= {'query': data['query'], 'query_url': data['query_url']}
+        elif name == 'progress':
+            if data['row']:
+                dataset['entries'].append(data['row'])
+            if data['failure']:
+                dataset['failures'].append(data['failure'])
+        elif name == 'done' and 'query' in dataset:
+            if dataset['entries']:
+                dataset['stats'] = data['stats']
+            store.put(key, {'dataset': dataset})
+        yield name, data
+
+
+class ReportScheduler:
+    """Раз в сутки (в `run_at`, UTC) пересчитывает план и все отчёты из него; при старте - только с `run_on_start`.
+
+    Отчёты считаются по одному, чтобы не нагружать YouTrack, и для всех языков сразу;
+    ошибка в одном отчёте не прерывает остальные.
+    Если планировщик запущен в каждом воркере, считает только тот, кто первым займёт `lock_path` (`flock`),
+    остальные получают отчёты через общий `store`. Без `fcntl` (Windows) считает каждый процесс.
+    """
+
+    def __init__(self,
+                 settings: Settings,
+                 store: ReportStore,
+                 translator_factory: Callable[[str], Callable[[str], str]],
+                 langs: Iterable[str],
+                 run_at: time,
+                 run_on_start: bool = False,
+                 lock_path: Path|None = None):
+        self.settings = settings
+        self.store = store
+        self.translator_factory = translator_factory
+        self.langs = list(langs)
+        self.run_at = run_at
+        self.run_on_start = run_on_start
+        self.lock_path = lock_path
+        self.__lock_fd: int|None = None
+        self.__task: asyncio.Task|None = None
+
+    def start(self) -> None:
+        self.__task = asyncio.create_task(self.__loop(), name='batch-precompute')
+
+    async def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+        if self.__lock_fd is not None:
+            os.close(self.__lock_fd)
+            self.__lock_fd = None
+
+    def is_leader(self) -> bool:
+        """Считает ли отчёты этот процесс. Заняв блокировку, процесс держит её до `stop` (или своего завершения)"""
+        if self.lock_path is None or fcntl is None or self.__lock_fd is not None:
+            return True
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self.__lock_fd = fd
+        return True
+
+    def seconds_until_next_run(self, now: datetime) -> float:
+        next_run = datetime.combine(now.date(), self.run_at, tzinfo=timezone.utc)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    async def run_once(self) -> None:
+        begin = time_module.monotonic()
+        plan = get_precompute_plan(settings=self.settings, langs=self.langs)
+        self.store.plan(plan)
+        logger.info(f'Precomputing {len(plan)} batch reports ({date.today().isoformat()})')
+        # Языки одного отчёта - вместе: отличаются только тексты
+        by_report: dict[ReportKey, list[ReportKey]] = {}
+        for key in plan:
+            by_report.setdefault(replace(key, lang=''), []).append(key)
+        for report, keys in by_report.items():
+            try:
+                reports = await compute_reports(translators=[self.translator_factory(i.lang) for i in keys],
+                                                settings=self.settings,
+                                                key=report)
+                for key, data in zip(keys, reports):
+                    self.store.put(key, data)
+            except Exception as e:
+                _precompute_failures.inc(len(keys), mode=report.mode)
+                logger.warning(f'Unable to precompute {report}: {e!r}')
+        _precompute_duration.set(time_module.monotonic() - begin)
+        logger.info(f'Precomputed {len(self.store)}/{len(plan)} batch reports in {time_module.monotonic() - begin:.1f} sec')
+
+    async def __loop(self) -> None:
+        run = self.run_on_start
+        while True:
+            if run:
+                try:
+                    if self.is_leader():
+                        await self.run_once()
+                except Exception as e:
+                    logger.exception(msg=e)
+            run = True
+            await asyncio.sleep(self.seconds_until_next_run(datetime.now(tz=timezone.utc)))
@@ -15,28 +15,39 @@
 
 
 import aiohttp
-from statistics import mean, median
+import asyncio
+from fastapi import status
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
 
 from youtrack.utils.timestamp import Timestamp
 from youtrack.utils.duration import Duration
-from youtrack.utils.query import SearchQueryBuilder
 from youtrack.utils.issue_state import IssueState
 from youtrack.helper import YouTrackHelper
 from youtrack.utils.anomalies import Anomaly, ScopeIncreasedAnomaly, ReopenAnomaly
+from youtrack.utils.exceptions import UpstreamUnavailableError
 
 from ..settings import Settings, AppSettings
+from ..utils.log import logger
+from ..utils.metrics import metrics
 from .batch_shared import (
     BATCH_CONCURRENCY,
-    BatchShortIssueInfo,
-    batched,
+    JSON,
+    BatchSelection,
     validate_input_params,
     validate_dates,
-    get_required_issue_fields,
+    fetch_batch_selection,
     process_issue_custom_fields,
     batch_output_transformer
 )
+from .stats import StreamingStats, format_duration_sec
 
-from asyncio import Semaphore, TaskGroup
+from asyncio import Semaphore
+
+
+_reports_cancelled = metrics.counter('batch_reports_cancelled_total', 'Scope-increase reports cancelled before all issues were processed')
+_issues_cancelled = metrics.counter('batch_issues_cancelled_total', 'Unprocessed issues of cancelled reports (in flight or not requested)')
 
 
 def get_anomalies(json, app_config: AppSettings, project_short_name: str, current_state: str) -> list[Anomaly]:
@@ -99,45 +110,153 @@ def get_total_scope_increase(anomalies: list[Anomaly]) -> int:
     return total_sec
 
 
-async def get_batch_scope_increase_data(translator,
-                                        settings: Settings,
-                                        project: str,
-                                        components: list[str],
-                                        begin: str,
-                                        end: str):
-    # Empty page
-    if not project and len(components) == 0 and not begin and not end:
-        return dict()
+class ScopeIncreaseStats:
+    """Статистика по увеличению scope, которая обновляется по мере обработки задач"""
+
+    def __init__(self, count_total: int, project_totals: dict[str, int]|None = None):
+        self.count_total = count_total
+        self.count_processed = 0
+        self.failures: list[JSON] = []  # задачи, которые не удалось обработать
+        self.increases = StreamingStats()  # только задачи с увеличением scope, сек
+        # Подытоги, если проектов несколько
+        self.projects: dict[str, ScopeIncreaseStats] = {
+            project: ScopeIncreaseStats(count_total=count) for project, count in project_totals.items()
+        } if project_totals and len(project_totals) > 1 else {}
+
+    def add(self, result: 'IssueResult') -> None:
+        if self.projects:
+            self.projects[result.entry['project_short_name']].add(result)
+        self.count_processed += 1
+        if not result.is_ok:
+            self.failures.append({'id': result.entry['id'], 'text': result.error})
+        elif result.increase_sec > 0:
+            self.increases.add(result.increase_sec)
+
+    @property
+    def count_fail(self) -> int:
+        return self.increases.count
+
+    def to_progress_dict(self) -> JSON:
+        """Счётчики, среднее и медиана: дёшево, можно отправлять после каждой задачи"""
+        return {
+            'count_total': self.count_total,
+            'count_processed': self.count_processed,
+            'count_ok': self.count_processed - self.count_fail - len(self.failures),
+            'count_fail': self.count_fail,
+            'count_errors': len(self.failures),
+            'mean_scope_increase': format_duration_sec(self.increases.mean),
+            'median_scope_increase': format_duration_sec(self.increases.median),
+        }
+
+    def to_dict(self) -> JSON:
+        return self.to_progress_dict() | {
+            'p90_scope_increase': format_duration_sec(self.increases.quantile(0.9)),
+            'p99_scope_increase': format_duration_sec(self.increases.quantile(0.99)),
+        } | ({'projects': [{'project': project} | stats.to_dict() for project, stats in self.projects.items()]}
+             if self.projects else {})
+
+
+@dataclass
+class IssueResult:
+    """Результат обработки одной задачи: увеличение scope (сек) или ошибка.
+
+    Тексты для пользователя (`error` и описания аномалий в `entry`) появляются после `localize`,
+    поэтому один результат можно показать на нескольких языках"""
+    entry: JSON
+    increase_sec: int = 0
+    error: str|None = None
+    anomalies: list[Anomaly] = field(default_factory=list)
+    exception: Exception|None = None
 
-    # Input validation
+    @property
+    def is_ok(self) -> bool:
+        return self.error is None and self.exception is None
+
+    def localize(self, translator) -> 'IssueResult':
+        entry = self.entry
+        if self.increase_sec > 0:
+            entry = entry | {'anomalies': [{'timestamp': i.timestamp.format_iso8601(),
+                                            'description': i.to_string(_=translator)} for i in self.anomalies]}
+        return IssueResult(entry=entry,
+                           increase_sec=self.increase_sec,
+                           error=describe_issue_error(translator, self.exception) if self.exception is not None else self.error)
+
+
+def describe_issue_error(translator, error: Exception) -> str:
+    _ = translator
+    if isinstance(error, aiohttp.ClientResponseError):
+        if error.status in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN):
+            return _('batch.issue_error.forbidden')
+        if error.status == status.HTTP_404_NOT_FOUND:
+            return _('batch.issue_error.not_found')
+    if isinstance(error, TimeoutError):
+        return _('batch.issue_error.timeout')
+    return str(error) or type(error).__name__
+
+
+@dataclass
+class ScopeIncreaseRequest:
+    selection: BatchSelection
+    entries: list[JSON]  # задачи, попавшие под query, ещё без активностей
+    activities_end: Timestamp|None = None  # активности позже не влияют на отчёт и не загружаются
+
+    @property
+    def helper(self) -> YouTrackHelper:
+        return self.selection.helper
+
+    @property
+    def query(self) -> str:
+        return self.selection.query
+
+    @property
+    def query_url(self) -> str:
+        return self.selection.query_url
+
+    @property
+    def project_totals(self) -> dict[str, int]:
+        return {i.project: len(i.issues) for i in self.selection.slices}
+
+
+def validate_scope_increase_params(settings: Settings,
+                                   projects: list[str],
+                                   components: list[str],
+                                   begin: str,
+                                   end: str) -> tuple[date, date]:
     validate_input_params(yt_config=settings.yt_config,
-                          project=project,
+                          projects=projects,
                           components=components)
-    begin_date, end_date = validate_dates(begin=begin, end=end)
-
-    # Getting data
-    query = SearchQueryBuilder(project=project,
-                               components=components,
-                               resolve_date_begin=begin_date,
-                               resolve_date_end=end_date,
-                               only_started=True).Build()
-    helper = YouTrackHelper(instance_url=settings.app_config.host,
-                            api_key=settings.app_config.api_key)
-    data = await helper.get_raw_issues_by_query(query=query,
-                                                fields=get_required_issue_fields())
-    context = {
-        'dataset': {
-            'entries': [],
-            'query': query,
-            'query_url': str(helper.get_issues_search_url(query))
-        }
-    }
-    parsed = process_issue_custom_fields(json=data,
+    return validate_dates(begin=begin, end=end)
+
+
+async def find_scope_increase_candidates(settings: Settings,
+                                         projects: list[str],
+                                         components: list[str],
+                                         begin: str,
+                                         end: str) -> ScopeIncreaseRequest:
+    selection = await fetch_batch_selection(settings=settings,
+                                            projects=projects,
+                                            components=components,
+                                            begin=begin,
+                                            end=end)
+    _, end_date = validate_dates(begin=begin, end=end)
+    parsed = process_issue_custom_fields(json=selection.issues,
                                          app_config=settings.app_config,
                                          output_transformer_func=batch_output_transformer)
-    if len(parsed) == 0:
-        return context
+    # Задачи решены не позже end_date, более поздние активности — правки после решения.
+    # +1 день на конец дня и +1 день на часовые пояса
+    activities_end = Timestamp(datetime.combine(end_date + timedelta(days=2), time(), tzinfo=timezone.utc))
+    return ScopeIncreaseRequest(selection=selection, entries=parsed, activities_end=activities_end)
+
+
+async def process_scope_increase(settings: Settings,
+                                 request: ScopeIncreaseRequest) -> AsyncIterator[IssueResult]:
+    """Результаты обработки задач из `request` (ещё без текстов, см. `IssueResult.localize`) в порядке готовности.
+
+    Ошибка по одной задаче не прерывает обработку остальных: повторы (с ограничением на конкурентность)
+    делаются при загрузке, после них задача попадает в результат с ошибкой. Исключение - недоступность
+    YouTrack (`UpstreamUnavailableError`): остальные задачи тоже не загрузить, поэтому прерывается весь отчёт.
 
+    Задачи с увеличением scope дополняются (in-place) полями `increased_total*`"""
     activity_fields: list[str] = [
         'author(name)',
         'added(name)',
@@ -150,42 +269,154 @@ async def get_batch_scope_increase_data(translator,
         'IssueResolvedCategory'
     ]
 
-    increases_list: list[int] = []
-
-    async def process(session: aiohttp.ClientSession, semaphore: Semaphore, entry: BatchShortIssueInfo) -> None:
-        activities = await helper.get_issue_activities(session=session,
-                                                       sem=semaphore,
-                                                       issue_id=entry['id'],
-                                                       fields=activity_fields,
-                                                       categories=activities_categories)
+    async def process(session: aiohttp.ClientSession, semaphore: Semaphore, entry: JSON) -> IssueResult:
+        activities = await request.helper.get_issue_activities(session=session,
+                                                               sem=semaphore,
+                                                               issue_id=entry['id'],
+                                                               fields=activity_fields,
+                                                               categories=activities_categories,
+                                                               end=request.activities_end)
         anomalies = get_anomalies(json=activities,
                                   app_config=settings.app_config,
                                   project_short_name=entry['project_short_name'],
                                   current_state=entry['state'])
         if (total_increase_sec := get_total_scope_increase(anomalies)) > 0:
             # In-place to avoid copying
-            entry['anomalies'] = [{'timestamp': i.timestamp.format_iso8601(),
-                                   'description': i.to_string(_=translator)} for i in anomalies]
             entry['increased_total'] = Duration.from_minutes(total_increase_sec // 60).format_yt()
             entry['increased_total_value'] = total_increase_sec
-            increases_list.append(total_increase_sec)
+        return IssueResult(entry=entry, increase_sec=total_increase_sec, anomalies=anomalies)
+
+    # Все задачи в очереди сразу, воркеры разбирают их по одной: медленная задача занимает только свой воркер
+    pending: asyncio.Queue[JSON] = asyncio.Queue()
+    for entry in request.entries:
+        pending.put_nowait(entry)
+    results: asyncio.Queue[IssueResult|UpstreamUnavailableError] = asyncio.Queue()
+
+    async def worker(session: aiohttp.ClientSession, semaphore: Semaphore) -> None:
+        while not pending.empty():
+            entry = pending.get_nowait()
+            try:
+                results.put_nowait(await process(session=session, semaphore=semaphore, entry=entry))
+            except UpstreamUnavailableError as e:
+                results.put_nowait(e)
+                return
+            except Exception as e:
+                logger.warning(f'Unable to process issue {entry["id"]}: {e!r}')
+                results.put_nowait(IssueResult(entry=entry, exception=e))
 
     async with aiohttp.ClientSession() as session:
         sem = Semaphore(BATCH_CONCURRENCY)
-        for chunk in batched(parsed, 100):
-            async with TaskGroup() as tg:
-                for entry in chunk:
-                    tg.create_task(process(session=session, semaphore=sem, entry=entry))
-
-    context['dataset']['entries'] = [e for e in parsed if 'increased_total_value' in e]
-
-    if (dataset_size := len(context['dataset']['entries'])) > 0:
-        context['dataset']['stats'] = {
-            'count_total': len(parsed),
-            'count_ok': len(parsed) - dataset_size,
-            'count_fail': dataset_size,
-            'mean_scope_increase': Duration.from_minutes(int(mean(increases_list) // 60)).format_yt(),
-            'median_scope_increase': Duration.from_minutes(int(median(increases_list) // 60)).format_yt(),
+        workers = [asyncio.create_task(worker(session=session, semaphore=sem))
+                   for _ in range(min(BATCH_CONCURRENCY, len(request.entries)))]
+        try:
+            for _ in range(len(request.entries)):
+                if isinstance(result := await results.get(), UpstreamUnavailableError):
+                    raise result
+                yield result
+        finally:
+            # Потребитель перестал читать (например, клиент отключился): незапрошенные задачи
+            # так и остаются в очереди, а запросы в полёте отменяются
+            if unfinished := pending.qsize() + sum(not task.done() for task in workers):
+                _reports_cancelled.inc()
+                _issues_cancelled.inc(unfinished)
+                logger.info(f'Scope-increase report is cancelled, {unfinished} of {len(request.entries)} issues are not processed')
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def get_batch_scope_increase_data(translator,
+                                        settings: Settings,
+                                        projects: list[str],
+                                        components: list[str],
+                                        begin: str,
+                                        end: str):
+    reports = await get_batch_scope_increase_reports(translators=[translator],
+                                                     settings=settings,
+                                                     projects=projects,
+                                                     components=components,
+                                                     begin=begin,
+                                                     end=end)
+    return reports[0]
+
+
+async def get_batch_scope_increase_reports(translators: list,
+                                           settings: Settings,
+                                           projects: list[str],
+                                           components: list[str],
+                                           begin: str,
+                                           end: str) -> list[JSON]:
+    """`get_batch_scope_increase_data` сразу для нескольких языков (по отчёту на каждый из `translators`):
+    задачи и их активности загружаются один раз"""
+    # Empty page
+    if not projects and len(components) == 0 and not begin and not end:
+        return [dict() for _ in translators]
+
+    request = await find_scope_increase_candidates(settings=settings,
+                                                   projects=projects,
+                                                   components=components,
+                                                   begin=begin,
+                                                   end=end)
+    results = [i async for i in process_scope_increase(settings=settings, request=request)]
+    return [_make_scope_increase_context(translator=i, request=request, results=results) for i in translators]
+
+
+def _make_scope_increase_context(translator, request: ScopeIncreaseRequest, results: list[IssueResult]) -> JSON:
+    context = {
+        'dataset': {
+            'entries': [],
+            'query': request.query,
+            'query_url': request.query_url
         }
+    }
+    if len(request.entries) == 0:
+        return context
+
+    stats = ScopeIncreaseStats(count_total=len(request.entries), project_totals=request.project_totals)
+    localized: dict[str, JSON] = {}
+    for result in results:
+        result = result.localize(translator)
+        stats.add(result)
+        localized[result.entry['id']] = result.entry
+
+    # В порядке выборки, а не готовности
+    context['dataset']['entries'] = [localized[e['id']] for e in request.entries if 'increased_total_value' in e]
+    context['dataset']['failures'] = stats.failures
+    if len(context['dataset']['entries']) > 0:
+        context['dataset']['stats'] = stats.to_dict()
 
     return context
+
+
+async def get_batch_scope_increase_events(translator,
+                                          settings: Settings,
+                                          projects: list[str],
+                                          components: list[str],
+                                          begin: str,
+                                          end: str) -> AsyncIterator[tuple[str, JSON]]:
+    """То же, что `get_batch_scope_increase_data`, но по частям (для server-sent events):
+
+    * `start` - сколько задач попало под query;
+    * `progress` - после каждой обработанной задачи: строка таблицы или ошибка (или None)
+      и текущие счётчики, среднее и медиана;
+    * `done` - итоговая статистика (с квантилями и подытогами по проектам)."""
+    request = await find_scope_increase_candidates(settings=settings,
+                                                   projects=projects,
+                                                   components=components,
+                                                   begin=begin,
+                                                   end=end)
+    stats = ScopeIncreaseStats(count_total=len(request.entries), project_totals=request.project_totals)
+    yield 'start', {
+        'query': request.query,
+        'query_url': request.query_url,
+        'stats': stats.to_dict()
+    }
+    async for result in process_scope_increase(settings=settings, request=request):
+        result = result.localize(translator)
+        stats.add(result)
+        yield 'progress', {
+            'row': result.entry if result.increase_sec > 0 else None,
+            'failure': stats.failures[-1] if not result.is_ok else None,
+            'stats': stats.to_progress_dict()  # полная статистика - только в `start` и `done`
+        }
+    yield 'done', {'stats': stats.to_dict()}
@@ -14,22 +14,15 @@
 # limitations under the License.
 
 
-from numpy import mean, median
-
-from youtrack.helper import YouTrackHelper
-from youtrack.utils.duration import Duration
-from youtrack.utils.query import SearchQueryBuilder
-
 from ..settings import Settings
 from .batch_shared import (
     BatchShortIssueInfo,
-    validate_input_params,
-    validate_dates,
-    get_required_issue_fields,
+    fetch_batch_selection,
     batch_output_transformer,
     process_issue_custom_fields,
     JSON
 )
+from .stats import StreamingStats, format_duration_sec
 
 
 def overrun_filter(parsed: BatchShortIssueInfo) -> bool:
@@ -50,54 +43,54 @@ def overrun_transformer(parsed: BatchShortIssueInfo, raw: JSON) -> JSON:
 
 
 def get_overrun_stats(input: JSON, output: JSON) -> JSON:
-    overrun_durations_sec: list[int] = list()
+    overruns_sec = StreamingStats()
     for i in output:
         current_value = int(i['scope_overrun_value'])
         if current_value > 0:
-            overrun_durations_sec.append(current_value)
+            overruns_sec.add(current_value)
 
     return {
         'count_total': len(input),
         'count_scope_ok': len(input) - len(output),
         'count_scope_overrun': len(output),
-        'mean_overrun': Duration.from_minutes(int(mean(overrun_durations_sec) / 60)).format_yt(),
-        'median_overrun': Duration.from_minutes(int(median(overrun_durations_sec) / 60)).format_yt()
+        'mean_overrun': format_duration_sec(overruns_sec.mean),
+        'median_overrun': format_duration_sec(overruns_sec.median),
+        'p90_overrun': format_duration_sec(overruns_sec.quantile(0.9)),
+        'p99_overrun': format_duration_sec(overruns_sec.quantile(0.99))
     }
 
 
-async def get_batch_scope_overrun_data(translator, settings: Settings, project: str, components: list[str], begin: str, end: str):
+async def get_batch_scope_overrun_data(translator, settings: Settings, projects: list[str], components: list[str], begin: str, end: str):
     # Empty page
-    if not project and len(components) == 0 and not begin and not end:
+    if not projects and len(components) == 0 and not begin and not end:
         return dict()
 
-    # Input validation
-    validate_input_params(yt_config=settings.yt_config,
-                          project=project,
-                          components=components)
-    begin_date, end_date = validate_dates(begin=begin, end=end)
-
-    # Getting data
-    query = SearchQueryBuilder(project=project,
-                               components=components,
-                               resolve_date_begin=begin_date,
-                               resolve_date_end=end_date,
-                               only_started=True).Build()
-    helper = YouTrackHelper(instance_url=settings.app_config.host,
-                            api_key=settings.app_config.api_key)
-    data = await helper.get_raw_issues_by_query(query=query,
-                                                fields=get_required_issue_fields())
+    selection = await fetch_batch_selection(settings=settings,
+                                            projects=projects,
+                                            components=components,
+                                            begin=begin,
+                                            end=end)
+    data = selection.issues
     dataset = {
         'entries': process_issue_custom_fields(json=data,
                                                app_config=settings.app_config,
                                                filter_func=overrun_filter,
                                                output_transformer_func=overrun_transformer),
-        'query': query,
-        'query_url': str(helper.get_issues_search_url(query))
+        'query': selection.query,
+        'query_url': selection.query_url
     }
     if len(dataset['entries']):
         dataset |= {
             'stats': get_overrun_stats(input=data, output=dataset['entries'])
         }
+        if len(selection.slices) > 1:
+            # Подытоги по проектам
+            dataset['stats']['projects'] = [
+                {'project': i.project, 'query_url': i.query_url} | get_overrun_stats(
+                    input=i.issues,
+                    output=[j for j in dataset['entries'] if j['project_short_name'] == i.project])
+                for i in selection.slices
+            ]
     return {
         'dataset': dataset
     }
@@ -0,0 +1,152 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import math
+from bisect import bisect_left, insort
+from collections.abc import Sequence
+
+from youtrack.utils.duration import Duration
+
+
+# Границы гистограммы длительностей по умолчанию (сек, включительно): 1h, 4h, 1d, 3d, 1w (1d = 8h)
+DURATION_HISTOGRAM_EDGES_SEC: tuple[int, ...] = (3600, 4 * 3600, 8 * 3600, 24 * 3600, 40 * 3600)
+
+
+def format_duration_sec(value_sec: float) -> str:
+    return Duration.from_minutes(int(value_sec // 60)).format_yt()
+
+
+class StreamingStats:
+    """Статистика по потоку неотрицательных значений без хранения всех значений
+
+    Среднее, минимум, максимум и гистограмма — точные. Квантили точные (линейная интерполяция,
+    как в numpy/statistics), пока значений не больше `exact_limit`. Дальше значения переносятся
+    в логарифмические корзины (DDSketch): квантиль считается с относительной погрешностью
+    `relative_accuracy`, а память зависит только от разброса значений.
+    """
+
+    def __init__(self,
+                 exact_limit: int = 10_000,
+                 relative_accuracy: float = 0.01,
+                 histogram_edges: Sequence[float] = DURATION_HISTOGRAM_EDGES_SEC):
+        assert 0 < relative_accuracy < 1
+        assert list(histogram_edges) == sorted(histogram_edges)
+        self.count = 0
+        self.min: float = 0
+        self.max: float = 0
+        self.__sum: float = 0
+        self.__exact_limit = exact_limit
+        self.__sorted: list[float]|None = []  # None — перешли на корзины
+        self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = math.log(self.__gamma)
+        self.__buckets: dict[int, int] = {}
+        self.__zero_count = 0
+        self.__histogram_edges = tuple(histogram_edges)
+        self.__histogram_counts = [0] * (len(histogram_edges) + 1)
+
+    @property
+    def is_exact(self) -> bool:
+        return self.__sorted is not None
+
+    @property
+    def mean(self) -> float:
+        return self.__sum / self.count if self.count else 0
+
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def add(self, value: float) -> None:
+        if value < 0:
+            raise ValueError(f'Negative value: {value}')
+        self.min = value if self.count == 0 else min(self.min, value)
+        self.max = value if self.count == 0 else max(self.max, value)
+        self.count += 1
+        self.__sum += value
+        self.__histogram_counts[bisect_left(self.__histogram_edges, value)] += 1
+
+        if self.__sorted is None:
+            self.__add_to_bucket(value, 1)
+            return
+        insort(self.__sorted, value)
+        if len(self.__sorted) > self.__exact_limit:
+            self.__to_buckets()
+
+    def merge(self, other: 'StreamingStats') -> None:
+        """Добавляет значения `other` (например, посчитанные параллельно). Параметры должны совпадать"""
+        assert self.__gamma == other.__gamma and self.__histogram_edges == other.__histogram_edges
+        if other.count == 0:
+            return
+        self.min = other.min if self.count == 0 else min(self.min, other.min)
+        self.max = other.max if self.count == 0 else max(self.max, other.max)
+        self.count += other.count
+        self.__sum += other.__sum
+        self.__histogram_counts = [a + b for a, b in zip(self.__histogram_counts, other.__histogram_counts)]
+
+        if self.__sorted is not None and other.__sorted is not None:
+            self.__sorted = sorted(self.__sorted + other.__sorted)
+            if len(self.__sorted) > self.__exact_limit:
+                self.__to_buckets()
+            return
+        if self.__sorted is not None:
+            self.__to_buckets()
+        if other.__sorted is not None:
+            for value in other.__sorted:
+                self.__add_to_bucket(value, 1)
+        else:
+            self.__zero_count += other.__zero_count
+            for index, count in other.__buckets.items():
+                self.__buckets[index] = self.__buckets.get(index, 0) + count
+
+    def quantile(self, q: float) -> float:
+        assert 0 <= q <= 1
+        if self.count == 0:
+            return 0
+        if self.__sorted is not None:
+            position = q * (self.count - 1)
+            lower = math.floor(position)
+            upper = min(lower + 1, self.count - 1)
+            return self.__sorted[lower] + (self.__sorted[upper] - self.__sorted[lower]) * (position - lower)
+
+        rank = q * (self.count - 1)
+        seen = self.__zero_count
+        if rank < seen:
+            return 0
+        for index in sorted(self.__buckets):
+            seen += self.__buckets[index]
+            if rank < seen:
+                # Середина корзины (gamma^(i-1); gamma^i], ограниченная реальными min/max
+                value = 2 * self.__gamma ** index / (self.__gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def histogram(self) -> list[tuple[float|None, int]]:
+        """Пары (верхняя граница включительно, количество); у последней корзины границы нет"""
+        edges: list[float|None] = list(self.__histogram_edges)
+        return list(zip(edges + [None], self.__histogram_counts))
+
+    def __add_to_bucket(self, value: float, count: int) -> None:
+        if value == 0:
+            self.__zero_count += count
+            return
+        index = math.ceil(math.log(value) / self.__log_gamma)
+        self.__buckets[index] = self.__buckets.get(index, 0) + count
+
+    def __to_buckets(self) -> None:
+        assert self.__sorted is not None
+        values, self.__sorted = self.__sorted, None
+        for value in values:
+            self.__add_to_bucket(value, 1)
@@ -15,12 +15,13 @@
 
 
 from fastapi import Request, Depends
-from fastapi.templating import Jinja2Templates
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.datastructures import URL
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
 from gettext import GNUTranslations, translation
 from dataclasses import dataclass
-from typing import Literal, Annotated, Optional
+from functools import cache
+from typing import Any, Callable, Literal, Annotated, Optional
 
 
 class LanguageSettings:
@@ -91,7 +92,7 @@ def get_best_language_from_request(request: Request) -> str:
     return LanguageSettings.default_language()
 
 
-def get_lang_from_session(request: Request) -> Optional[str]:
+def get_lang_from_session(request: HTTPConnection) -> Optional[str]:
     if hasattr(request, 'session'):
         lang = request.session.get('language')
         if lang and LanguageSettings.is_supported(lang):
@@ -99,7 +100,7 @@ def get_lang_from_session(request: Request) -> Optional[str]:
     return None
 
 
-def get_lang_prefered_lang_from_header(request: Request) -> Optional[str]:
+def get_lang_prefered_lang_from_header(request: HTTPConnection) -> Optional[str]:
     accept_language = request.headers.get("Accept-Language")
     if accept_language:
         candidates = convert_accept_language_values(accept_language)
@@ -109,7 +110,7 @@ def get_lang_prefered_lang_from_header(request: Request) -> Optional[str]:
     return None
 
 
-def get_lang_from_url(request: Request) -> Optional[str]:
+def get_lang_from_url(request: HTTPConnection) -> Optional[str]:
     path = request.url.path
     parts = path.split('/')
     if len(parts) >= 2 and LanguageSettings.is_supported(lang := parts[1].strip().lower()):
@@ -117,6 +118,16 @@ def get_lang_from_url(request: Request) -> Optional[str]:
     return None
 
 
+@cache
+def get_translations(lang: str) -> GNUTranslations:
+    """Переводы для языка. Кэшируются на процесс (в т.ч. в воркерах ComputePool)"""
+    return translation(domain='messages', localedir='translations', languages=[lang])
+
+
+def get_translator(lang: str) -> Callable[[str], str]:
+    return get_translations(lang).gettext
+
+
 def get_link_for_lang(url: URL|str, lang: str) -> URL:
     if isinstance(url, str):
         parsed = URL(url=url)
@@ -141,36 +152,59 @@ def get_link_for_lang(url: URL|str, lang: str) -> URL:
     return parsed.replace(path=f'/{lang}{parsed.path}')
 
 
-class LanguageMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, templates: Jinja2Templates):
-        super().__init__(app)
-        self.templates = templates
-        self.__translations: dict[str, GNUTranslations] = {}
-        for lang in LanguageSettings.supported_codes():
-            self.__translations[lang] = translation(
-                domain='messages',
-                localedir='translations',
-                languages=[lang]
-            )
-
-    async def dispatch(self, request: Request, call_next):
-        lang: Optional[str] = None
-        if lang_from_url := get_lang_from_url(request):
-            lang = lang_from_url
-        elif lang_from_session := get_lang_from_session(request):
-            lang = lang_from_session
-        elif lang_from_header := get_lang_prefered_lang_from_header(request):
-            lang = lang_from_header
-
-        if not lang:
-            lang = LanguageSettings.default_language()
+def resolve_language(request: HTTPConnection) -> str:
+    """Язык запроса: из URL, затем из сессии, затем из Accept-Language"""
+    if lang := get_lang_from_url(request):
+        return lang
+    if lang := get_lang_from_session(request):
+        return lang
+    if lang := get_lang_prefered_lang_from_header(request):
+        return lang
+    return LanguageSettings.default_language()
+
 
-        request.session['language'] = lang
-        self.templates.env.globals['_'] = self.__translations[lang].gettext
-        self.templates.env.globals['lang'] = lang
-        request.state.gettext = self.__translations[lang].gettext
-        response = await call_next(request)
-        return response
+def language_context(request: Request) -> dict[str, Any]:
+    """Контекстный процессор шаблонов: `_` и `lang` текущего запроса"""
+    lang = getattr(request.state, 'lang', None) or LanguageSettings.default_language()
+    return {'_': get_translator(lang), 'lang': lang}
+
+
+class LanguageMiddleware:
+    """Определяет язык запроса и кладёт его в `request.state` (`lang`, `gettext`).
+
+    В сессию пишется только язык из URL и только если он сменился: иначе `SessionMiddleware`
+    подписывал бы и отправлял cookie в каждом ответе, включая статику.
+
+    Для `skip_paths` (статика, `/metrics`) язык не определяется: сессия и заголовки не читаются,
+    ответ от них не зависит. В `request.state` - язык по умолчанию (для страницы 404).
+
+    Чистый ASGI: без задачи и потока на запрос, как у `BaseHTTPMiddleware`. Ничего общего
+    между запросами не меняет - шаблоны получают `_` через `language_context`"""
+
+    def __init__(self, app: ASGIApp, skip_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.__skip_paths = skip_paths
+        self.__translators = {lang: get_translator(lang) for lang in LanguageSettings.supported_codes()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        if self.__is_skipped(scope['path']):
+            lang = LanguageSettings.default_language()
+        else:
+            connection = HTTPConnection(scope)
+            lang = resolve_language(connection)
+            if lang == get_lang_from_url(connection) and connection.session.get('language') != lang:
+                connection.session['language'] = lang
+        state = scope.setdefault('state', {})
+        state['lang'] = lang
+        state['gettext'] = self.__translators[lang]
+        await self.app(scope, receive, send)
+
+    def __is_skipped(self, path: str) -> bool:
+        return any(path == i or path.startswith(i + '/') for i in self.__skip_paths)
 
 
 LanguageDep = Annotated[AvailableLanguageT, Depends(get_best_language_from_request)]
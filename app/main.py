@@ -17,35 +17,55 @@
 from aiohttp import ClientResponseError
 from contextlib import asynccontextmanager
 from datetime import timezone, timedelta
-from typing import Optional, Callable, Annotated, Any
+from pathlib import Path
+from typing import Optional, Callable, Annotated, Any, Awaitable
+import asyncio
 import logging
-import os
+import math
 
 from fastapi import FastAPI, Request, status, Query, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, PlainTextResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from starlette.middleware.sessions import SessionMiddleware
+from markupsafe import Markup
 
 from youtrack.helper import YouTrackHelper
-from youtrack.utils.exceptions import InvalidIssueIdError, UnableToCountIssues, TooMuchIssuesInBatchError
+from youtrack.utils.rate_limiter import SharedTokenBucket, get_shared_bucket_path
+from youtrack.utils.exceptions import InvalidIssueIdError, UnableToCountIssues, TooMuchIssuesInBatchError, UpstreamUnavailableError
 
 from .settings import Settings, AppSettings
 from .utils.log import logger
-from .timeline import get_timeline_page_data
-from .language_middleware import LanguageMiddleware, LanguageSettings, LanguageDep, get_link_for_lang
+from .utils.admission import AdmissionController, OverloadedError
+from .utils.assets import AssetManifest, AssetFiles, build_assets
+from .utils.compute import ComputePool
+from .utils.disconnect import ClientDisconnectedError, cancel_on_disconnect
+from .utils.loop_monitor import LoopMonitor, LoopMonitorMiddleware
+from .utils.metrics import metrics
+from .utils.page_cache import PageCache, PageCacheMiddleware, cache_page, issue_surrogate_key
+from .utils.sessions import DeferredSessionMiddleware
+from .utils.templating import StreamingTemplates
+from .utils.upstream_metrics import export_upstream_metrics
+from .utils.sse import EventStreamResponse
+from .timeline import get_timeline_page_data, TimelinePageStream
+from .language_middleware import LanguageMiddleware, LanguageSettings, LanguageDep, get_link_for_lang, get_translator, language_context
 from .batch import (
     get_basic_batch_context,
     get_batch_scope_overrun_data,
     get_batch_scope_increase_data,
+    get_batch_scope_increase_events,
+    validate_scope_increase_params,
+    store_scope_increase_events,
+    ReportKey,
+    ReportStore,
+    ReportScheduler,
+    get_shared_store_dir,
     BadQueryError,
     BadDatesError
 )
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Init
+async def load_settings() -> Settings:
+    """Локальные настройки (instance.json) и настройки экземпляра YouTrack"""
     local = AppSettings()
     logging.basicConfig(level=logging.DEBUG if local.debug else logging.INFO)
 
@@ -54,22 +74,100 @@ async def lifespan(app: FastAPI):
     logger.info(f'Connecting to: {local.host}...')
     helper = YouTrackHelper(instance_url=local.host,
                             api_key=local.api_key)
-    app.state.settings = Settings(app_config=local,
-                                  yt_config=await helper.get_instance_settings())
+    settings = Settings(app_config=local,
+                        yt_config=await helper.get_instance_settings())
+    logger.info(f'Loaded remote settings:\n{settings.yt_config}')
+    return settings
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Init
+    # `app.serve` загружает настройки и собирает статику один раз, до запуска воркеров
+    if getattr(app.state, 'settings', None) is None:
+        app.state.settings = await load_settings()
     settings: Settings = app.state.settings
-    logger.info(f'Loaded remote settings:\n{settings.yt_config}')
+    local = settings.app_config
+
+    if len(assets) == 0:
+        await asyncio.to_thread(build_assets, assets)
+
+    app.state.compute_pool = ComputePool(kind=local.compute_executor,
+                                         max_workers=local.compute_workers)
+
+    page_cache.max_bytes = local.page_cache_max_bytes
+    YouTrackHelper.upstream_limiter.max_concurrent = local.upstream_max_concurrent
+    YouTrackHelper.upstream_limiter.reserved_interactive = local.upstream_reserved_interactive
+    YouTrackHelper.circuit_breakers.configure(failure_threshold=local.upstream_breaker_threshold,
+                                              reset_timeout_sec=local.upstream_breaker_reset)
+    YouTrackHelper.retry_budget.ratio = local.upstream_retry_ratio
+    if local.upstream_rate_limit is not None:
+        # Лимит YouTrack - на API-ключ, поэтому корзина общая для всех воркеров с этим ключом
+        bucket_path = Path(local.upstream_rate_file) if local.upstream_rate_file else \
+            get_shared_bucket_path(f'{local.host} {local.api_key}')
+        YouTrackHelper.rate_limiter = SharedTokenBucket(path=bucket_path,
+                                                        rate=local.upstream_rate_limit,
+                                                        burst=local.upstream_rate_burst)
+    batch_admission.max_concurrent = local.batch_max_concurrent
+    batch_admission.max_queue = local.batch_max_queue
+    batch_admission.max_wait_sec = local.batch_queue_timeout
+    loop_monitor.interval = local.loop_monitor_interval
+    loop_monitor.threshold = local.slow_callback_threshold
+    loop_monitor.start()
+    if local.debug:
+        # Встроенный в asyncio поиск медленных коллбеков (дорогой, поэтому только в debug)
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = local.slow_callback_threshold
+
+    scheduler: ReportScheduler|None = None
+    if local.precompute_at is not None:
+        # Хранилище общее для воркеров, считает отчёты только один из них
+        store_dir = Path(local.precompute_dir) if local.precompute_dir else get_shared_store_dir(local.host)
+        app.state.report_store = ReportStore(directory=store_dir)
+        scheduler = ReportScheduler(settings=settings,
+                                    store=app.state.report_store,
+                                    translator_factory=get_translator,
+                                    langs=LanguageSettings.supported_codes(),
+                                    run_at=local.precompute_at,
+                                    run_on_start=local.precompute_on_start,
+                                    lock_path=store_dir / 'scheduler.lock')
+        scheduler.start()
 
     yield
     # Clean-up
-    pass
-
-
-templates = Jinja2Templates(directory="templates")
+    if scheduler is not None:
+        await scheduler.stop()
+    await loop_monitor.stop()
+    app.state.compute_pool.shutdown()
+    if YouTrackHelper.rate_limiter is not None:
+        YouTrackHelper.rate_limiter.close()
+        YouTrackHelper.rate_limiter = None
+
+
+def get_session_secret_key(app: FastAPI) -> str|None:
+    """Ключ из настроек (читаются в lifespan, т.е. до первого запроса)"""
+    settings: Settings|None = getattr(app.state, 'settings', None)
+    return settings.app_config.session_secret_key if settings is not None else None
+
+
+templates = Jinja2Templates(directory="templates", context_processors=[language_context])
+stream_templates = StreamingTemplates(directory="templates")
+assets = AssetManifest()  # статика с хешем в имени, собирается при старте
+templates.env.globals['asset_url'] = assets.url
+stream_templates.env.globals['asset_url'] = assets.url
+loop_monitor = LoopMonitor()
+page_cache = PageCache()  # отрендеренные страницы, одинаковые для всех пользователей
+export_upstream_metrics(breakers=YouTrackHelper.circuit_breakers, retry_budget=YouTrackHelper.retry_budget)
+batch_admission = AdmissionController(name='batch')  # построение batch-отчётов (не из кэша)
 app = FastAPI(lifespan=lifespan)
+app.state.report_store = ReportStore()  # предрассчитанные batch-отчёты
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
-app.add_middleware(LanguageMiddleware, templates=templates)
-app.add_middleware(SessionMiddleware, secret_key=os.urandom(24))
+app.mount("/assets", AssetFiles(directory="build/assets", check_dir=False), name="assets")
+app.add_middleware(LoopMonitorMiddleware, monitor=loop_monitor)  # should be the innermost
+app.add_middleware(PageCacheMiddleware, cache=page_cache)  # after LanguageMiddleware: the key includes the language
+app.add_middleware(LanguageMiddleware, skip_paths=('/static', '/assets', '/metrics'))
+app.add_middleware(DeferredSessionMiddleware, get_secret_key=lambda: get_session_secret_key(app))
 
 
 # Uncomment to profile
@@ -89,14 +187,14 @@ app.add_middleware(SessionMiddleware, secret_key=os.urandom(24))
 
 
 def get_basic_html_context(request: Request):
-    session_lang: str = request.session['language']
+    current_lang: str = request.state.lang
     settings: Settings = request.app.state.settings
     return {
         'request': request,
         'host_name': settings.app_config.host,
         'support_person': settings.app_config.support_person,
         'settings': {
-            'lang_code': session_lang,
+            'lang_code': current_lang,
             'date_format': 'dd MMMM yyyy (EEE)',            # for luxon
             'datetime_format': 'dd MMMM yyyy (EEE) HH:mm',  # for luxon
             'timezone': 'UTC+3'                             # for luxon
@@ -104,7 +202,7 @@ def get_basic_html_context(request: Request):
         'supported_languages': [{
             'code': i.code,
             'display_name': i.display_name,
-            'is_active': i.code == session_lang
+            'is_active': i.code == current_lang
         } for i in LanguageSettings.SUPPORTED_LANGUAGES],
         'get_link_for_lang': get_link_for_lang
     }
@@ -127,8 +225,8 @@ async def root(request: Request, lang: LanguageDep):
 
 @app.get("/timeline", include_in_schema=False)
 async def timeline_redirect(request: Request, issue: Optional[str] = None):
-    session_lang: str = request.session['language']
-    base_url = request.url_for('timeline', lang=session_lang)
+    current_lang: str = request.state.lang
+    base_url = request.url_for('timeline', lang=current_lang)
     if issue:
         return RedirectResponse(url=base_url.include_query_params(issue=issue))
     return RedirectResponse(url=base_url)
@@ -136,24 +234,31 @@ async def timeline_redirect(request: Request, issue: Optional[str] = None):
 
 @app.get("/batch", include_in_schema=False)
 async def batch_redirect(request: Request, batch_mode: str|None = None):
-    session_lang: str = request.session['language']
-    new_url = get_link_for_lang(url=request.url, lang=session_lang)
+    current_lang: str = request.state.lang
+    new_url = get_link_for_lang(url=request.url, lang=current_lang)
     return RedirectResponse(url=new_url)
 
 
 @app.get("/batch/{batch_mode}", include_in_schema=False)
 async def batch_mode_redirect(request: Request, batch_mode: str):
-    session_lang: str = request.session['language']
-    new_url = get_link_for_lang(url=request.url, lang=session_lang)
+    current_lang: str = request.state.lang
+    new_url = get_link_for_lang(url=request.url, lang=current_lang)
     return RedirectResponse(url=new_url)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.render())
+
+
 @app.get("/{lang}", include_in_schema=False)
 async def home(lang: str, request: Request):
-    session_lang: str = request.session['language']
-    if lang != session_lang:
-        return RedirectResponse(url=request.url_for('home', lang=session_lang))
+    current_lang: str = request.state.lang
+    if lang != current_lang:
+        return RedirectResponse(url=request.url_for('home', lang=current_lang))
 
+    settings: Settings = request.app.state.settings
+    cache_page(request, ttl_sec=settings.app_config.page_cache_ttl)
     return templates.TemplateResponse(
         request=request,
         name="home.html.jinja",
@@ -163,15 +268,15 @@ async def home(lang: str, request: Request):
 
 @app.get("/{lang}/batch", response_class=HTMLResponse)
 async def batch(request: Request, lang: str):
-    session_lang: str = request.session['language']
-    return RedirectResponse(url=request.url_for('scope_overrun', lang=session_lang, batch_mode='scope-overrun'))
+    current_lang: str = request.state.lang
+    return RedirectResponse(url=request.url_for('scope_overrun', lang=current_lang, batch_mode='scope-overrun'))
 
 
 @app.get("/{lang}/timeline", response_class=HTMLResponse)
 async def timeline(request: Request, lang: str, issue: Optional[str] = None):
-    session_lang: str = request.session['language']
-    if lang != session_lang:
-        base_url = request.url_for('timeline', lang=session_lang)
+    current_lang: str = request.state.lang
+    if lang != current_lang:
+        base_url = request.url_for('timeline', lang=current_lang)
         if issue:
             return RedirectResponse(url=base_url.include_query_params(issue=issue))
         return RedirectResponse(url=base_url)
@@ -182,19 +287,62 @@ async def timeline(request: Request, lang: str, issue: Optional[str] = None):
     context = get_basic_html_context(request)
     target_template = "timeline_empty.html.jinja"
 
+    if issue and len(issue) > 0:
+        if settings.app_config.timeline_streaming:
+            return get_timeline_stream_response(request=request, context=context, issue=issue, tz=tz)
+        await load_timeline_context(context=context,
+                                    _=_,
+                                    settings=settings,
+                                    issue=issue,
+                                    data=get_timeline_page_data(lang=current_lang,
+                                                                issue_id=issue,
+                                                                tz=tz,
+                                                                settings=settings,
+                                                                compute_pool=request.app.state.compute_pool,
+                                                                plotly_js=assets.url('js/plotly.min.js')))
+        if 'error_text' not in context:
+            target_template = "timeline.html.jinja"
+            cache_issue_page(request=request, settings=settings, page_data=context)
+    else:
+        set_error(context=context,
+                  is_error=False,
+                  text=_('base.service_wip') % dict(support_person=settings.app_config.support_person))
+        cache_page(request, ttl_sec=settings.app_config.page_cache_ttl)
+    return templates.TemplateResponse(
+        request=request,
+        name=target_template,
+        context=context
+    )
+
+
+def cache_issue_page(request: Request, settings: Settings, page_data: dict[str, Any]) -> None:
+    """Страница задачи хранится, пока задача не изменилась (проверяется перед каждой отдачей из кэша).
+    Страница незавершённой задачи зависит ещё и от текущего времени (открытые интервалы длятся до «сейчас»),
+    поэтому не хранится"""
+    issue_id, updated = page_data['id'], page_data['updated']
+    if updated is None or not page_data['is_resolved']:
+        return
+    helper = YouTrackHelper(instance_url=settings.app_config.host,
+                            api_key=settings.app_config.api_key)
+
+    async def is_fresh() -> bool:
+        return await helper.get_issue_updated(issue_id) == updated
+
+    cache_page(request,
+               ttl_sec=settings.app_config.page_cache_ttl,
+               surrogate_keys=[issue_surrogate_key(issue_id)],
+               is_fresh=is_fresh)
+
+
+async def load_timeline_context(context: Any,
+                                _: Callable[[str], str],
+                                settings: Settings,
+                                issue: str,
+                                data: Awaitable[dict[str, Any]]) -> None:
+    """Дописывает в `context` данные задачи или текст ошибки для пользователя"""
     try:
         try:
-            if issue and len(issue) > 0:
-                data = await get_timeline_page_data(translator=_,
-                                                    issue_id=issue,
-                                                    tz=tz,
-                                                    settings=settings)
-                context |= data
-                target_template = "timeline.html.jinja"
-            else:
-                set_error(context=context,
-                          is_error=False,
-                          text=_('base.service_wip') % dict(support_person=settings.app_config.support_person))
+            context |= await data
         except ClientResponseError as e:
             if e.status != status.HTTP_404_NOT_FOUND:
                 raise  # Catch later
@@ -203,15 +351,63 @@ async def timeline(request: Request, lang: str, issue: Optional[str] = None):
     except InvalidIssueIdError:
         set_error(context=context,
                   text=_("base.invalid_issue_id_or_url") % dict(issue_id=issue))
+    except UpstreamUnavailableError as e:
+        set_error(context=context,
+                  text=_("base.youtrack_unavailable") % dict(retry_after=math.ceil(e.retry_after)))
     except Exception as e:
         logger.exception(msg=e)
         set_error(context=context,
                   text=_("base.unable_to_get_info_with_id_and_person") % dict(issue_id=issue,
                                                                               support_person=settings.app_config.support_person))
-    return templates.TemplateResponse(
+
+
+def get_timeline_stream_response(request: Request, context: dict[str, Any], issue: str, tz: timezone) -> StreamingResponse:
+    """Страница timeline по частям: каркас сразу, затем информация о задаче с таблицами, затем график"""
+    _: Callable[[str], str] = request.state.gettext
+    settings: Settings = request.app.state.settings
+    page = TimelinePageStream(lang=request.state.lang,
+                              issue_id=issue,
+                              tz=tz,
+                              settings=settings,
+                              compute_pool=request.app.state.compute_pool,
+                              plotly_js=assets.url('js/plotly.min.js'))
+    context |= language_context(request)  # контекстные процессоры есть только у `templates`
+    page_data: dict[str, Any]|None = None
+
+    async def load_page() -> dict[str, Any]:
+        nonlocal page_data
+        page_context = dict(context)
+        await load_timeline_context(context=page_context, _=_, settings=settings, issue=issue, data=page.get_page_data())
+        if 'error_text' in page_context:
+            return page_context
+        page_data = page_context
+        return {
+            'summary': page_context['summary'],
+            'issue_html': Markup(await stream_templates.render('timeline_issue.html.jinja', page_context))
+        }
+
+    async def load_graph_div() -> str:
+        if page_data is None:
+            return ''
+        try:
+            graph_div = await page.get_graph_div()
+            # Страница без графика (ошибка ниже) не сохраняется
+            cache_issue_page(request=request, settings=settings, page_data=page_data)
+            return graph_div
+        except Exception as e:
+            # Заголовки и таблицы уже у клиента, поэтому просто оставляем заглушку вместо графика
+            logger.exception(msg=e)
+            return ''
+
+    return stream_templates.StreamingTemplateResponse(
         request=request,
-        name=target_template,
-        context=context
+        name='timeline_stream.html.jinja',
+        context=context | {
+            'issue': issue,
+            'load_page': load_page,
+            'load_graph_div': load_graph_div
+        },
+        on_close=page.aclose
     )
 
 
@@ -219,15 +415,16 @@ async def timeline(request: Request, lang: str, issue: Optional[str] = None):
 async def scope_overrun(request: Request,
                         lang: str,
                         batch_mode: str = '',
-                        project: str|None = None,
+                        project: Annotated[list[str], Query()] = [],
                         component: Annotated[list[str], Query()] = [],
                         begin: str|None = None,
-                        end: str|None = None):
-    session_lang: str = request.session['language']
-    if lang != session_lang:
-        base_url = request.url_for('scope_overrun', lang=session_lang, batch_mode=batch_mode)
-        if component or begin or end:
-            return RedirectResponse(url=base_url.include_query_params(component=component, begin=begin, end=end))
+                        end: str|None = None,
+                        refresh: bool = False):
+    current_lang: str = request.state.lang
+    if lang != current_lang:
+        base_url = request.url_for('scope_overrun', lang=current_lang, batch_mode=batch_mode)
+        if project or component or begin or end:
+            return RedirectResponse(url=base_url.include_query_params(project=project, component=component, begin=begin, end=end))
         return RedirectResponse(url=base_url)
 
     if batch_mode not in ('scope-increase', 'scope-overrun'):
@@ -240,43 +437,64 @@ async def scope_overrun(request: Request,
     context |= get_basic_batch_context(translator=_,
                                        settings=settings,
                                        sub_mode=batch_mode)
-    render_template = 'batch.html.jinja'
+    render_template = 'batch.html.jinja' if batch_mode == 'scope-overrun' else 'scope_increase.html.jinja'
+    store: ReportStore = request.app.state.report_store
+    key = ReportKey.from_request(mode=batch_mode, lang=current_lang, projects=project, components=component, begin=begin, end=end)
 
     try:
-        if batch_mode == 'scope-overrun':
-            data = await get_batch_scope_overrun_data(translator=_,
-                                                      settings=settings,
-                                                      project=project,
-                                                      components=component,
-                                                      begin=begin,
-                                                      end=end)
-        elif batch_mode == 'scope-increase':
-            render_template = 'scope_increase.html.jinja'
-            data = await get_batch_scope_increase_data(translator=_,
-                                                       settings=settings,
-                                                       project=project,
-                                                       components=component,
-                                                       begin=begin,
-                                                       end=end)
+        if not refresh and (stored := store.get(key)) is not None:
+            data = stored.data
+            context['report_computed_at'] = stored.computed_at.to_datetime().strftime('%Y-%m-%d %H:%M UTC')
+            context['report_refresh_url'] = str(request.url.include_query_params(refresh=1))
+        elif batch_mode == 'scope-overrun':
+            data = await cancel_on_disconnect(request=request,
+                                              work=batch_admission.run(lambda: get_batch_scope_overrun_data(translator=_,
+                                                                                                            settings=settings,
+                                                                                                            projects=project,
+                                                                                                            components=component,
+                                                                                                            begin=begin,
+                                                                                                            end=end)),
+                                              name=batch_mode)
+            store.put(key, data)
+        elif settings.app_config.batch_streaming and (project or component or begin or end):
+            # Проверяем только параметры, сами данные страница получит через server-sent events
+            validate_scope_increase_params(settings=settings,
+                                           projects=project,
+                                           components=component,
+                                           begin=begin,
+                                           end=end)
+            events_path = request.url_for('scope_increase_events', lang=current_lang).path
+            data = {'dataset': {'streaming': True, 'events_url': f'{events_path}?{request.url.query}'}}
+        else:
+            # Сотни запросов активностей: если пользователь закрыл вкладку, они больше не нужны
+            data = await cancel_on_disconnect(request=request,
+                                              work=batch_admission.run(lambda: get_batch_scope_increase_data(translator=_,
+                                                                                                             settings=settings,
+                                                                                                             projects=project,
+                                                                                                             components=component,
+                                                                                                             begin=begin,
+                                                                                                             end=end)),
+                                              name=batch_mode)
+            store.put(key, data)
         context |= data
         assert 'batch_sub_mode' in context and len(context['batch_sub_mode']), 'Sub mode should be specified'
-    except BadQueryError as e:
-        bad_params_str = ','.join(["'" + param + "'" for param in e.bad_params])
-        set_error(context=context,
-                  text=_('batch.bad_request') % dict(bad_components=bad_params_str))
-    except BadDatesError:
-        set_error(context=context,
-                  text=_('batch.bad_dates'))
-    except UnableToCountIssues:
-        set_error(context=context,
-                  text=_('batch.unable_to_get_issues'))
-    except TooMuchIssuesInBatchError:
-        set_error(context=context,
-                  text=_("batch.too_much_issues") % dict(limit=YouTrackHelper.MAX_ISSUE_COUNT,
-                                                         support_person=settings.app_config.support_person))
+    except ClientDisconnectedError:
+        raise
+    except (OverloadedError, UpstreamUnavailableError) as e:
+        # Быстрый отказ вместо долгого ожидания: форма остаётся, можно повторить позже
+        set_error(context=context, text=get_batch_error_text(e=e, _=_, settings=settings))
+        return templates.TemplateResponse(
+            request=request,
+            name=render_template,
+            context=context,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': str(math.ceil(e.retry_after))}
+        )
     except Exception as e:
-        logger.exception(msg=e)
-        set_error(context=context, text=str(e))
+        set_error(context=context, text=get_batch_error_text(e=e, _=_, settings=settings))
+    else:
+        if not (project or component or begin or end):
+            cache_page(request, ttl_sec=settings.app_config.page_cache_ttl)  # пустая форма
 
     return templates.TemplateResponse(
         request=request,
@@ -285,6 +503,61 @@ async def scope_overrun(request: Request,
     )
 
 
+@app.get("/{lang}/batch/scope-increase/events", include_in_schema=False)
+async def scope_increase_events(request: Request,
+                                lang: str,
+                                project: Annotated[list[str], Query()] = [],
+                                component: Annotated[list[str], Query()] = [],
+                                begin: str|None = None,
+                                end: str|None = None):
+    """Отчёт scope-increase по мере обработки задач (server-sent events)"""
+    current_lang: str = request.state.lang
+    if lang != current_lang:
+        # Поток запрашивает страница с уже проверенным языком: в ключ отчёта попадают только поддерживаемые
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    _: Callable[[str], str] = request.state.gettext
+    settings: Settings = request.app.state.settings
+
+    async def events():
+        key = ReportKey.from_request(mode='scope-increase', lang=current_lang, projects=project, components=component, begin=begin, end=end)
+        try:
+            async with batch_admission.admit():
+                async for event in store_scope_increase_events(events=get_batch_scope_increase_events(translator=_,
+                                                                                                      settings=settings,
+                                                                                                      projects=project,
+                                                                                                      components=component,
+                                                                                                      begin=begin,
+                                                                                                      end=end),
+                                                               store=request.app.state.report_store,
+                                                               key=key):
+                    yield event
+        except Exception as e:
+            # Не `error`: это имя занято встроенным событием EventSource
+            yield 'failure', {'text': get_batch_error_text(e=e, _=_, settings=settings)}
+
+    return EventStreamResponse(events())
+
+
+def get_batch_error_text(e: Exception, _: Callable[[str], str], settings: Settings) -> str:
+    if isinstance(e, BadQueryError):
+        bad_params_str = ','.join(["'" + param + "'" for param in e.bad_params])
+        return _('batch.bad_request') % dict(bad_components=bad_params_str)
+    if isinstance(e, BadDatesError):
+        return _('batch.bad_dates')
+    if isinstance(e, UnableToCountIssues):
+        return _('batch.unable_to_get_issues')
+    if isinstance(e, OverloadedError):
+        return _('batch.overloaded') % dict(retry_after=e.retry_after)
+    if isinstance(e, UpstreamUnavailableError):
+        return _('base.youtrack_unavailable') % dict(retry_after=math.ceil(e.retry_after))
+    if isinstance(e, TooMuchIssuesInBatchError):
+        return _("batch.too_much_issues") % dict(limit=YouTrackHelper.MAX_ISSUE_COUNT,
+                                                 support_person=settings.app_config.support_person)
+    logger.exception(msg=e)
+    return str(e)
+
+
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException) -> HTMLResponse:
     context = get_basic_html_context(request)
@@ -296,6 +569,12 @@ async def not_found_handler(request: Request, exc: HTTPException) -> HTMLRespons
     )
 
 
+@app.exception_handler(ClientDisconnectedError)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnectedError) -> Response:
+    # Ответ никто не получит, код - как в логах nginx
+    return Response(status_code=499)
+
+
 @app.exception_handler(Exception)
 async def internal_error_handler(request: Request, exc: Exception) -> HTMLResponse:
     context = get_basic_html_context(request)
@@ -0,0 +1,152 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Запуск с предзагрузкой: `python -m app.serve --host 0.0.0.0 --port 8080 --workers 4`
+
+Родительский процесс один раз загружает настройки (в т.ч. запросами к YouTrack), собирает статику,
+компилирует шаблоны и импортирует тяжёлые модули, после чего порождает воркеры через `fork`.
+Воркеры получают всё это готовым и делят память с родителем (copy-on-write), поэтому время
+старта и нагрузка на YouTrack не зависят от числа воркеров. Упавший воркер перезапускается.
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from .settings import Settings
+from .utils.log import logger
+
+
+RESPAWN_DELAY_SEC = 1.0  # чтобы постоянно падающий воркер не загружал машину
+
+
+def preload() -> Settings:
+    """Всё, что одинаково для всех воркеров"""
+    from . import main
+    settings = asyncio.run(main.load_settings())
+    if not settings.app_config.session_secret_key:
+        # Общий для всех воркеров (но не для перезапусков): сессии не теряются при смене воркера
+        settings.app_config.session_secret_key = os.urandom(24).hex()
+    main.build_assets(main.assets)
+
+    # Скомпилированные шаблоны кэшируются окружением
+    for env in (main.templates.env, main.stream_templates.env):
+        for name in env.list_templates(filter_func=lambda x: x.endswith('.jinja')):
+            env.get_template(name)
+
+    # В одном процессе они импортируются лениво, при первом графике; здесь - один раз на все воркеры
+    import pandas  # noqa: F401
+    import plotly.express  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+    import plotly.io  # noqa: F401
+    return settings
+
+
+def run_worker(sock: socket.socket) -> None:
+    from .main import app
+    config = uvicorn.Config(app, lifespan='on')
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    """Порождает воркеры и перезапускает упавшие, пока не получит SIGINT/SIGTERM"""
+
+    def __init__(self, sock: socket.socket, workers: int):
+        self.sock = sock
+        self.workers = workers
+        self.__pids: set[int] = set()
+        self.__stopping = False
+
+    def run(self) -> None:
+        signal.signal(signal.SIGINT, self.__on_signal)
+        signal.signal(signal.SIGTERM, self.__on_signal)
+        for _ in range(self.workers):
+            self.__spawn()
+        while self.__pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            self.__pids.discard(pid)
+            if not self.__stopping:
+                logger.warning(f'Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting')
+                time.sleep(RESPAWN_DELAY_SEC)
+                self.__spawn()
+        logger.info('All workers stopped')
+
+    def __spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.sock)
+            except BaseException as e:
+                logger.exception(msg=e)
+                code = 1
+            finally:
+                os._exit(code)
+        logger.info(f'Started worker {pid}')
+        self.__pids.add(pid)
+
+    def __on_signal(self, signum: int, frame) -> None:
+        self.__stopping = True
+        for pid in self.__pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m app.serve', description='Run the service with preloaded settings in forked workers')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        sys.exit('app.serve requires fork(), use `uvicorn app.main:app` on this platform')
+
+    begin = time.monotonic()
+    settings = preload()
+    from .main import app
+    app.state.settings = settings
+
+    sock = socket.socket(socket.AF_INET6 if ':' in args.host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.set_inheritable(True)
+    logger.info(f'Preloaded in {time.monotonic() - begin:.1f} sec, serving on {args.host}:{args.port} with {args.workers} workers')
+
+    # Всё загруженное - в постоянное поколение: сборщик мусора не трогает эти объекты
+    # и не копирует общие с родителем страницы памяти в воркеры
+    gc.freeze()
+    Supervisor(sock=sock, workers=args.workers).run()
+
+
+if __name__ == '__main__':
+    main()
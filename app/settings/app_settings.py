@@ -13,12 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from datetime import time
 from typing import Annotated, Tuple, Type
 from pydantic import BaseModel, AfterValidator, Field
 from pydantic_settings import BaseSettings, PydanticBaseSettingsSource, JsonConfigSettingsSource
 from pathlib import Path
 
 from ..validators import api_key_validator, host_validator, iso8601_date_validator
+from ..utils.compute import ComputeExecutorKind
 from youtrack.utils.duration import Duration
 from youtrack.entities import CustomFields
 
@@ -42,10 +44,34 @@ class AppSettings(BaseSettings):
     host: Annotated[str, AfterValidator(host_validator)]
     api_key: Annotated[str, AfterValidator(api_key_validator), Field(repr=False)]  # hide field from output
     support_person: str
+    session_secret_key: Annotated[str|None, Field(repr=False)] = None  # подпись cookie сессии; None — случайный ключ у каждого воркера
     debug: bool = False
     custom_fields: CustomFields = CustomFields.default_config()  # какие поля брать при парсинге
     date_presets: list[DatePreset] = Field(default_factory=list)
     projects: dict[str, ProjectSettings] = Field(default_factory=dict)  # настроики по проектам
+    compute_executor: ComputeExecutorKind = 'thread'  # где выполнять парсинг и построение графиков
+    compute_workers: int|None = None  # None - по умолчанию для выбранного executor'а
+    timeline_streaming: bool = True  # отдавать страницу timeline по частям: каркас, таблицы, график
+    batch_streaming: bool = True  # заполнять отчёт scope-increase по мере обработки задач (server-sent events)
+    batch_cache_ttl: float = 300  # сколько хранить выборку задач проекта для batch-отчётов, сек (0 — не хранить)
+    batch_max_concurrent: int = 2  # сколько batch-отчётов строится одновременно (в одном воркере)
+    batch_max_queue: int = 8  # сколько отчётов может ждать своей очереди; остальным сразу 503
+    batch_queue_timeout: float = 10  # сколько отчёт может ждать в очереди, сек
+    upstream_max_concurrent: int = 16  # сколько запросов к YouTrack воркер выполняет одновременно
+    upstream_reserved_interactive: int = 4  # сколько из них недоступно batch-отчётам (остаются для timeline)
+    upstream_rate_limit: float|None = None  # запросов к YouTrack в секунду со всех воркеров машины (лимит API-ключа); None — без лимита
+    upstream_rate_burst: int = 10  # сколько запросов можно сделать сразу, без ожидания токенов
+    upstream_rate_file: str|None = None  # файл общей корзины токенов; None — в приватном (0700) каталоге во временном
+    upstream_breaker_threshold: int = 5  # после стольких отказов YouTrack подряд запросы к эндпоинту сразу завершаются ошибкой
+    upstream_breaker_reset: float = 15  # через сколько секунд после этого пробовать снова
+    upstream_retry_ratio: float = 0.2  # повторы неудачных запросов - не больше этой доли от всех запросов
+    precompute_at: time|None = None  # когда (UTC) пересчитывать отчёты по пресетам дат; None — не пересчитывать
+    precompute_on_start: bool = False  # пересчитывать и при старте, не дожидаясь precompute_at
+    precompute_dir: str|None = None  # где хранить отчёты (общие для воркеров); None — в приватном (0700) каталоге во временном
+    page_cache_ttl: float = 300  # сколько хранить отрендеренные страницы (главная, пустые формы, timeline), сек (0 — не хранить)
+    page_cache_max_bytes: int = 64 * 1024 * 1024  # ограничение суммарного размера страниц в кэше
+    loop_monitor_interval: float = 0.25  # период замера задержки event loop, сек
+    slow_callback_threshold: float = 0.2  # блокировки event loop дольше этого попадают в лог, сек
 
     @classmethod
     def settings_customise_sources(
@@ -15,11 +15,13 @@
 
 
 from .app_settings import AppSettings
+from ..utils.ttl_cache import AsyncTtlCache
 from youtrack.instance import YouTrackInstanceConfig
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
 class Settings:
     app_config: AppSettings
     yt_config: YouTrackInstanceConfig
+    batch_cache: AsyncTtlCache = field(default_factory=AsyncTtlCache, repr=False, compare=False)  # выборки задач по проектам
@@ -0,0 +1,93 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import pytest
+
+from ..utils.admission import AdmissionController, OverloadedError
+
+
+async def hold(controller: AdmissionController, release: asyncio.Event, order: list[int], i: int) -> None:
+    async with controller.admit():
+        order.append(i)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_queue_is_fifo():
+    controller = AdmissionController(name='test', max_concurrent=1, max_queue=5, max_wait_sec=5)
+    release = asyncio.Event()
+    order: list[int] = []
+    tasks = []
+    for i in range(4):
+        tasks.append(asyncio.create_task(hold(controller, release, order, i)))
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+    assert (controller.active, controller.queued) == (1, 3)
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2, 3]
+    assert (controller.active, controller.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_rejected_when_queue_is_full():
+    controller = AdmissionController(name='test', max_concurrent=1, max_queue=1, max_wait_sec=5)
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(hold(controller, release, [], i)) for i in range(2)]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(OverloadedError) as e:
+        await controller.run(asyncio.sleep)
+    assert e.value.retry_after >= 1
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout():
+    controller = AdmissionController(name='test', max_concurrent=1, max_queue=5, max_wait_sec=0.01)
+    release = asyncio.Event()
+    task = asyncio.create_task(hold(controller, release, [], 0))
+    await asyncio.sleep(0)
+
+    with pytest.raises(OverloadedError):
+        async with controller.admit():
+            pass
+    assert controller.queued == 0
+    release.set()
+    await task
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    controller = AdmissionController(name='test', max_concurrent=1, max_queue=5, max_wait_sec=5)
+    release = asyncio.Event()
+    order: list[int] = []
+    first = asyncio.create_task(hold(controller, release, order, 0))
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(hold(controller, release, order, 1))
+    last = asyncio.create_task(hold(controller, release, order, 2))
+    await asyncio.sleep(0.01)
+
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+    release.set()
+    await asyncio.gather(first, last)
+    assert order == [0, 2]
+    assert (controller.active, controller.queued) == (0, 0)
@@ -0,0 +1,101 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from pathlib import Path
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+import gzip
+import pytest
+
+from ..utils.assets import AssetManifest, AssetFiles, IMMUTABLE_CACHE_CONTROL
+
+
+SCRIPT = b'console.log("hello");\n' * 100
+STYLE = b'@font-face { src: url("./fonts/icons.woff2?abcdef") format("woff2"), url(fonts/icons.woff#iefix); }\n' \
+        b'.logo { background: url(data:image/png;base64,AAAA); }\n'
+
+
+@pytest.fixture
+def source_dir(tmp_path: Path) -> Path:
+    source = tmp_path / 'static'
+    (source / 'js').mkdir(parents=True)
+    (source / 'css' / 'fonts').mkdir(parents=True)
+    (source / 'js' / 'app.js').write_bytes(SCRIPT)
+    (source / 'css' / 'style.css').write_bytes(STYLE)
+    (source / 'css' / 'fonts' / 'icons.woff2').write_bytes(b'woff2')
+    (source / 'css' / 'fonts' / 'icons.woff').write_bytes(b'woff')
+    return source
+
+
+def test_fallback_before_build():
+    assert AssetManifest().url('js/app.js') == '/static/js/app.js'
+
+
+def test_build(tmp_path: Path, source_dir: Path):
+    output = tmp_path / 'assets'
+    manifest = AssetManifest()
+    manifest.build(source_dir=source_dir, output_dir=output)
+
+    assert len(manifest) == 4
+    url = manifest.url('js/app.js')
+    assert url.startswith('/assets/js/app.') and url.endswith('.js')
+    built = output / url.removeprefix('/assets/')
+    assert built.read_bytes() == SCRIPT
+    assert gzip.decompress(Path(f'{built}.gz').read_bytes()) == SCRIPT
+
+    # Шрифты слишком малы, чтобы сжатие окупилось
+    font = manifest.url('css/fonts/icons.woff2').removeprefix('/assets/css/')
+    assert not (output / 'css' / f'{font}.gz').exists()
+
+    style = (output / manifest.url('css/style.css').removeprefix('/assets/')).read_text()
+    assert f'url("{font}")' in style
+    assert f'url({manifest.url("css/fonts/icons.woff").removeprefix("/assets/css/")}#iefix)' in style
+    assert 'url(data:image/png;base64,AAAA)' in style
+
+
+def test_hash_follows_content(tmp_path: Path, source_dir: Path):
+    manifest = AssetManifest()
+    manifest.build(source_dir=source_dir, output_dir=tmp_path / 'assets')
+    script, style = manifest.url('js/app.js'), manifest.url('css/style.css')
+
+    # Новый шрифт меняет и ссылающийся на него CSS
+    (source_dir / 'css' / 'fonts' / 'icons.woff2').write_bytes(b'new woff2')
+    manifest.build(source_dir=source_dir, output_dir=tmp_path / 'assets')
+    assert manifest.url('js/app.js') == script
+    assert manifest.url('css/style.css') != style
+
+
+def test_serve(tmp_path: Path, source_dir: Path):
+    output = tmp_path / 'assets'
+    manifest = AssetManifest()
+    manifest.build(source_dir=source_dir, output_dir=output)
+    client = TestClient(Starlette(routes=[Mount('/assets', AssetFiles(directory=output))]))
+    url = manifest.url('js/app.js')
+
+    response = client.get(url, headers={'accept-encoding': 'gzip, deflate;q=0.5'})
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['content-type'].startswith('text/javascript')
+    assert response.headers['cache-control'] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.content == SCRIPT  # httpx распаковывает сам
+
+    response = client.get(url, headers={'accept-encoding': 'identity'})
+    assert 'content-encoding' not in response.headers
+    assert response.content == SCRIPT
+
+    assert client.get('/assets/js/missing.js').status_code == 404
@@ -0,0 +1,88 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from starlette.requests import Request
+import asyncio
+import pytest
+
+from ..utils.disconnect import ClientDisconnectedError, cancel_on_disconnect
+from ..utils.metrics import metrics
+
+
+def make_request(disconnect_after: float|None) -> Request:
+    """GET-запрос, клиент которого отключается через `disconnect_after` сек (None - не отключается)"""
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(disconnect_after if disconnect_after is not None else 3600)
+        return {'type': 'http.disconnect'}
+
+    return Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': []}, receive)
+
+
+class Work:
+    def __init__(self, duration: float):
+        self.duration = duration
+        self.finished = False
+        self.cancelled = False
+
+    async def __call__(self) -> str:
+        try:
+            await asyncio.sleep(self.duration)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        self.finished = True
+        return 'done'
+
+
+@pytest.mark.asyncio
+async def test_result_if_client_waits():
+    work = Work(duration=0.01)
+    assert await cancel_on_disconnect(make_request(disconnect_after=None), work(), name='test') == 'done'
+    assert work.finished
+
+
+@pytest.mark.asyncio
+async def test_cancelled_on_disconnect():
+    cancelled = metrics.counter('requests_cancelled_total', '').get(route='test')
+    work = Work(duration=10)
+    with pytest.raises(ClientDisconnectedError):
+        await asyncio.wait_for(cancel_on_disconnect(make_request(disconnect_after=0.01), work(), name='test'), timeout=1)
+    assert work.cancelled
+    assert metrics.counter('requests_cancelled_total', '').get(route='test') == cancelled + 1
+
+
+@pytest.mark.asyncio
+async def test_error_is_propagated():
+    async def fail():
+        raise ValueError('Boom')
+
+    with pytest.raises(ValueError):
+        await cancel_on_disconnect(make_request(disconnect_after=None), fail(), name='test')
+
+
+@pytest.mark.asyncio
+async def test_handler_cancellation_cancels_work():
+    work = Work(duration=10)
+    handler = asyncio.create_task(cancel_on_disconnect(make_request(disconnect_after=None), work(), name='test'))
+    await asyncio.sleep(0.01)
+    handler.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await handler
+    assert work.cancelled
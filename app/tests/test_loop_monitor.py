@@ -0,0 +1,119 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from fastapi import FastAPI
+import asyncio
+import httpx
+import logging
+import pytest
+import time
+
+from ..utils.loop_monitor import LoopMonitor, LoopMonitorMiddleware
+from ..utils.metrics import metrics, MetricsRegistry
+
+
+def blocking_handler():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_reports_stall(caplog: pytest.LogCaptureFixture):
+    stalls = metrics.counter('event_loop_stalls_total', '')
+    stalls_before = stalls.get()
+
+    monitor = LoopMonitor(interval=0.02, threshold=0.1)
+    monitor.start()
+    monitor.describe_current_task('GET /en/timeline?issue=id-1')
+    try:
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING, logger='yt_analyzer'):
+            blocking_handler()
+            await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    assert stalls.get() == stalls_before + 1
+    assert metrics.gauge('event_loop_lag_max_seconds', '').get() >= 0.2
+
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert 'GET /en/timeline?issue=id-1' in message
+    assert 'blocking_handler' in message
+
+
+@pytest.mark.asyncio
+async def test_stalls_are_labeled_by_route():
+    stalls = metrics.counter('event_loop_stalls_by_request_total', '')
+    app = FastAPI()
+    monitor = LoopMonitor(interval=0.02, threshold=0.1)
+
+    @app.get('/{lang}/timeline')
+    async def timeline(lang: str):
+        await asyncio.sleep(0.05)
+        blocking_handler()
+        await asyncio.sleep(0.05)
+        return {}
+
+    app.add_middleware(LoopMonitorMiddleware, monitor=monitor)
+    before = stalls.get(route='GET /{lang}/timeline')
+    monitor.start()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+            await client.get('/en/timeline?issue=id-1')
+    finally:
+        await monitor.stop()
+
+    # Шаблон маршрута, а не путь с параметрами
+    assert stalls.get(route='GET /{lang}/timeline') == before + 1
+    assert all('/en/' not in dict(labels)['route'] for labels, _ in stalls.samples())
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_quiet_without_stalls(caplog: pytest.LogCaptureFixture):
+    monitor = LoopMonitor(interval=0.02, threshold=0.1)
+    monitor.start()
+    with caplog.at_level(logging.WARNING, logger='yt_analyzer'):
+        await asyncio.sleep(0.2)
+    await monitor.stop()
+    assert caplog.records == []
+
+
+def test_metrics_render():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests')
+    requests.inc()
+    requests.inc(2, endpoint='issues')
+    lag = registry.gauge('lag_seconds', 'Lag')
+    lag.set_max(0.5)
+    lag.set_max(0.1)
+
+    assert registry.counter('requests_total', 'Requests') is requests
+    with pytest.raises(ValueError):
+        registry.gauge('requests_total', 'Requests')
+
+    assert registry.render() == (
+        '# HELP requests_total Requests\n'
+        '# TYPE requests_total counter\n'
+        'requests_total 1.0\n'
+        'requests_total{endpoint="issues"} 2.0\n'
+        '# HELP lag_seconds Lag\n'
+        '# TYPE lag_seconds gauge\n'
+        'lag_seconds 0.5\n'
+    )
+
+    # Значения меток экранируются
+    registry.counter('stalls_total', 'Stalls').inc(route='GET /a"b\\c')
+    assert registry.render().endswith('stalls_total{route="GET /a\\"b\\\\c"} 1.0\n')
@@ -0,0 +1,167 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+import time
+import pytest
+
+from ..utils.page_cache import PageCache, PageCacheMiddleware, CachedPage, cache_page
+
+
+class Backend:
+    """Приложение со страницами, которые считают свои вызовы"""
+
+    def __init__(self, max_bytes: int = 1024 * 1024):
+        self.calls = 0
+        self.issue_version = 1
+        self.cache = PageCache(max_bytes=max_bytes)
+
+        async def page(request: Request):
+            self.calls += 1
+            cache_page(request, ttl_sec=60)
+            return PlainTextResponse(f'page {self.calls} {request.query_params}')
+
+        async def issue(request: Request):
+            self.calls += 1
+            version = self.issue_version
+
+            async def is_fresh() -> bool:
+                return self.issue_version == version
+
+            cache_page(request, ttl_sec=60, surrogate_keys=[f'issue:{request.path_params["id"]}'], is_fresh=is_fresh)
+            return PlainTextResponse(f'issue {version}')
+
+        async def not_cached(request: Request):
+            self.calls += 1
+            return PlainTextResponse('dynamic')
+
+        async def with_cookie(request: Request):
+            self.calls += 1
+            cache_page(request, ttl_sec=60)
+            response = PlainTextResponse('cookie')
+            response.set_cookie('user', '1')
+            return response
+
+        async def stream(request: Request):
+            self.calls += 1
+
+            async def generate():
+                yield 'part 1, '
+                # Решение о кэшировании принимается, когда часть ответа уже отправлена
+                if request.query_params.get('ok'):
+                    cache_page(request, ttl_sec=60)
+                yield 'part 2'
+
+            return StreamingResponse(generate())
+
+        self.app = Starlette(routes=[Route('/page', page),
+                                     Route('/issue/{id}', issue),
+                                     Route('/dynamic', not_cached),
+                                     Route('/cookie', with_cookie),
+                                     Route('/stream', stream)],
+                             middleware=[Middleware(PageCacheMiddleware, cache=self.cache)])
+        self.client = TestClient(self.app)
+
+
+@pytest.mark.parametrize('path', ['/page', '/issue/id-1', '/stream?ok=1'])
+def test_second_request_is_cached(path: str):
+    backend = Backend()
+    first = backend.client.get(path)
+    second = backend.client.get(path)
+    assert first.text == second.text
+    assert backend.calls == 1
+    assert second.headers['etag']
+
+
+@pytest.mark.parametrize('path', ['/dynamic', '/cookie', '/stream', '/missing'])
+def test_not_cacheable(path: str):
+    backend = Backend()
+    backend.client.get(path)
+    backend.client.get(path)
+    assert len(backend.cache) == 0
+
+
+def test_key_includes_query():
+    backend = Backend()
+    assert backend.client.get('/page?a=1').text == 'page 1 a=1'
+    assert backend.client.get('/page?a=2').text == 'page 2 a=2'
+    assert backend.client.get('/page?a=1').text == 'page 1 a=1'
+
+
+def test_not_modified():
+    backend = Backend()
+    backend.client.get('/page')
+    etag = backend.client.get('/page').headers['etag']
+
+    response = backend.client.get('/page', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert backend.client.get('/page', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_stored_response_has_same_etag():
+    backend = Backend()
+    first = backend.client.get('/page')
+    assert first.headers['etag'] == backend.client.get('/page').headers['etag']
+    assert first.headers['cache-control'] == 'no-cache'
+
+    # Клиент, получивший страницу при сохранении, сразу может проверить её через If-None-Match
+    assert backend.client.get('/page', headers={'If-None-Match': first.headers['etag']}).status_code == 304
+    assert 'etag' not in backend.client.get('/dynamic').headers
+
+
+def test_changed_source_invalidates_surrogate_key():
+    backend = Backend()
+    backend.client.get('/issue/id-1')
+    backend.client.get('/issue/id-1?tab=graph')
+    backend.client.get('/issue/id-2')
+    assert len(backend.cache) == 3
+
+    backend.issue_version = 2
+    assert backend.client.get('/issue/id-1').text == 'issue 2'
+    # Вторая страница той же задачи сброшена вместе с первой
+    assert len(backend.cache) == 2
+    assert backend.client.get('/issue/id-1?tab=graph').text == 'issue 2'
+
+
+def make_page(size: int, ttl_sec: float = 60, surrogate_keys: tuple[str, ...] = ()) -> CachedPage:
+    return CachedPage(status=200, headers=[], body=b'x' * size, expires_at=time.monotonic() + ttl_sec, surrogate_keys=surrogate_keys)
+
+
+def test_memory_bound():
+    cache = PageCache(max_bytes=250)
+    cache.put(('en', '/a', b''), make_page(100))
+    cache.put(('en', '/b', b''), make_page(100))
+    cache.get(('en', '/a', b''))
+    cache.put(('en', '/c', b''), make_page(100))  # вытесняет давно не использованную '/b'
+
+    assert cache.size == 200
+    assert cache.get(('en', '/b', b'')) is None
+    assert cache.get(('en', '/a', b'')) is not None
+    cache.put(('en', '/d', b''), make_page(300))  # больше всего кэша - не сохраняется
+    assert cache.get(('en', '/d', b'')) is None
+
+
+def test_expired_page():
+    cache = PageCache()
+    cache.put(('en', '/a', b''), make_page(10, ttl_sec=0))
+    assert cache.get(('en', '/a', b'')) is None
+    assert cache.size == 0
@@ -0,0 +1,61 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import Callable
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from ..utils.sessions import DeferredSessionMiddleware
+
+
+def make_worker(secret_key: str|None, get_secret_key: Callable[[], str|None]|None = None) -> Starlette:
+    """Отдельный экземпляр приложения - как отдельный воркер"""
+    async def write(request: Request):
+        request.session['language'] = 'ru'
+        return PlainTextResponse('')
+
+    async def read(request: Request):
+        return PlainTextResponse(request.session.get('language', ''))
+
+    return Starlette(routes=[Route('/write', write), Route('/read', read)],
+                     middleware=[Middleware(DeferredSessionMiddleware, get_secret_key=get_secret_key or (lambda: secret_key))])
+
+
+def test_workers_share_sessions_with_same_key():
+    cookies = TestClient(make_worker('secret')).get('/write').cookies
+
+    assert TestClient(make_worker('secret'), cookies=cookies).get('/read').text == 'ru'
+    assert TestClient(make_worker('other'), cookies=cookies).get('/read').text == ''
+
+
+def test_random_key_without_config():
+    first = TestClient(make_worker(None))
+    first.get('/write')
+    assert first.get('/read').text == 'ru'
+    assert TestClient(make_worker(None), cookies=first.cookies).get('/read').text == ''
+
+
+def test_key_is_requested_on_first_request():
+    config = {'secret_key': None}
+    client = TestClient(make_worker(secret_key=None, get_secret_key=lambda: config['secret_key']))
+
+    config['secret_key'] = 'secret'  # как настройки, прочитанные в lifespan после создания приложения
+    client.get('/write')
+    assert TestClient(make_worker('secret'), cookies=client.cookies).get('/read').text == 'ru'
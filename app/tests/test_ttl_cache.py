@@ -0,0 +1,116 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import pytest
+
+from ..utils.ttl_cache import AsyncTtlCache
+
+
+def make_factory(value, delay: float = 0):
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(delay)
+        return value
+
+    return factory, lambda: calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_computation():
+    cache = AsyncTtlCache()
+    factory, calls = make_factory('value', delay=0.01)
+
+    results = await asyncio.gather(*[cache.get('key', factory, ttl_sec=10) for _ in range(5)])
+
+    assert results == ['value'] * 5
+    assert calls() == 1
+    assert (cache.hits, cache.misses) == (4, 1)
+
+
+@pytest.mark.asyncio
+async def test_expired_value_is_recomputed():
+    cache = AsyncTtlCache()
+    factory, calls = make_factory('value')
+
+    await cache.get('key', factory, ttl_sec=0.01)
+    await cache.get('key', factory, ttl_sec=0.01)
+    assert calls() == 1
+    await asyncio.sleep(0.02)
+    await cache.get('key', factory, ttl_sec=0.01)
+    assert calls() == 2
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_disables_cache():
+    cache = AsyncTtlCache()
+    factory, calls = make_factory('value')
+
+    await cache.get('key', factory, ttl_sec=0)
+    await cache.get('key', factory, ttl_sec=0)
+    assert calls() == 2
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_exceptions_are_not_cached():
+    cache = AsyncTtlCache()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        raise RuntimeError('Boom')
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await cache.get('key', failing, ttl_sec=10)
+    assert calls == 2
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_is_evicted():
+    cache = AsyncTtlCache(max_entries=2)
+    factory, calls = make_factory('value')
+
+    await cache.get('a', factory, ttl_sec=10)
+    await cache.get('b', factory, ttl_sec=10)
+    await cache.get('a', factory, ttl_sec=10)
+    await cache.get('c', factory, ttl_sec=10)  # вытесняет 'b'
+    assert len(cache) == 2
+    await cache.get('a', factory, ttl_sec=10)
+    assert calls() == 3
+    await cache.get('b', factory, ttl_sec=10)
+    assert calls() == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_computation():
+    cache = AsyncTtlCache()
+    factory, calls = make_factory('value', delay=0.02)
+
+    first = asyncio.create_task(cache.get('key', factory, ttl_sec=10))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.get('key', factory, ttl_sec=10))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 'value'
+    assert calls() == 1
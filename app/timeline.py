@@ -14,17 +14,14 @@
 # limitations under the License.
 
 
+import asyncio
 import collections
 from datetime import timezone
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as ex
-import plotly.io as pio
 from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Callable
+from typing import Any, Callable
 
-from youtrack.utils.anomalies import AnomaliesDetector, OverdueAnomaly
+from youtrack.utils.anomalies import Anomaly, AnomaliesDetector, OverdueAnomaly
 from youtrack.utils.timestamp import Timestamp
 from youtrack.utils.duration import Duration
 from youtrack.utils.others import is_empty
@@ -33,6 +30,8 @@ from youtrack.helper import YouTrackHelper
 from youtrack.entities import IssueInfo, WorkItem, get_workitem_business_duration
 
 from .settings import Settings, AppSettings
+from .language_middleware import get_translator
+from .utils.compute import ComputePool
 
 
 @dataclass
@@ -184,17 +183,158 @@ def get_by_people_info(data: IssueInfo) -> list[dict[str, str]]:
              'percent': round(v.to_seconds() / total_spent_time * 100, 2)} for k, v in cont.items()]
 
 
-async def get_timeline_page_data(translator: Callable[[str], str], issue_id: str, tz: timezone, settings: Settings):
-    _ = translator
+async def get_timeline_page_data(lang: str,
+                                 issue_id: str,
+                                 tz: timezone,
+                                 settings: Settings,
+                                 compute_pool: ComputePool,
+                                 plotly_js: str|bool = True):
+    """Загрузка данных в event loop, всё остальное (парсинг, аналитика, график) - в `compute_pool`.
 
-    two_business_days = Duration.from_minutes(60 * 8 * 2)
-    anomaly_detector = AnomaliesDetector(review_thresshold=two_business_days)
+    `plotly_js` - URL plotly.js или `True`, чтобы встроить библиотеку в страницу"""
     helper = YouTrackHelper(instance_url=settings.app_config.host,
                             api_key=settings.app_config.api_key)
-    data = await helper.get_summary(id=issue_id,
-                                    anomaly_detector=anomaly_detector,
-                                    custom_fields=settings.app_config.custom_fields)
-    anomalies_data = anomaly_detector.get()
+    summary, activities = await helper.get_raw_summary(id=issue_id)
+    return await compute_pool.run(build_timeline_page_data,
+                                  lang=lang,
+                                  issue_id=issue_id,
+                                  summary=summary,
+                                  activities=activities,
+                                  tz=tz,
+                                  app_config=settings.app_config,
+                                  plotly_js=plotly_js)
+
+
+def build_timeline_page_data(lang: str,
+                             issue_id: str,
+                             summary: Any,
+                             activities: Any,
+                             tz: timezone,
+                             app_config: AppSettings,
+                             plotly_js: str|bool = True):
+    """Сырые ответы YouTrack -> контекст шаблона timeline. Без I/O, аргументы и результат сериализуемы"""
+    translator = get_translator(lang)
+    data, anomalies_data = parse_timeline_issue(summary=summary, activities=activities, app_config=app_config)
+    template_data = get_timeline_context(translator, issue_id, data, anomalies_data, app_config)
+    template_data['graph_div'] = get_timeline_graph_div(translator, data, anomalies_data, tz, plotly_js)
+    template_data['updated'] = summary.get('updated')
+    return template_data
+
+
+def build_timeline_tables_data(lang: str, issue_id: str, summary: Any, activities: Any, app_config: AppSettings):
+    """Как `build_timeline_page_data`, но без графика (для потокового ответа)"""
+    data, anomalies_data = parse_timeline_issue(summary=summary, activities=activities, app_config=app_config)
+    template_data = get_timeline_context(get_translator(lang), issue_id, data, anomalies_data, app_config)
+    template_data['updated'] = summary.get('updated')
+    return template_data
+
+
+def build_timeline_graph_div(lang: str,
+                             summary: Any,
+                             activities: Any,
+                             tz: timezone,
+                             app_config: AppSettings,
+                             plotly_js: str|bool = True) -> str:
+    """Только график (для потокового ответа). Парсинг повторяется: он на порядок дешевле самого графика,
+    зато обе части можно считать параллельно в разных воркерах"""
+    data, anomalies_data = parse_timeline_issue(summary=summary, activities=activities, app_config=app_config)
+    return get_timeline_graph_div(get_translator(lang), data, anomalies_data, tz, plotly_js)
+
+
+class TimelinePageStream:
+    """Данные страницы timeline по частям: сначала всё, кроме графика, затем график.
+
+    Обе части считаются в `compute_pool` одновременно, поэтому таблицы не ждут графика"""
+
+    def __init__(self,
+                 lang: str,
+                 issue_id: str,
+                 tz: timezone,
+                 settings: Settings,
+                 compute_pool: ComputePool,
+                 plotly_js: str|bool = True):
+        self.__lang = lang
+        self.__issue_id = issue_id
+        self.__tz = tz
+        self.__settings = settings
+        self.__compute_pool = compute_pool
+        self.__plotly_js = plotly_js
+        self.__graph_task: asyncio.Task|None = None
+
+    async def get_page_data(self) -> dict[str, Any]:
+        helper = YouTrackHelper(instance_url=self.__settings.app_config.host,
+                                api_key=self.__settings.app_config.api_key)
+        summary, activities = await helper.get_raw_summary(id=self.__issue_id)
+        self.__graph_task = asyncio.ensure_future(self.__compute_pool.run(build_timeline_graph_div,
+                                                                          lang=self.__lang,
+                                                                          summary=summary,
+                                                                          activities=activities,
+                                                                          tz=self.__tz,
+                                                                          app_config=self.__settings.app_config,
+                                                                          plotly_js=self.__plotly_js))
+        return await self.__compute_pool.run(build_timeline_tables_data,
+                                             lang=self.__lang,
+                                             issue_id=self.__issue_id,
+                                             summary=summary,
+                                             activities=activities,
+                                             app_config=self.__settings.app_config)
+
+    async def get_graph_div(self) -> str:
+        if self.__graph_task is None:
+            raise RuntimeError('Page data should be requested first')
+        return await self.__graph_task
+
+    async def aclose(self) -> None:
+        """Отмена недосчитанного графика (например, клиент закрыл страницу)"""
+        if self.__graph_task is None:
+            return
+        self.__graph_task.cancel()
+        await asyncio.gather(self.__graph_task, return_exceptions=True)
+
+
+def parse_timeline_issue(summary: Any, activities: Any, app_config: AppSettings) -> tuple[IssueInfo, list[Anomaly]]:
+    two_business_days = Duration.from_minutes(60 * 8 * 2)
+    anomaly_detector = AnomaliesDetector(review_thresshold=two_business_days)
+    data = YouTrackHelper.parse_summary(summary=summary,
+                                        activities=activities,
+                                        anomaly_detector=anomaly_detector,
+                                        custom_fields=app_config.custom_fields)
+    return data, anomaly_detector.get()
+
+
+def get_timeline_context(translator: Callable[[str], str],
+                         issue_id: str,
+                         data: IssueInfo,
+                         anomalies_data: list[Anomaly],
+                         app_config: AppSettings) -> dict[str, Any]:
+    template_data = dict(
+        issue_url=app_config.get_issue_url(issue_id),
+        anomalies=[{
+            'datetime': i.timestamp.to_datetime().isoformat(timespec='minutes'),
+            'responsible': i.responsible,
+            'description': i.to_string(_=translator)
+        } for i in anomalies_data],
+        tables={
+            'detailed': get_detailed_info(data),
+            'by_people': get_by_people_info(data)
+        }
+    )
+    template_data.update(to_dict(data, app_config))
+    return template_data
+
+
+def get_timeline_graph_div(translator: Callable[[str], str],
+                           data: IssueInfo,
+                           anomalies_data: list[Anomaly],
+                           tz: timezone,
+                           plotly_js: str|bool = True) -> str:
+    # pandas и plotly нужны только здесь: импорт при первом графике, а не при старте воркера
+    import pandas as pd
+    import plotly.graph_objects as go
+    import plotly.express as ex
+    import plotly.io as pio
+
+    _ = translator
 
     # Quickfix if there are no workitems
     df_workitems = pd.DataFrame({'Assignee': [],
@@ -359,18 +499,5 @@ async def get_timeline_page_data(translator: Callable[[str], str], issue_id: str
             dict(dtickrange=["M12", None], value="%Y Y")
         ]
     )
-    template_data = dict(
-        issue_url=settings.app_config.get_issue_url(issue_id),
-        graph_div=pio.to_html(fig, full_html=False, div_id='9cc162d8-61cf-4829-aede-73d8b3495197'),
-        anomalies=[{
-            'datetime': i.timestamp.to_datetime().isoformat(timespec='minutes'),
-            'responsible': i.responsible,
-            'description': i.to_string(_=translator)
-        } for i in anomalies_data],
-        tables={
-            'detailed': get_detailed_info(data),
-            'by_people': get_by_people_info(data)
-        }
-    )
-    template_data.update(to_dict(data, settings.app_config))
-    return template_data
+    # URL вместо встроенной библиотеки (~4.5 МБ): браузер кэширует её один раз
+    return pio.to_html(fig, full_html=False, include_plotlyjs=plotly_js, div_id='9cc162d8-61cf-4829-aede-73d8b3495197')
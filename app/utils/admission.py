@@ -0,0 +1,129 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import TypeVar
+import asyncio
+import math
+import time
+
+from .metrics import metrics
+
+
+T = TypeVar('T')
+
+_requests = metrics.counter('admission_requests_total', 'Admission-controlled requests by result (admitted, queued, rejected, timeout)')
+_active = metrics.gauge('admission_active', 'Requests being processed by admission-controlled endpoints')
+_queued = metrics.gauge('admission_queued', 'Requests waiting for admission')
+
+
+class OverloadedError(Exception):
+    """Очередь заполнена или ожидание в ней слишком долгое. `retry_after` - когда стоит повторить, сек"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f'Server is overloaded, retry after {retry_after} sec')
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Ограничение числа одновременно выполняемых дорогих запросов (например, batch-отчётов).
+
+    Сверх `max_concurrent` запросы ждут в очереди (FIFO) не дольше `max_wait_sec`. Если очередь
+    уже заполнена (`max_queue`) или ожидание истекло - `OverloadedError` с оценкой, когда освободится место.
+    Параметры можно менять на ходу."""
+
+    def __init__(self, name: str, max_concurrent: int = 2, max_queue: int = 8, max_wait_sec: float = 10):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait_sec = max_wait_sec
+        self.__active = 0
+        self.__waiters: deque[asyncio.Future] = deque()
+        self.__mean_duration = max_wait_sec  # скользящее среднее время выполнения, для оценки Retry-After
+
+    @property
+    def active(self) -> int:
+        return self.__active
+
+    @property
+    def queued(self) -> int:
+        return len(self.__waiters)
+
+    @property
+    def retry_after(self) -> int:
+        """Примерно через сколько секунд освободится место для нового запроса"""
+        turns = (len(self.__waiters) + 1) / max(self.max_concurrent, 1)
+        return min(max(math.ceil(self.__mean_duration * turns), 1), 300)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        await self.__acquire()
+        begin = time.monotonic()
+        try:
+            yield
+        finally:
+            self.__mean_duration += (time.monotonic() - begin - self.__mean_duration) * 0.2
+            self.__release()
+
+    async def run(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """`factory()` после допуска. Корутина создаётся только если запрос допущен"""
+        async with self.admit():
+            return await factory()
+
+    async def __acquire(self) -> None:
+        if self.__active < self.max_concurrent and not self.__waiters:
+            self.__active += 1
+            self.__update_gauges()
+            _requests.inc(name=self.name, result='admitted')
+            return
+        if len(self.__waiters) >= self.max_queue:
+            _requests.inc(name=self.name, result='rejected')
+            raise OverloadedError(retry_after=self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.__waiters.append(waiter)
+        self.__update_gauges()
+        try:
+            # Место передаёт освободивший его запрос (`__release`), `__active` уже учитывает этот
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait_sec)
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                self.__release()  # место передали одновременно с отменой - отдаём следующему
+            else:
+                waiter.cancel()
+                self.__waiters.remove(waiter)
+                self.__update_gauges()
+            if isinstance(e, TimeoutError):
+                _requests.inc(name=self.name, result='timeout')
+                raise OverloadedError(retry_after=self.retry_after) from None
+            raise
+        _requests.inc(name=self.name, result='queued')
+
+    def __release(self) -> None:
+        while self.__waiters:
+            waiter = self.__waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+        else:
+            self.__active -= 1
+        self.__update_gauges()
+
+    def __update_gauges(self) -> None:
+        _active.set(self.__active, name=self.name)
+        _queued.set(len(self.__waiters), name=self.name)
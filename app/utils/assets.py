@@ -0,0 +1,176 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from pathlib import Path, PurePosixPath
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+import gzip
+import hashlib
+import importlib.util
+import mimetypes
+import os
+import re
+import tempfile
+
+try:
+    import brotli
+except ImportError:  # необязательная зависимость: без неё только gzip
+    brotli = None
+
+from .log import logger
+
+
+STATIC_DIR = Path('app/static')
+ASSETS_DIR = Path('build/assets')  # собранная статика, не в репозитории
+HASH_LENGTH = 12
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+COMPRESSIBLE_SUFFIXES = {'.js', '.css', '.json', '.svg', '.map', '.txt', '.ttf'}
+# (Content-Encoding, суффикс файла) в порядке предпочтения
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_HASHED_NAME_RE = re.compile(rf'\.[0-9a-f]{{{HASH_LENGTH}}}\.[^./]+$')
+_CSS_URL_RE = re.compile(r'''url\(\s*(['"]?)([^'")?#]+)([?#][^'")]*)?\1\s*\)''')
+
+
+def get_plotlyjs_path() -> Path:
+    """plotly.min.js из пакета plotly: версия всегда совпадает с той, что строит графики"""
+    # Сам пакет не импортируется: он нужен только для графиков
+    return Path(importlib.util.find_spec('plotly').origin).parent / 'package_data' / 'plotly.min.js'
+
+
+def build_assets(manifest: 'AssetManifest') -> None:
+    """Статика приложения и plotly.js"""
+    manifest.build(source_dir=STATIC_DIR, output_dir=ASSETS_DIR, extra={'js/plotly.min.js': get_plotlyjs_path()})
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Несколько воркеров могут собирать статику одновременно
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class AssetManifest:
+    """Статика с хешем содержимого в имени (`js/luxon.min.js` -> `js/luxon.min.1a2b3c4d5e6f.js`)
+
+    Такие файлы можно кэшировать навсегда: новое содержимое — новое имя. Рядом кладутся
+    сжатые варианты (`.gz` и, если установлен `brotli`, `.br`). Ссылки `url(...)` в CSS
+    переписываются на имена с хешем. Пока манифест не собран, `url` ведёт на исходный файл.
+    """
+
+    def __init__(self, url_prefix: str = '/assets', fallback_prefix: str = '/static'):
+        self.url_prefix = url_prefix
+        self.fallback_prefix = fallback_prefix
+        self.__hashed: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.__hashed)
+
+    def url(self, path: str) -> str:
+        if (hashed := self.__hashed.get(path)) is not None:
+            return f'{self.url_prefix}/{hashed}'
+        return f'{self.fallback_prefix}/{path}'
+
+    def build(self, source_dir: Path, output_dir: Path, extra: dict[str, Path]|None = None) -> None:
+        """Собрать `source_dir` и `extra` (путь в манифесте -> файл) в `output_dir`. Уже собранные файлы не пересобираются"""
+        sources = {PurePosixPath(i.relative_to(source_dir)).as_posix(): i
+                   for i in sorted(source_dir.rglob('*')) if i.is_file()}
+        sources |= extra or {}
+
+        hashed: dict[str, str] = {}
+        # CSS — последними: ссылки в них указывают на уже собранные файлы
+        for name in sorted(sources, key=lambda x: x.endswith('.css')):
+            content = sources[name].read_bytes()
+            if name.endswith('.css'):
+                content = self.__rewrite_css_urls(name, content, hashed)
+            hashed[name] = self.__write(name, content, output_dir)
+        self.__hashed = hashed
+        logger.info(f'Built {len(hashed)} static assets into {output_dir}')
+
+    @staticmethod
+    def __rewrite_css_urls(name: str, content: bytes, hashed: dict[str, str]) -> bytes:
+        base = PurePosixPath(name).parent
+
+        def replace(match: re.Match) -> str:
+            quote, target, tail = match.group(1), match.group(2), match.group(3) or ''
+            if ':' in target or target.startswith('/'):
+                return match.group(0)  # data:, http:, абсолютные пути — как есть
+            resolved = os.path.normpath((base / target).as_posix())
+            if resolved not in hashed:
+                return match.group(0)
+            relative = os.path.relpath(hashed[resolved], base.as_posix())
+            # Хеш в имени заменяет cache-busting параметры, якорь (`#iefix`, `#id`) оставляем
+            tail = tail if tail.startswith('#') else ''
+            return f'url({quote}{relative}{tail}{quote})'
+
+        return _CSS_URL_RE.sub(replace, content.decode('utf-8')).encode('utf-8')
+
+    @staticmethod
+    def __write(name: str, content: bytes, output_dir: Path) -> str:
+        path = PurePosixPath(name)
+        digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+        hashed_name = str(path.with_name(f'{path.stem}.{digest}{path.suffix}'))
+        target = output_dir / hashed_name
+        if target.exists():
+            return hashed_name
+
+        if path.suffix in COMPRESSIBLE_SUFFIXES:
+            variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(content, quality=11)))
+            for suffix, compressed in variants:
+                if len(compressed) < len(content):
+                    _write_atomic(target.with_name(target.name + suffix), compressed)
+        # Основной файл — последним: его наличие означает, что сжатые варианты уже готовы
+        _write_atomic(target, content)
+        return hashed_name
+
+
+class AssetFiles(StaticFiles):
+    """Отдача собранной статики: сжатый вариант по Accept-Encoding, вечный кэш для имён с хешем"""
+
+    async def get_response(self, path: str, scope) -> Response:
+        accepted = {i.split(';')[0].strip() for i in Headers(scope=scope).get('accept-encoding', '').split(',')}
+        response: Response|None = None
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                response = await super().get_response(path + suffix, scope)
+            except HTTPException:
+                continue
+            response.headers['content-encoding'] = encoding
+            if (media_type := mimetypes.guess_type(path)[0]) is not None:
+                response.headers['content-type'] = f'{media_type}; charset=utf-8' if media_type.startswith('text/') else media_type
+            break
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        response.headers['vary'] = 'Accept-Encoding'
+        if _HASHED_NAME_RE.search(path):
+            response.headers['cache-control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+if __name__ == '__main__':
+    # Сборка заранее (например, при деплое), чтобы воркеры не сжимали статику при старте
+    import logging
+    logging.basicConfig(level=logging.INFO)
+    build_assets(AssetManifest())
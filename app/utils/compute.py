@@ -0,0 +1,53 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Literal, TypeVar
+import asyncio
+
+
+T = TypeVar('T')
+ComputeExecutorKind = Literal['process', 'thread', 'inline']
+
+
+class ComputePool:
+    """Выполнение CPU-тяжёлой работы (парсинг, аналитика, построение графиков) вне event loop
+
+    * `process` — отдельные процессы: не держит GIL воркера, аргументы и результат должны сериализоваться (pickle);
+    * `thread` — потоки: event loop продолжает обслуживать запросы между переключениями GIL;
+    * `inline` — прямо в event loop (для отладки и профилирования).
+    """
+
+    def __init__(self, kind: ComputeExecutorKind = 'thread', max_workers: int|None = None):
+        self.kind: ComputeExecutorKind = kind
+        self.__executor: Executor|None = None
+        if kind == 'process':
+            self.__executor = ProcessPoolExecutor(max_workers=max_workers)
+        elif kind == 'thread':
+            self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='compute')
+        elif kind != 'inline':
+            raise ValueError(f"Unknown compute executor kind: '{kind}'")
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.__executor is None:
+            return func(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,58 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections.abc import Awaitable
+from typing import TypeVar
+from starlette.requests import Request
+from starlette.types import Receive
+import asyncio
+
+from .metrics import metrics
+
+
+T = TypeVar('T')
+
+_cancelled = metrics.counter('requests_cancelled_total', 'Requests whose work was cancelled because the client disconnected')
+
+
+class ClientDisconnectedError(Exception):
+    """Клиент отключился раньше, чем была готова страница: отвечать уже некому"""
+
+
+async def wait_for_disconnect(receive: Receive) -> None:
+    # Тело GET-запроса пустое, поэтому следующее сообщение после него - отключение клиента
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def cancel_on_disconnect(request: Request, work: Awaitable[T], name: str) -> T:
+    """Результат `work` или `ClientDisconnectedError`, если клиент отключился раньше.
+    В этом случае `work` отменяется вместе со всеми запросами к YouTrack, которые он ждёт.
+
+    Только для обработчиков, которые не читают тело запроса. `name` - метка в метриках"""
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.create_task(wait_for_disconnect(request.receive))
+    try:
+        await asyncio.wait((task, watcher), return_when=asyncio.FIRST_COMPLETED)
+        if task.done() or watcher.exception() is not None:
+            return await task
+    finally:
+        # Клиент отключился или отменили сам обработчик (например, при остановке сервера)
+        watcher.cancel()
+        task.cancel()
+        await asyncio.gather(task, watcher, return_exceptions=True)
+    _cancelled.inc(route=name)
+    raise ClientDisconnectedError()
@@ -0,0 +1,130 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections.abc import Callable
+from weakref import WeakKeyDictionary
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+from .log import logger
+from .metrics import metrics
+
+
+_loop_lag = metrics.gauge('event_loop_lag_seconds', 'Last measured event loop lag')
+_loop_lag_max = metrics.gauge('event_loop_lag_max_seconds', 'Max event loop lag since start')
+_loop_stalls = metrics.counter('event_loop_stalls_total', 'Event loop stalls longer than the slow callback threshold')
+_loop_stalls_by_request = metrics.counter('event_loop_stalls_by_request_total', 'Event loop stalls by route')
+
+
+def get_route_label(scope) -> str:
+    """Шаблон пути маршрута (`/{lang}/timeline`), а не сам путь: число значений метки ограничено числом маршрутов"""
+    route = scope.get('route')
+    return getattr(route, 'path', None) or '<unmatched>'
+
+
+class LoopMonitor:
+    """Замер задержек event loop и поиск виновника долгих блокировок
+
+    Корутина-сэмплер раз в `interval` проверяет, насколько позже запланированного она проснулась.
+    Отдельный поток-сторож следит за её пульсом: если loop не отвечает дольше `threshold`,
+    то в лог пишется стек потока loop'а и запрос, который в этот момент выполнялся.
+    """
+
+    def __init__(self, interval: float = 0.25, threshold: float = 0.2):
+        self.interval = interval
+        self.threshold = threshold
+        self.__tasks_info: WeakKeyDictionary[asyncio.Task, tuple[str, Callable[[], str]|None]] = WeakKeyDictionary()
+        self.__loop: asyncio.AbstractEventLoop|None = None
+        self.__loop_thread_id: int|None = None
+        self.__last_beat = time.monotonic()
+        self.__sampler: asyncio.Task|None = None
+        self.__watchdog: threading.Thread|None = None
+        self.__stopped = threading.Event()
+
+    def describe_current_task(self, description: str, label: Callable[[], str]|None = None) -> None:
+        """Пометить текущую задачу (например, HTTP запрос), чтобы указать её в отчёте о блокировке.
+        `label` - значение метки метрики, вычисляется в момент блокировки (маршрут к этому времени уже известен)"""
+        if (task := asyncio.current_task()) is not None:
+            self.__tasks_info[task] = (description, label or (lambda: '<unknown>'))
+
+    def start(self) -> None:
+        self.__loop = asyncio.get_running_loop()
+        self.__loop_thread_id = threading.get_ident()
+        self.__last_beat = time.monotonic()
+        self.__stopped.clear()
+        self.__sampler = asyncio.create_task(self.__sample(), name='loop-monitor')
+        self.__watchdog = threading.Thread(target=self.__watch, name='loop-monitor-watchdog', daemon=True)
+        self.__watchdog.start()
+
+    async def stop(self) -> None:
+        self.__stopped.set()
+        if self.__sampler is not None:
+            self.__sampler.cancel()
+            try:
+                await self.__sampler
+            except asyncio.CancelledError:
+                pass
+        if self.__watchdog is not None:
+            self.__watchdog.join(timeout=self.interval * 2)
+
+    async def __sample(self) -> None:
+        while True:
+            begin = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.__last_beat = now = time.monotonic()
+            lag = max(0.0, now - begin - self.interval)
+            _loop_lag.set(lag)
+            _loop_lag_max.set_max(lag)
+
+    def __watch(self) -> None:
+        reported_beat: float|None = None
+        while not self.__stopped.wait(self.interval / 2):
+            last_beat = self.__last_beat
+            stalled_for = time.monotonic() - last_beat - self.interval
+            if stalled_for < self.threshold or reported_beat == last_beat:
+                continue
+            # Одна запись на одну блокировку
+            reported_beat = last_beat
+            self.__report_stall(stalled_for)
+
+    def __report_stall(self, stalled_for: float) -> None:
+        frame = sys._current_frames().get(self.__loop_thread_id)
+        stack = ''.join(traceback.format_stack(frame)) if frame is not None else '<unknown>'
+        task = asyncio.current_task(self.__loop) if self.__loop is not None else None
+        description, label = self.__tasks_info.get(task, ('<no request>', None)) if task is not None else ('<no task>', None)
+
+        _loop_stalls.inc()
+        # Без пометки - одно из фиксированных значений description
+        _loop_stalls_by_request.inc(route=label() if label is not None else description)
+        logger.warning(f'Event loop is blocked for {stalled_for:.3f}+ sec by {description}. Stack:\n{stack}')
+
+
+class LoopMonitorMiddleware:
+    """Помечает задачу каждого HTTP запроса для LoopMonitor. Должен быть самым внутренним middleware"""
+
+    def __init__(self, app, monitor: LoopMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            query = scope.get('query_string', b'').decode('latin-1')
+            self.monitor.describe_current_task(f"{scope['method']} {scope['path']}" + (f'?{query}' if query else ''),
+                                               label=lambda: f"{scope['method']} {get_route_label(scope)}")
+        await self.app(scope, receive, send)
@@ -0,0 +1,104 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import threading
+
+
+LabelsT = tuple[tuple[str, str], ...]
+
+
+def escape_label_value(value: str) -> str:
+    """Экранирование значения метки в текстовом формате Prometheus"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metric:
+    """Метрика процесса с необязательными метками (`metric.inc(endpoint='issues')`)"""
+    TYPE = 'untyped'
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values: dict[LabelsT, float] = {}
+
+    @staticmethod
+    def _key(labels: dict[str, str]) -> LabelsT:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[tuple[LabelsT, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+class Counter(Metric):
+    TYPE = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Counter):
+    TYPE = 'gauge'
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_max(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = max(self._values.get(key, value), value)
+
+
+class MetricsRegistry:
+    """Метрики текущего воркера в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self.__metrics: dict[str, Metric] = {}
+
+    def __register(self, metric: Metric) -> Metric:
+        if (existing := self.__metrics.get(metric.name)) is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric '{metric.name}' is already registered with another type")
+            return existing
+        self.__metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self.__register(Counter(name, documentation))
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        return self.__register(Gauge(name, documentation))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self.__metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+            for labels, value in metric.samples():
+                labels_str = ','.join(f'{k}="{escape_label_value(v)}"' for k, v in labels)
+                lines.append(f'{metric.name}{{{labels_str}}} {value}' if labels_str else f'{metric.name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,232 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .log import logger
+from .metrics import metrics
+
+
+PageKeyT = tuple[str, str, bytes]  # язык, путь, query string
+FreshnessCheckT = Callable[[], Awaitable[bool]]
+
+# Заголовки, которые не сохраняются вместе со страницей
+_SKIPPED_HEADERS = {b'content-length', b'transfer-encoding', b'etag', b'cache-control'}
+
+_requests = metrics.counter('page_cache_requests_total', 'Requests to cacheable pages by result (hit, miss, not_modified, stale)')
+_size = metrics.gauge('page_cache_bytes', 'Size of the rendered pages in the cache')
+
+
+@dataclass
+class PageCachePolicy:
+    """Разрешение обработчика сохранить его ответ (`cache_page`)"""
+    ttl_sec: float
+    surrogate_keys: tuple[str, ...] = ()
+    is_fresh: FreshnessCheckT|None = None  # проверка перед отдачей из кэша (например, не изменилась ли задача)
+
+
+@dataclass
+class CachedPage:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    expires_at: float
+    surrogate_keys: tuple[str, ...] = ()
+    is_fresh: FreshnessCheckT|None = None
+    etag: str = field(init=False)
+
+    def __post_init__(self):
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+
+def cache_page(request: Request,
+               ttl_sec: float,
+               surrogate_keys: Iterable[str] = (),
+               is_fresh: FreshnessCheckT|None = None) -> None:
+    """Разрешить `PageCacheMiddleware` сохранить ответ на этот запрос. Сохраняется только полностью
+    отправленный ответ 200; вызывать можно и во время потоковой отдачи, до её окончания"""
+    if ttl_sec > 0:
+        request.state.page_cache = PageCachePolicy(ttl_sec=ttl_sec, surrogate_keys=tuple(surrogate_keys), is_fresh=is_fresh)
+
+
+def issue_surrogate_key(issue_id: str) -> str:
+    return f'issue:{issue_id.upper()}'
+
+
+class PageCache:
+    """Отрендеренные страницы, ограниченные по суммарному размеру (вытесняются давно не использованные).
+
+    Страницы можно сбросить по surrogate key (например, все страницы задачи на всех языках)."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.__pages: OrderedDict[PageKeyT, CachedPage] = OrderedDict()
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return len(self.__pages)
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def get(self, key: PageKeyT) -> CachedPage|None:
+        page = self.__pages.get(key)
+        if page is None:
+            return None
+        if page.expires_at <= time.monotonic():
+            self.__remove(key)
+            return None
+        self.__pages.move_to_end(key)
+        return page
+
+    def put(self, key: PageKeyT, page: CachedPage) -> None:
+        self.__remove(key)
+        if page.size > self.max_bytes:
+            return
+        self.__pages[key] = page
+        self.__size += page.size
+        while self.__size > self.max_bytes:
+            self.__remove(next(iter(self.__pages)))
+        _size.set(self.__size)
+
+    def invalidate(self, surrogate_key: str) -> int:
+        """Сбросить страницы с этим ключом, вернуть их число"""
+        keys = [k for k, v in self.__pages.items() if surrogate_key in v.surrogate_keys]
+        for i in keys:
+            self.__remove(i)
+        return len(keys)
+
+    def clear(self) -> None:
+        self.__pages.clear()
+        self.__size = 0
+        _size.set(0)
+
+    def __remove(self, key: PageKeyT) -> None:
+        if (page := self.__pages.pop(key, None)) is not None:
+            self.__size -= page.size
+            _size.set(self.__size)
+
+
+class PageCacheMiddleware:
+    """Кэш GET-страниц по языку, пути и query. Сохраняются только ответы, для которых обработчик
+    вызвал `cache_page`. Страница отдаётся с `ETag`, повторный запрос с `If-None-Match` получает 304.
+    Ответ, который сохраняется в кэш, получает тот же `ETag`, если тело пришло одним сообщением
+    (у потоковой страницы заголовки уходят раньше тела - `ETag` будет со второго запроса).
+
+    Должен стоять после `LanguageMiddleware` (язык берётся из `request.state`)."""
+
+    def __init__(self, app: ASGIApp, cache: PageCache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+
+        key: PageKeyT = (scope.get('state', {}).get('lang', ''), scope['path'], scope['query_string'])
+        page = self.cache.get(key)
+        if page is not None and await self.__is_fresh(page):
+            await self.__send_page(page, scope, send)
+            return
+
+        await self.__pass_and_store(key, scope, receive, send)
+
+    async def __is_fresh(self, page: CachedPage) -> bool:
+        if page.is_fresh is None:
+            return True
+        try:
+            if await page.is_fresh():
+                return True
+        except Exception as e:
+            logger.warning(f'Unable to check the freshness of a cached page: {e!r}')
+        # Изменился источник - устарели все страницы с тем же ключом (другие языки, параметры)
+        _requests.inc(result='stale')
+        for i in page.surrogate_keys:
+            self.cache.invalidate(i)
+        return False
+
+    async def __send_page(self, page: CachedPage, scope: Scope, send: Send) -> None:
+        headers = [(b'etag', page.etag.encode()), (b'cache-control', b'no-cache')]
+        if page.etag in Headers(scope=scope).get('if-none-match', ''):
+            _requests.inc(result='not_modified')
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        _requests.inc(result='hit')
+        headers += page.headers + [(b'content-length', str(len(page.body)).encode())]
+        await send({'type': 'http.response.start', 'status': page.status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': page.body})
+
+    async def __pass_and_store(self, key: PageKeyT, scope: Scope, receive: Receive, send: Send) -> None:
+        start: Message|None = None
+        pending_start: Message|None = None  # отправляется вместе с первой частью тела
+        chunks: list[bytes] = []
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, pending_start, size
+            if message['type'] == 'http.response.start':
+                # Копия: внешние middleware (например, сессии) дописывают заголовки в само сообщение
+                start = message | {'headers': list(message.get('headers', []))}
+                if start['status'] == 200:
+                    pending_start = message
+                    return
+            elif message['type'] == 'http.response.body' and start is not None and start['status'] == 200:
+                body = message.get('body', b'')
+                size += len(body)
+                if size <= self.cache.max_bytes:
+                    chunks.append(body)
+                page = None if message.get('more_body', False) else self.__store(key, scope, start, chunks, size)
+                if pending_start is not None:
+                    if page is not None:  # тело целиком: ETag тот же, что будет у страницы из кэша
+                        headers = [(k, v) for k, v in pending_start.get('headers', []) if k.lower() not in (b'etag', b'cache-control')]
+                        pending_start['headers'] = headers + [(b'etag', page.etag.encode()), (b'cache-control', b'no-cache')]
+                    await send(pending_start)
+                    pending_start = None
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def __store(self, key: PageKeyT, scope: Scope, start: Message, chunks: list[bytes], size: int) -> CachedPage|None:
+        # Политику обработчик мог задать и во время потоковой отдачи, поэтому смотрим только сейчас
+        policy: PageCachePolicy|None = scope.get('state', {}).get('page_cache')
+        if policy is None or size > self.cache.max_bytes:
+            return None
+        if any(k.lower() == b'set-cookie' for k, _ in start.get('headers', [])):
+            return None  # ответ для конкретного клиента
+        _requests.inc(result='miss')
+        headers = [(k, v) for k, v in start.get('headers', []) if k.lower() not in _SKIPPED_HEADERS]
+        page = CachedPage(status=start['status'],
+                          headers=headers,
+                          body=b''.join(chunks),
+                          expires_at=time.monotonic() + policy.ttl_sec,
+                          surrogate_keys=policy.surrogate_keys,
+                          is_fresh=policy.is_fresh)
+        self.cache.put(key, page)
+        return page
@@ -0,0 +1,46 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import Callable
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+import itsdangerous
+import os
+
+from .log import logger
+
+
+class DeferredSessionMiddleware(SessionMiddleware):
+    """`SessionMiddleware`, ключ подписи которого известен только после старта приложения
+    (настройки читаются в lifespan, а middleware создаётся раньше).
+
+    `get_secret_key` вызывается на первом запросе. Если ключа нет, берётся случайный:
+    сессии тогда живут только в этом процессе (у каждого воркера свой ключ)."""
+
+    def __init__(self, app: ASGIApp, get_secret_key: Callable[[], str|None], **kwargs):
+        super().__init__(app, secret_key='', **kwargs)
+        self.__get_secret_key = get_secret_key
+        self.__has_secret_key = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.__has_secret_key and scope['type'] in ('http', 'websocket'):
+            secret_key = self.__get_secret_key()
+            if not secret_key:
+                logger.warning('Session secret key is not configured, sessions will not be shared between workers')
+                secret_key = os.urandom(24).hex()
+            self.signer = itsdangerous.TimestampSigner(secret_key)
+            self.__has_secret_key = True
+        await super().__call__(scope, receive, send)
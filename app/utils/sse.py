@@ -0,0 +1,38 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+import json
+
+from fastapi.responses import StreamingResponse
+
+
+def format_event(event: str, data: Any) -> str:
+    """Одно сообщение в формате text/event-stream, `data` - в JSON"""
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+class EventStreamResponse(StreamingResponse):
+    """Server-sent events из пар (событие, данные)"""
+
+    def __init__(self, events: AsyncIterable[tuple[str, Any]]):
+        async def encode() -> AsyncIterator[str]:
+            async for event, data in events:
+                yield format_event(event, data)
+
+        super().__init__(encode(),
+                         media_type='text/event-stream',
+                         headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,61 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from os import PathLike
+from typing import Any
+
+import jinja2
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from fastapi.templating import Jinja2Templates
+
+
+class StreamingTemplates(Jinja2Templates):
+    """Шаблоны, которые отдаются клиенту по мере рендера (`Template.generate_async`)
+
+    Окружение асинхронное: async-функции из контекста вызываются прямо в шаблоне, и всё,
+    что отрендерено до такого вызова, клиент получает не дожидаясь его результата.
+    Контекстные процессоры (например, `_` из `language_context`) здесь не вызываются -
+    их результат нужно передавать в контексте."""
+
+    def __init__(self, directory: str|PathLike[str]):
+        super().__init__(env=jinja2.Environment(loader=jinja2.FileSystemLoader(directory),
+                                                autoescape=jinja2.select_autoescape(),
+                                                enable_async=True))
+
+    async def render(self, name: str, context: Mapping[str, Any]) -> str:
+        return await self.get_template(name).render_async(context)
+
+    def StreamingTemplateResponse(self,
+                                  request: Request,
+                                  name: str,
+                                  context: dict[str, Any],
+                                  on_close: Callable[[], Awaitable[None]]|None = None) -> StreamingResponse:
+        """`on_close` вызывается после рендера, в том числе если клиент отключился раньше"""
+        context.setdefault('request', request)
+        template = self.get_template(name)
+
+        async def generate() -> AsyncIterator[str]:
+            try:
+                async for chunk in template.generate_async(context):
+                    if chunk:
+                        yield chunk
+            finally:
+                if on_close is not None:
+                    await on_close()
+
+        # X-Accel-Buffering: иначе nginx соберёт ответ целиком и весь смысл потока пропадёт
+        return StreamingResponse(generate(), media_type='text/html', headers={'X-Accel-Buffering': 'no'})
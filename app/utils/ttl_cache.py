@@ -0,0 +1,80 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import math
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class _Entry:
+    future: asyncio.Future
+    expires_at: float = math.inf  # пока значение считается, запись не устаревает
+
+
+class AsyncTtlCache:
+    """Кэш результатов корутин со временем жизни и ограничением числа записей (вытесняются давно не использованные)
+
+    Одновременные запросы одного ключа ждут одно вычисление. Исключения не кэшируются.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        assert max_entries > 0
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    async def get(self, key: Hashable, factory: Callable[[], Awaitable[Any]], ttl_sec: float) -> Any:
+        if ttl_sec <= 0:
+            return await factory()
+
+        loop = asyncio.get_running_loop()
+        entry = self.__entries.get(key)
+        if entry is not None and entry.expires_at > loop.time():
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            # shield: отмена одного из ожидающих не должна отменять общее вычисление
+            return await asyncio.shield(entry.future)
+
+        self.misses += 1
+        entry = _Entry(future=asyncio.ensure_future(factory()))
+        self.__entries[key] = entry
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+
+        def on_done(future: asyncio.Future) -> None:
+            if future.cancelled() or future.exception() is not None:
+                if self.__entries.get(key) is entry:
+                    del self.__entries[key]
+            else:
+                entry.expires_at = loop.time() + ttl_sec
+
+        entry.future.add_done_callback(on_done)
+        return await asyncio.shield(entry.future)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.__entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.__entries.clear()
@@ -0,0 +1,47 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from youtrack.utils.circuit_breaker import CircuitBreakers, CircuitState, RetryBudget
+
+from .metrics import metrics
+
+
+_circuit_state = metrics.gauge('upstream_circuit_state', 'YouTrack circuit breaker state by endpoint class (0 closed, 1 half-open, 2 open)')
+_circuit_transitions = metrics.counter('upstream_circuit_transitions_total', 'YouTrack circuit breaker state changes by endpoint class')
+_circuit_rejected = metrics.counter('upstream_circuit_rejected_total', 'YouTrack requests failed fast by an open circuit breaker')
+_retries = metrics.counter('upstream_retries_total', 'Retries of failed YouTrack requests by result (allowed, denied by the retry budget)')
+
+
+def _on_state_changed(endpoint: str, state: CircuitState) -> None:
+    _circuit_state.set(int(state), endpoint=endpoint)
+    _circuit_transitions.inc(endpoint=endpoint, state=state.name.lower())
+
+
+def _on_rejected(endpoint: str) -> None:
+    _circuit_rejected.inc(endpoint=endpoint)
+
+
+def _on_retry(allowed: bool) -> None:
+    _retries.inc(result='allowed' if allowed else 'denied')
+
+
+def export_upstream_metrics(breakers: CircuitBreakers, retry_budget: RetryBudget) -> None:
+    """Состояние размыкателей и бюджета повторов `YouTrackHelper` - в метрики процесса"""
+    for endpoint, state in breakers.states().items():
+        _circuit_state.set(int(state), endpoint=endpoint)
+    breakers.cb_state_changed += _on_state_changed
+    breakers.cb_rejected += _on_rejected
+    retry_budget.cb_retry += _on_retry
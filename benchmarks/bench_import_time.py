@@ -0,0 +1,64 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Время импорта модулей (`python -X importtime`) в отдельном процессе против бюджета
+
+Кроме времени проверяется, что при импорте не подгружаются тяжёлые зависимости
+(pandas, numpy, plotly): они нужны только для графиков и рабочих минут.
+Код возврата 1, если хотя бы один модуль вышел за бюджет.
+
+Запуск: `python -m benchmarks.bench_import_time`
+"""
+
+import subprocess
+import sys
+
+
+# Модуль -> бюджет, мс (с запасом для медленных машин; без ленивых импортов app.main ~0.6 сек)
+BUDGETS_MS: dict[str, float] = {
+    'youtrack.utils.duration': 50,
+    'youtrack.helper': 300,
+    'app.main': 450,
+}
+HEAVY_MODULES = ('pandas', 'numpy', 'plotly')
+REPEAT = 5
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    """(время импорта, мс; загруженные тяжёлые модули)"""
+    code = f'import sys, {module}; print(",".join(i for i in {HEAVY_MODULES!r} if i in sys.modules))'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True)
+    # Строки "import time: self | cumulative | name" в порядке завершения: сам модуль - последний с этим именем
+    cumulative_us = next(int(i.split('|')[1]) for i in reversed(result.stderr.splitlines()) if i.split('|')[-1].strip() == module)
+    heavy = [i for i in result.stdout.strip().split(',') if i]
+    return cumulative_us / 1000, heavy
+
+
+def main() -> int:
+    failed = False
+    print(f'{"module":<25} {"import, ms":>10} {"budget, ms":>10}  heavy modules')
+    for module, budget_ms in BUDGETS_MS.items():
+        results = [measure(module) for _ in range(REPEAT)]
+        best_ms = min(i[0] for i in results)
+        heavy = results[0][1]
+        ok = best_ms <= budget_ms and not heavy
+        failed |= not ok
+        print(f'{module:<25} {best_ms:>10.1f} {budget_ms:>10.0f}  {", ".join(heavy) or "-"}{"" if ok else "  FAIL"}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
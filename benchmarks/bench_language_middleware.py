@@ -0,0 +1,111 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Накладные расходы LanguageMiddleware на запрос: чистый ASGI против прежнего `BaseHTTPMiddleware`
+
+Запросы идут прямо в ASGI-приложение (без сети и HTTP-клиента) пачками по `concurrency` штук,
+языки в пачке чередуются. Кроме времени считается, сколько ответов отрендерено не на своём языке.
+
+Запуск: `python -m benchmarks.bench_language_middleware`
+"""
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.templating import Jinja2Templates
+import asyncio
+import jinja2
+import time
+
+from app.language_middleware import LanguageMiddleware, get_translator, language_context, resolve_language
+
+
+REQUESTS = 4000
+TEMPLATE = "{{ lang }}:{{ _('batch.refresh') }}"
+EXPECTED = {lang: f'{lang}:{get_translator(lang)("batch.refresh")}' for lang in ('en', 'ru')}
+
+
+class LegacyLanguageMiddleware(BaseHTTPMiddleware):
+    """Прежняя реализация: `BaseHTTPMiddleware` и глобальные переменные окружения шаблонов"""
+
+    def __init__(self, app, templates: Jinja2Templates):
+        super().__init__(app)
+        self.templates = templates
+
+    async def dispatch(self, request: Request, call_next):
+        lang = resolve_language(request)
+        request.session['language'] = lang
+        self.templates.env.globals['_'] = get_translator(lang)
+        self.templates.env.globals['lang'] = lang
+        request.state.gettext = get_translator(lang)
+        return await call_next(request)
+
+
+def make_app(legacy: bool) -> Starlette:
+    env = jinja2.Environment(loader=jinja2.DictLoader({'page': TEMPLATE}))
+    templates = Jinja2Templates(env=env)
+
+    async def page(request: Request):
+        await asyncio.sleep(0)  # точка переключения, как у любого I/O в обработчике
+        context = {} if legacy else language_context(request)
+        return PlainTextResponse(templates.get_template('page').render(context))
+
+    middleware = Middleware(LegacyLanguageMiddleware, templates=templates) if legacy else Middleware(LanguageMiddleware)
+    return Starlette(routes=[Route('/{lang}/page', page)],
+                     middleware=[Middleware(SessionMiddleware, secret_key='secret'), middleware])
+
+
+async def request(app: Starlette, lang: str) -> bool:
+    scope = {'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http', 'path': f'/{lang}/page',
+             'raw_path': f'/{lang}/page'.encode(), 'root_path': '', 'query_string': b'', 'headers': [],
+             'client': ('127.0.0.1', 1), 'server': ('test', 80)}
+    body = b''
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal body
+        if message['type'] == 'http.response.body':
+            body += message.get('body', b'')
+
+    await app(scope, receive, send)
+    return body.decode() == EXPECTED[lang]
+
+
+async def run(app: Starlette, concurrency: int) -> tuple[float, int]:
+    wrong = 0
+    begin = time.perf_counter()
+    for _ in range(REQUESTS // concurrency):
+        results = await asyncio.gather(*[request(app, ('en', 'ru')[i % 2]) for i in range(concurrency)])
+        wrong += results.count(False)
+    return (time.perf_counter() - begin) / REQUESTS * 1e6, wrong
+
+
+async def main() -> None:
+    print(f'{"concurrency":>11} {"legacy, us":>10} {"wrong lang":>10} {"asgi, us":>8} {"wrong lang":>10}')
+    for concurrency in (1, 10, 100):
+        legacy_us, legacy_wrong = await run(make_app(legacy=True), concurrency)
+        asgi_us, asgi_wrong = await run(make_app(legacy=False), concurrency)
+        print(f'{concurrency:>11} {legacy_us:>10.1f} {legacy_wrong:>10} {asgi_us:>8.1f} {asgi_wrong:>10}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
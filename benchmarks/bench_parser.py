@@ -0,0 +1,71 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Время разбора одной большой задачи с выключенной и включённой трассировкой
+
+Запуск: `python -m benchmarks.bench_parser`
+"""
+
+from io import StringIO
+import logging
+import timeit
+
+from youtrack.entities import CustomFields
+from youtrack.parser import IssueParser
+from youtrack.utils import yt_logger
+from youtrack.utils.anomalies import AnomaliesDetector, anomaly_logger
+from youtrack.utils.duration import Duration
+
+from .streams import make_issue, make_activities
+
+
+CYCLES = 300
+REPEATS = 5
+
+
+def parse(issue, activities) -> None:
+    detector = AnomaliesDetector(review_thresshold=Duration.from_minutes(60 * 8 * 2))
+    parser = IssueParser(CustomFields.default_config())
+    parser.cb_pause_added += detector.on_pause_added
+    parser.cb_work_added += detector.on_work_added
+    parser.cb_state_changed += detector.on_state_changed
+    parser.parse_custom_fields(issue)
+    parser.parse_activities(activities)
+    parser.get_result()
+
+
+def measure(level: int) -> float:
+    for logger in (yt_logger, anomaly_logger):
+        logger.setLevel(level)
+    issue, activities = make_issue(), make_activities(CYCLES)
+    return min(timeit.repeat(lambda: parse(issue, activities), number=1, repeat=REPEATS))
+
+
+def main() -> None:
+    handler = logging.StreamHandler(StringIO())
+    for logger in (yt_logger, anomaly_logger):
+        logger.addHandler(handler)
+        logger.propagate = False
+
+    traced = measure(logging.DEBUG)
+    silent = measure(logging.INFO)
+    print(f'{CYCLES * 7} activities')
+    print(f'DEBUG (traced): {traced * 1000:.1f} ms')
+    print(f'INFO  (silent): {silent * 1000:.1f} ms')
+    print(f'speedup: x{traced / silent:.2f}')
+
+
+if __name__ == '__main__':
+    main()
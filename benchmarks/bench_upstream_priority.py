@@ -0,0 +1,119 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Задержка timeline (`get_raw_summary`), пока идут batch-отчёты (`get_issue_activities`)
+
+YouTrack заменён моделью: до `UPSTREAM_CAPACITY` запросов обслуживаются за `UPSTREAM_LATENCY_SEC`,
+сверх этого каждый запрос замедляется пропорционально нагрузке. Сравниваются: без batch-нагрузки,
+batch без приоритетов (как раньше: только `Semaphore(BATCH_CONCURRENCY)` на отчёт) и с `PriorityLimiter`.
+
+Запуск: `python -m benchmarks.bench_upstream_priority`
+"""
+
+from asyncio import Semaphore
+import aiohttp
+import asyncio
+import statistics
+import time
+
+from youtrack.helper import YouTrackHelper
+from youtrack.utils.limiter import PriorityLimiter
+
+
+UPSTREAM_CAPACITY = 12
+UPSTREAM_LATENCY_SEC = 0.02
+BATCH_CONCURRENCY = 10  # как в app.batch
+REPORTS = 2
+ISSUES_PER_REPORT = 500  # YouTrackHelper.MAX_ISSUE_COUNT
+TIMELINE_REQUESTS = 40  # без batch-нагрузки
+TIMELINE_INTERVAL_SEC = 0.03
+
+
+class Upstream:
+    def __init__(self):
+        self.in_flight = 0
+
+    class Response:
+        def __init__(self, upstream: 'Upstream'):
+            self.upstream = upstream
+
+        async def __aenter__(self):
+            self.upstream.in_flight += 1
+            try:
+                await asyncio.sleep(UPSTREAM_LATENCY_SEC * max(1.0, self.upstream.in_flight / UPSTREAM_CAPACITY))
+            finally:
+                self.upstream.in_flight -= 1
+            return self
+
+        async def __aexit__(self, *args):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        async def json(self):
+            return []
+
+
+async def run(limiter: PriorityLimiter, reports: int) -> tuple[list[float], float]:
+    """(задержки timeline, сек; время batch-отчётов, сек)"""
+    upstream = Upstream()
+    aiohttp.ClientSession.get = lambda session, url, headers: Upstream.Response(upstream)
+    YouTrackHelper.upstream_limiter = limiter
+    helper = YouTrackHelper(instance_url='my-yt.myjetbrains.com', api_key='Bearer perm:xxx')
+
+    async def report() -> None:
+        sem = Semaphore(BATCH_CONCURRENCY)
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*[helper.get_issue_activities(session=session, sem=sem, issue_id=f'id-{i}', fields=['id'], categories=[])
+                                   for i in range(ISSUES_PER_REPORT)])
+
+    async def timeline() -> float:
+        begin = time.monotonic()
+        await helper.get_raw_summary('id-1')
+        return time.monotonic() - begin
+
+    async def reports_duration() -> float:
+        begin = time.monotonic()
+        await asyncio.gather(*[report() for _ in range(reports)])
+        return time.monotonic() - begin
+
+    batch = asyncio.create_task(reports_duration())
+    await asyncio.sleep(0.1)  # отчёты успели занять все слоты
+    latencies = []
+    # Timeline открывают, пока идут отчёты
+    while not batch.done() if reports else len(latencies) < TIMELINE_REQUESTS:
+        latencies.append(await timeline())
+        await asyncio.sleep(TIMELINE_INTERVAL_SEC)
+    return latencies, await batch
+
+
+def main():
+    scenarios = {
+        'idle': (PriorityLimiter(), 0),
+        'batch, no priorities': (PriorityLimiter(max_concurrent=10**6, reserved_interactive=0), REPORTS),
+        'batch, priority lanes': (PriorityLimiter(), REPORTS),
+    }
+    print(f'{"scenario":<24} {"timeline p50, ms":>16} {"p95, ms":>8} {"max, ms":>8} {"batch reports, s":>16}')
+    for name, (limiter, reports) in scenarios.items():
+        latencies, duration = asyncio.run(run(limiter, reports))
+        latencies_ms = sorted(i * 1000 for i in latencies)
+        p95 = statistics.quantiles(latencies_ms, n=20)[-1]
+        print(f'{name:<24} {statistics.median(latencies_ms):>16.1f} {p95:>8.1f} {latencies_ms[-1]:>8.1f} {duration:>16.2f}')
+
+
+if __name__ == '__main__':
+    main()
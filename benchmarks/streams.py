@@ -0,0 +1,67 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import Any
+
+
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+BEGIN_MS = 1743750000000  # 2025-04-04T07:00Z
+
+
+def make_issue(issue_id: str = 'id-1', state: str = 'In progress') -> dict[str, Any]:
+    """Ответ `issues/{id}` с минимальным набором полей для IssueParser"""
+    return {
+        'idReadable': issue_id,
+        'summary': f'Issue {issue_id}',
+        'created': BEGIN_MS,
+        'project': {'shortName': 'id', 'name': 'Project', 'id': '0-1'},
+        'reporter': {'fullName': 'Reporter'},
+        'customFields': [
+            {'id': '110-33', 'name': 'State', 'value': {'name': state}},
+            {'id': '111-7', 'name': 'Assignee', 'value': {'fullName': 'Alice'}},
+            {'id': '116-7', 'name': 'Scope', 'value': {'minutes': 480}},
+            {'id': '116-6', 'name': 'Spent time', 'value': None},
+            {'id': '110-32', 'name': 'Component', 'value': {'name': 'Core'}},
+        ],
+        'tags': [],
+        'comments': [],
+    }
+
+
+def make_activities(cycles: int) -> list[dict[str, Any]]:
+    """Поток активностей: In progress -> Review -> On hold -> In progress со сменами Assignee и work item'ами"""
+    def custom_field(ts: int, member: str, before: str, after: str) -> dict[str, Any]:
+        return {'$type': 'CustomFieldActivityItem', 'targetMember': member, 'timestamp': ts,
+                'author': {'name': after}, 'removed': [{'name': before}], 'added': [{'name': after}]}
+
+    def work(ts: int, minutes: int, author: str) -> dict[str, Any]:
+        return {'$type': 'WorkItemActivityItem', 'timestamp': ts, 'author': {'name': author},
+                'added': [{'duration': {'minutes': minutes}}], 'removed': []}
+
+    state, assignee = '__CUSTOM_FIELD__State_2', '__CUSTOM_FIELD__Assignee_3'
+    ret: list[dict[str, Any]] = []
+    ts = BEGIN_MS
+    for _ in range(cycles):
+        ret.append(work(ts + HOUR_MS, 60, 'Alice'))
+        ret.append(custom_field(ts + 2 * HOUR_MS, state, 'In progress', 'Review'))
+        ret.append(custom_field(ts + 2 * HOUR_MS, assignee, 'Alice', 'Bob'))
+        ret.append(work(ts + 3 * HOUR_MS, 45, 'Bob'))
+        ret.append(custom_field(ts + 4 * HOUR_MS, state, 'Review', 'On hold'))
+        ret.append(custom_field(ts + 5 * HOUR_MS, assignee, 'Bob', 'Alice'))
+        ret.append(custom_field(ts + DAY_MS, state, 'On hold', 'In progress'))
+        ts += DAY_MS
+    return ret
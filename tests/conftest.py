@@ -0,0 +1,46 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import Any
+import pytest
+
+from app.settings import Settings, AppSettings
+from youtrack.instance import YouTrackInstanceConfig
+
+from .fake_youtrack import FakeYouTrack
+
+
+# Обязательные настройки приложения, одинаковые для всех тестов
+TEST_APP_CONFIG = dict(host='my-yt.myjetbrains.com',
+                       api_key='Bearer perm:xxxxxxxxxxxxxxxxxxxxxxxx',
+                       support_person='John Doe')
+
+
+@pytest.fixture
+def make_settings():
+    """Фабрика Settings: `make_settings(yt_config=..., batch_cache_ttl=0)`, остальные поля AppSettings - по умолчанию"""
+    def make(yt_config: YouTrackInstanceConfig|None = None, **overrides: Any) -> Settings:
+        return Settings(app_config=AppSettings(**TEST_APP_CONFIG | overrides),
+                        yt_config=yt_config if yt_config is not None else YouTrackInstanceConfig())
+    return make
+
+
+@pytest.fixture
+def fake_youtrack(monkeypatch):
+    """Фабрика FakeYouTrack, подменяющего сетевой слой YouTrackHelper до конца теста"""
+    def make(issues: dict[str, Any], activities: dict[str, list[Any]]) -> FakeYouTrack:
+        return FakeYouTrack(issues=issues, activities=activities).install(monkeypatch)
+    return make
@@ -0,0 +1,31 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from pathlib import Path
+from typing import Any
+import json
+
+
+# Записанные потоки активностей и результат разбора двухпроходным парсером
+CORPUS_PATH = Path(__file__).parent / 'data' / 'activity_streams.json'
+CORPUS: dict = json.loads(CORPUS_PATH.read_text(encoding='utf-8'))
+
+
+def get_corpus_issues() -> tuple[dict[str, Any], dict[str, list[Any]]]:
+    """Задачи и их активности из корпуса по id (для FakeYouTrack)"""
+    issues = {i['issue']['idReadable']: i['issue'] for i in CORPUS.values()}
+    activities = {i['issue']['idReadable']: i['activities'] for i in CORPUS.values()}
+    return issues, activities
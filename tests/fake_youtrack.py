@@ -0,0 +1,169 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from contextlib import nullcontext
+from typing import Any
+from yarl import URL
+import asyncio
+import json
+import re
+
+from youtrack.helper import YouTrackHelper
+
+
+class FakeYouTrack:
+    """Подменяет сетевой слой YouTrackHelper ответами из памяти
+
+    Отвечает на запросы summary (`issues/{id}`, `issues?query=issue id: ...`)
+    и активностей (`issues/{id}/activities`, с фильтрами `categories`, `start` и `end`),
+    запоминает все запрошенные URL и объём ответов активностей.
+    Поиск по query (`get_raw_issues_by_query`) возвращает все задачи проекта из query.
+    """
+
+    def __init__(self, issues: dict[str, Any], activities: dict[str, list[Any]]):
+        self.issues = issues
+        self.activities = activities
+        self.delays: dict[str, float] = {}  # задержка ответа активностей по id задачи
+        self.errors: dict[str, Exception] = {}  # ошибка вместо активностей по id задачи
+        self.requests: list[URL] = []
+        self.queries: list[str] = []
+        self.query_delay = 0.0  # задержка ответа на поиск по query
+        self.activities_bytes: dict[str, int] = {}  # размер ответа активностей (JSON) по id задачи
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def install(self, monkeypatch) -> 'FakeYouTrack':
+        fake = self
+
+        async def fetch_json(helper, session, url: URL, backoff_schedule=(0.5, 1.0, 2.0), limiter=None, priority=None) -> Any:
+            async with limiter or nullcontext():
+                return await fake.handle(url)
+
+        async def get_raw_issues_by_query(helper, query: str, fields: list[str]) -> list[Any]:
+            fake.queries.append(query)
+            await asyncio.sleep(fake.query_delay)
+            project = re.match(r'^project: (\S+)', query)
+            return [i for i in fake.issues.values() if not project or i['project']['shortName'] == project.group(1)]
+
+        monkeypatch.setattr(YouTrackHelper, '_YouTrackHelper__fetch_json', fetch_json)
+        monkeypatch.setattr(YouTrackHelper, 'get_raw_issues_by_query', get_raw_issues_by_query)
+        return self
+
+    async def handle(self, url: URL) -> Any:
+        self.requests.append(url)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            parts = [i for i in url.path.split('/') if i]
+            if parts == ['youtrack', 'api', 'issues']:
+                ids = re.sub(r'^issue id:', '', url.query['query']).split(',')
+                return [self.issues[i.strip()] for i in ids if i.strip() in self.issues]
+            if len(parts) == 4:
+                return self.issues[parts[3]]
+            if len(parts) == 5 and parts[4] == 'activities':
+                await asyncio.sleep(self.delays.get(parts[3], 0))
+                if parts[3] in self.errors:
+                    raise self.errors[parts[3]]
+                ret = filter_activities(self.activities[parts[3]], url)
+                self.activities_bytes[parts[3]] = len(json.dumps(ret))
+                return ret
+            raise RuntimeError(f'Unexpected request: {url}')
+        finally:
+            self.in_flight -= 1
+
+
+# $type активности -> категория YouTrack
+ACTIVITY_CATEGORIES: dict[str, str] = {
+    'CustomFieldActivityItem': 'CustomFieldCategory',
+    'IssueResolvedActivityItem': 'IssueResolvedCategory',
+    'IssueCreatedActivityItem': 'IssueCreatedCategory',
+    'WorkItemActivityItem': 'WorkItemCategory',
+    'CommentActivityItem': 'CommentsCategory',
+    'TagsActivityItem': 'TagsCategory',
+}
+
+
+def filter_activities(activities: list[Any], url: URL) -> list[Any]:
+    """Фильтры `issues/{id}/activities` как на сервере: `categories` и `start`/`end` (мс, включительно)"""
+    categories = set(url.query['categories'].split(',')) if 'categories' in url.query else None
+    start = int(url.query.get('start', 0))
+    end = int(url.query['end']) if 'end' in url.query else None
+    ret: list[Any] = []
+    for i in activities:
+        if categories is not None and ACTIVITY_CATEGORIES.get(i['$type']) not in categories:
+            continue
+        if i['timestamp'] < start or (end is not None and i['timestamp'] > end):
+            continue
+        ret.append(i)
+    return ret
+
+
+def make_batch_issue(issue_id: str,
+                     state: str = 'Resolved',
+                     scope_minutes: int|None = 480,
+                     spent_minutes: int = 480,
+                     project: str = 'id') -> dict[str, Any]:
+    """Задача в формате ответа на `get_required_issue_fields()` (batch-отчёты)"""
+    return {
+        'idReadable': issue_id,
+        'numberInProject': issue_id.split('-')[-1],
+        'summary': f'Issue {issue_id}',
+        'created': 1743750000000,
+        'resolved': 1743850000000,
+        'project': {'id': f'0-{project}', 'shortName': project},
+        'tags': [],
+        'customFields': [
+            {'name': 'State', 'value': {'name': state}},
+            {'name': 'Assignee', 'value': {'fullName': 'Alice'}},
+            {'name': 'Component', 'value': {'name': 'Core'}},
+            {'name': 'Priority', 'value': {'name': 'Normal'}},
+            {'name': 'Scope', 'value': {'minutes': scope_minutes} if scope_minutes is not None else None},
+            {'name': 'Spent time', 'value': {'minutes': spent_minutes}},
+        ]
+    }
+
+
+def make_scope_activities(scope_changes: list[tuple[int, int]]) -> list[dict[str, Any]]:
+    """Активности задачи для scope-increase: взятие в работу, изменения Scope (минуты до/после), решение"""
+    timestamp = 1743760000000
+    author = {'name': 'Alice'}
+    ret: list[dict[str, Any]] = [{
+        '$type': 'CustomFieldActivityItem',
+        'targetMember': '__CUSTOM_FIELD__State_2',
+        'timestamp': timestamp,
+        'author': author,
+        'removed': [{'name': 'Buffer'}],
+        'added': [{'name': 'In progress'}]
+    }]
+    for before, after in scope_changes:
+        timestamp += 3600 * 1000
+        ret.append({
+            '$type': 'CustomFieldActivityItem',
+            'targetMember': '__CUSTOM_FIELD__Estimation_19',
+            'timestamp': timestamp,
+            'author': author,
+            'removed': before,
+            'added': after
+        })
+    ret.append({
+        '$type': 'IssueResolvedActivityItem',
+        'targetMember': None,
+        'timestamp': timestamp + 3600 * 1000,
+        'author': author,
+        'removed': None,
+        'added': None
+    })
+    return ret
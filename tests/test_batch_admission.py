@@ -0,0 +1,88 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import httpx
+import pytest
+import time
+
+from app import main
+from app.batch import ReportStore
+from app.batch.batch_shared import BATCH_CONCURRENCY
+from app.utils.admission import AdmissionController
+from youtrack.entities import ProjectExt
+from youtrack.instance import YouTrackInstanceConfig
+
+from .fake_youtrack import FakeYouTrack, make_batch_issue, make_scope_activities
+
+
+REPORT_URL = '/en/batch/scope-increase?project=id&component=Core&begin=2025-04-01&end=2025-05-01'
+
+
+@pytest.fixture
+def web_app(monkeypatch, make_settings):
+    yt_config = YouTrackInstanceConfig(projects={'id': ProjectExt(short_name='id', name='Project', id='0-1', components=['Core'])})
+    settings = make_settings(yt_config, batch_streaming=False, batch_cache_ttl=0)
+    monkeypatch.setattr(main.app.state, 'settings', settings, raising=False)
+    monkeypatch.setattr(main.app.state, 'report_store', ReportStore())
+    monkeypatch.setattr(main, 'batch_admission', AdmissionController(name='batch', max_concurrent=2, max_queue=3, max_wait_sec=5))
+    return main.app
+
+
+@pytest.fixture
+def fake_yt(fake_youtrack):
+    issues = {f'id-{i}': make_batch_issue(f'id-{i}') for i in range(1, 41)}
+    activities = {i: make_scope_activities([(480, 960)]) for i in issues}
+    fake_yt = fake_youtrack(issues, activities)
+    fake_yt.delays = {i: 0.01 for i in issues}
+    return fake_yt
+
+
+@pytest.mark.asyncio
+async def test_reports_over_limit_are_shed(web_app, fake_yt: FakeYouTrack):
+    """Нагрузочный тест: 12 одновременных отчётов по 40 задач при лимите 2 + 3 в очереди"""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=web_app), base_url='http://test') as client:
+        async def get(url: str) -> tuple[httpx.Response, float]:
+            begin = time.monotonic()
+            response = await client.get(url)
+            return response, time.monotonic() - begin
+
+        results = await asyncio.gather(*[get(REPORT_URL) for _ in range(12)])
+
+    ok = [(r, t) for r, t in results if r.status_code == 200]
+    shed = [(r, t) for r, t in results if r.status_code == 503]
+    assert len(ok) == 5 and len(shed) == 7
+    # Отказ - сразу, а не после ожидания
+    assert max(t for _, t in shed) < min(t for _, t in ok)
+    assert all(int(r.headers['retry-after']) >= 1 for r, _ in shed)
+    assert 'Too many reports' in shed[0][0].text
+    assert all('id-40' in r.text for r, _ in ok)
+    # Не больше двух отчётов одновременно
+    assert fake_yt.max_in_flight <= 2 * BATCH_CONCURRENCY
+    assert len(fake_yt.queries) == 5
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout(web_app, fake_yt: FakeYouTrack):
+    main.batch_admission.max_concurrent = 1
+    main.batch_admission.max_wait_sec = 0.05
+    fake_yt.delays = {i: 0.05 for i in fake_yt.issues}  # отчёт ~0.2 сек
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=web_app), base_url='http://test') as client:
+        first, second = await asyncio.gather(client.get(REPORT_URL), client.get(REPORT_URL))
+
+    assert first.status_code == 200
+    assert second.status_code == 503
+    assert 'retry-after' in second.headers
@@ -0,0 +1,218 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from starlette.testclient import TestClient
+import asyncio
+import sys
+import pytest
+
+from app import main
+from app.batch import get_batch_scope_increase_data, get_batch_scope_increase_events
+from app.batch.precompute import ReportKey, ReportStore, ReportScheduler, get_precompute_plan, store_scope_increase_events
+from app.settings import Settings
+from youtrack.entities import ProjectExt
+from youtrack.instance import YouTrackInstanceConfig
+
+from .fake_youtrack import FakeYouTrack, make_batch_issue, make_scope_activities
+
+
+WEEK_BEGIN = (date.today() - timedelta(weeks=1)).isoformat()
+TODAY = date.today().isoformat()
+
+
+def _(text: str) -> str:
+    return text
+
+
+@pytest.fixture
+def settings(make_settings):
+    yt_config = YouTrackInstanceConfig(projects={
+        'id': ProjectExt(short_name='id', name='Project', id='0-1', components=['UI', 'Core']),
+        'ab': ProjectExt(short_name='ab', name='Another project', id='0-2', components=['Backend']),
+    })
+    return make_settings(yt_config, batch_cache_ttl=0)
+
+
+@pytest.fixture
+def fake_yt(fake_youtrack):
+    issues = {
+        'id-1': make_batch_issue('id-1', scope_minutes=480, spent_minutes=960),
+        'ab-1': make_batch_issue('ab-1', scope_minutes=60, spent_minutes=120, project='ab'),
+    }
+    activities = {
+        'id-1': make_scope_activities([(480, 960)]),
+        'ab-1': make_scope_activities([(60, 120)]),
+    }
+    return fake_youtrack(issues, activities)
+
+
+def make_scheduler(settings: Settings, store: ReportStore) -> ReportScheduler:
+    return ReportScheduler(settings=settings, store=store, translator_factory=lambda lang: _, langs=['en', 'ru'], run_at=time(3, 0))
+
+
+def test_plan(settings: Settings):
+    plan = get_precompute_plan(settings=settings, langs=['en', 'ru'])
+
+    # 2 языка × 2 отчёта × 2 проекта × 3 пресета (неделя, месяц, полгода)
+    assert len(plan) == 24
+    week = ReportKey.from_request(mode='scope-overrun', lang='ru', projects=['id'], components=['Core', 'UI'], begin=WEEK_BEGIN, end=TODAY)
+    assert week in plan
+    # Порядок компонентов в запросе не важен
+    assert ReportKey.from_request(mode='scope-overrun', lang='ru', projects=['id'], components=['UI', 'Core', 'UI'],
+                                  begin=WEEK_BEGIN, end=TODAY) == week
+
+
+def test_store_keeps_only_planned():
+    planned = ReportKey.from_request(mode='scope-overrun', lang='en', projects=['id'], components=[], begin='2025-01-01', end='2025-02-01')
+    other = ReportKey.from_request(mode='scope-overrun', lang='en', projects=['ab'], components=[], begin='2025-01-01', end='2025-02-01')
+    store = ReportStore()
+    store.plan([planned])
+
+    store.put(planned, {'dataset': {}})
+    store.put(other, {'dataset': {}})
+    assert store.get(planned) is not None
+    assert store.get(other) is None
+
+    store.plan([other])
+    assert store.get(planned) is None
+
+
+@pytest.mark.asyncio
+async def test_run_once(settings: Settings, fake_yt: FakeYouTrack):
+    store = ReportStore()
+    fake_yt.errors['ab-1'] = RuntimeError('Boom')
+
+    scheduler = ReportScheduler(settings=settings, store=store, translator_factory=lambda lang: lambda text: f'{lang}:{text}',
+                                langs=['en', 'ru'], run_at=time(3, 0))
+    await scheduler.run_once()
+
+    assert len(store) == 24
+    # Данные каждого отчёта загружаются один раз для всех языков: 2 отчёта × 2 проекта × 3 пресета
+    assert len(fake_yt.queries) == 12
+    assert len([i for i in fake_yt.requests if i.path.endswith('/activities')]) == 6
+    for lang in ('en', 'ru'):
+        key = ReportKey.from_request(mode='scope-increase', lang=lang, projects=['id'], components=['Core', 'UI'],
+                                     begin=WEEK_BEGIN, end=TODAY)
+        assert store.get(key).data['dataset']['entries'][0]['anomalies'][0]['description'].startswith(f'{lang}:')
+    key = ReportKey.from_request(mode='scope-increase', lang='en', projects=['id'], components=['Core', 'UI'], begin=WEEK_BEGIN, end=TODAY)
+    assert [i['id'] for i in store.get(key).data['dataset']['entries']] == ['id-1']
+    # Ошибка по задаче не мешает сохранить отчёт
+    key = ReportKey.from_request(mode='scope-increase', lang='en', projects=['ab'], components=['Backend'], begin=WEEK_BEGIN, end=TODAY)
+    assert store.get(key).data['dataset']['failures'] == [{'id': 'ab-1', 'text': 'Boom'}]
+
+
+def test_shared_store(tmp_path: Path):
+    dates = dict(begin='2025-01-01', end='2025-02-01')
+    planned = ReportKey.from_request(mode='scope-overrun', lang='en', projects=['id'], components=['UI'], **dates)
+    other = ReportKey.from_request(mode='scope-overrun', lang='ru', projects=['id'], components=['UI'], **dates)
+    # Два воркера с общим каталогом
+    leader, worker = ReportStore(directory=tmp_path), ReportStore(directory=tmp_path)
+    leader.plan([planned])
+    leader.put(planned, {'dataset': {'query': 'Leader'}})
+    assert worker.is_planned(planned) and not worker.is_planned(other)
+    assert worker.get(planned).data == {'dataset': {'query': 'Leader'}}
+
+    # Обновлённый по запросу отчёт видят все
+    worker.put(planned, {'dataset': {'query': 'Refreshed'}})
+    assert leader.get(planned).data == {'dataset': {'query': 'Refreshed'}}
+
+    leader.plan([other])
+    assert worker.get(planned) is None
+    assert len(worker) == 0
+    assert not (tmp_path / planned.file_name).exists()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fcntl is required for leader election')
+@pytest.mark.asyncio
+async def test_only_leader_computes(settings: Settings, tmp_path: Path):
+    first, second = (ReportScheduler(settings=settings, store=ReportStore(directory=tmp_path), translator_factory=lambda lang: _,
+                                     langs=['en'], run_at=time(3, 0), lock_path=tmp_path / 'scheduler.lock') for _i in range(2))
+    assert first.is_leader()
+    assert first.is_leader()  # блокировка остаётся у него
+    assert not second.is_leader()
+    await first.stop()
+    assert second.is_leader()
+    await second.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('run_on_start', [False, True])
+async def test_first_run_waits_for_run_at(settings: Settings, fake_yt: FakeYouTrack, run_on_start: bool):
+    store = ReportStore()
+    # Следующий запуск - через час
+    run_at = (datetime.now(tz=timezone.utc) + timedelta(hours=1)).time()
+    scheduler = ReportScheduler(settings=settings, store=store, translator_factory=lambda lang: _, langs=['en'],
+                                run_at=run_at, run_on_start=run_on_start)
+    scheduler.start()
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+    assert (len(fake_yt.queries) > 0) == run_on_start
+
+
+def test_seconds_until_next_run(settings: Settings):
+    scheduler = make_scheduler(settings, ReportStore())
+    assert scheduler.seconds_until_next_run(datetime(2025, 4, 1, 2, 0, tzinfo=timezone.utc)) == 3600
+    assert scheduler.seconds_until_next_run(datetime(2025, 4, 1, 3, 0, tzinfo=timezone.utc)) == 24 * 3600
+
+
+@pytest.mark.asyncio
+async def test_stored_events_match_report(settings: Settings, fake_yt: FakeYouTrack):
+    params = dict(projects=['id'], components=['Core', 'UI'], begin=WEEK_BEGIN, end=TODAY)
+    key = ReportKey.from_request(mode='scope-increase', lang='en', **params)
+    store = ReportStore()
+    store.plan([key])
+
+    events = get_batch_scope_increase_events(translator=_, settings=settings, **params)
+    [i async for i in store_scope_increase_events(events=events, store=store, key=key)]
+
+    report = await get_batch_scope_increase_data(translator=_, settings=settings, **params)
+    assert store.get(key).data == report
+
+
+def test_page_is_served_from_store(monkeypatch, settings: Settings, fake_yt: FakeYouTrack):
+    key = ReportKey.from_request(mode='scope-overrun', lang='en', projects=['id'], components=['Core', 'UI'], begin=WEEK_BEGIN, end=TODAY)
+    store = ReportStore()
+    store.plan([key])
+    store.put(key, {'dataset': {'entries': [], 'query': 'Stored query', 'query_url': 'https://my-yt.myjetbrains.com'}})
+    monkeypatch.setattr(main.app.state, 'settings', settings, raising=False)
+    monkeypatch.setattr(main.app.state, 'report_store', store)
+    client = TestClient(main.app)
+    url = f'/en/batch/scope-overrun?project=id&component=UI&component=Core&begin={WEEK_BEGIN}&end={TODAY}'
+
+    response = client.get(url, follow_redirects=True)
+    assert response.status_code == 200
+    assert 'id="report-freshness"' in response.text
+    assert 'Stored query' in response.text
+    assert fake_yt.queries == []
+
+    # Обновление по запросу пересчитывает отчёт и кладёт его в хранилище
+    response = client.get(url + '&refresh=1', follow_redirects=True)
+    assert 'id="report-freshness"' not in response.text
+    assert len(fake_yt.queries) == 1
+    assert store.get(key).data['dataset']['query'].startswith('project: id')
+
+
+def test_events_with_unsupported_language_are_not_stored(monkeypatch, settings: Settings, fake_yt: FakeYouTrack):
+    store = ReportStore()
+    monkeypatch.setattr(main.app.state, 'settings', settings, raising=False)
+    monkeypatch.setattr(main.app.state, 'report_store', store)
+    client = TestClient(main.app)
+
+    response = client.get(f'/xx/batch/scope-increase/events?project=id&component=UI&begin={WEEK_BEGIN}&end={TODAY}')
+    assert response.status_code == 404
+    assert fake_yt.queries == []
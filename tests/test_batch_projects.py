@@ -0,0 +1,162 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import time
+import pytest
+
+from app.batch import get_batch_scope_overrun_data, get_batch_scope_increase_data, BadQueryError
+from app.batch.batch_shared import validate_input_params
+from app.settings import Settings
+from youtrack.entities import ProjectExt
+from youtrack.instance import YouTrackInstanceConfig
+from youtrack.helper import YouTrackHelper
+from youtrack.utils.exceptions import TooMuchIssuesInBatchError
+from youtrack.utils.query import SearchQueryBuilder
+
+from .fake_youtrack import FakeYouTrack, make_batch_issue, make_scope_activities
+
+
+DATES = dict(begin='2025-04-01', end='2025-05-01')
+
+
+def _(text: str) -> str:
+    return text
+
+
+@pytest.fixture
+def settings(make_settings):
+    yt_config = YouTrackInstanceConfig(projects={
+        'id': ProjectExt(short_name='id', name='Project', id='0-1', components=['Core', 'UI']),
+        'ab': ProjectExt(short_name='ab', name='Another project', id='0-2', components=['Core', 'Backend']),
+        'cd': ProjectExt(short_name='cd', name='Third project', id='0-3', components=['Docs']),
+    })
+    return make_settings(yt_config)
+
+
+@pytest.fixture
+def fake_yt(fake_youtrack):
+    issues = {
+        'id-1': make_batch_issue('id-1', scope_minutes=480, spent_minutes=960),
+        'id-2': make_batch_issue('id-2', scope_minutes=480, spent_minutes=240),
+        'ab-1': make_batch_issue('ab-1', scope_minutes=60, spent_minutes=120, project='ab'),
+        'cd-1': make_batch_issue('cd-1', scope_minutes=60, spent_minutes=120, project='cd'),
+    }
+    activities = {
+        'id-1': make_scope_activities([(480, 960)]),
+        'id-2': make_scope_activities([]),
+        'ab-1': make_scope_activities([(60, 120)]),
+        'cd-1': make_scope_activities([]),
+    }
+    return fake_youtrack(issues, activities)
+
+
+def test_components_by_project(settings: Settings):
+    assert validate_input_params(yt_config=settings.yt_config, projects=['id', 'ab', 'id'], components=['Core', 'UI']) == {
+        'id': ['Core', 'UI'],
+        'ab': ['Core'],
+    }
+    assert validate_input_params(yt_config=settings.yt_config, projects=['cd'], components=[]) == {'cd': []}
+
+
+@pytest.mark.parametrize('projects,components,bad_params', [
+    ([], ['Core'], ['project']),
+    (['id', 'zz'], ['Core'], ['zz']),
+    (['id', 'ab'], ['Docs'], ['Docs']),
+    (['id', 'cd'], ['Core'], ['cd']),  # у проекта нет ни одного выбранного компонента
+])
+def test_bad_projects(settings: Settings, projects: list[str], components: list[str], bad_params: list[str]):
+    with pytest.raises(BadQueryError) as e:
+        validate_input_params(yt_config=settings.yt_config, projects=projects, components=components)
+    assert e.value.bad_params == bad_params
+
+
+def test_build_any():
+    first = SearchQueryBuilder(project='id', components=['Core'])
+    second = SearchQueryBuilder(project='ab', components=['Back end'])
+    assert SearchQueryBuilder.BuildAny([first]) == first.Build()
+    assert SearchQueryBuilder.BuildAny([first, second]) == \
+        '(project: id Component: Core) or (project: ab Component: {Back end}) sort by: updated'
+
+
+@pytest.mark.asyncio
+async def test_overrun_subtotals(settings: Settings, fake_yt: FakeYouTrack):
+    data = await get_batch_scope_overrun_data(translator=_, settings=settings, projects=['id', 'ab'], components=['Core'], **DATES)
+
+    dataset = data['dataset']
+    assert sorted(i['id'] for i in dataset['entries']) == ['ab-1', 'id-1']
+    assert dataset['stats']['count_total'] == 3
+    assert [(i['project'], i['count_total'], i['count_scope_overrun'], i['mean_overrun']) for i in dataset['stats']['projects']] == [
+        ('id', 2, 1, '1d'),
+        ('ab', 1, 1, '1h'),
+    ]
+    assert dataset['query'].startswith('(project: id Component: Core')
+
+
+@pytest.mark.asyncio
+async def test_single_project_has_no_subtotals(settings: Settings, fake_yt: FakeYouTrack):
+    data = await get_batch_scope_overrun_data(translator=_, settings=settings, projects=['id'], components=['Core'], **DATES)
+    assert 'projects' not in data['dataset']['stats']
+    assert data['dataset']['query'].startswith('project: id Component: Core')
+
+
+@pytest.mark.asyncio
+async def test_scope_increase_subtotals(settings: Settings, fake_yt: FakeYouTrack):
+    data = await get_batch_scope_increase_data(translator=_, settings=settings, projects=['id', 'ab'], components=['Core'], **DATES)
+
+    stats = data['dataset']['stats']
+    assert stats['count_fail'] == 2
+    assert [(i['project'], i['count_total'], i['count_fail'], i['mean_scope_increase']) for i in stats['projects']] == [
+        ('id', 2, 1, '1d'),
+        ('ab', 1, 1, '1h'),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_projects_are_fetched_concurrently(settings: Settings, fake_yt: FakeYouTrack):
+    fake_yt.query_delay = 0.1
+
+    started = time.monotonic()
+    await get_batch_scope_overrun_data(translator=_, settings=settings, projects=['id', 'ab', 'cd'], components=[], **DATES)
+
+    assert len(fake_yt.queries) == 3
+    assert time.monotonic() - started < 0.2
+
+
+@pytest.mark.asyncio
+async def test_overlapping_selections_reuse_projects(settings: Settings, fake_yt: FakeYouTrack):
+    await get_batch_scope_overrun_data(translator=_, settings=settings, projects=['id', 'ab'], components=['Core'], **DATES)
+    assert len(fake_yt.queries) == 2
+
+    # 'id' уже получен (с теми же компонентами и датами) — запрашивается только 'cd'
+    await get_batch_scope_increase_data(translator=_, settings=settings, projects=['id', 'cd'], components=['Core', 'Docs'], **DATES)
+    assert len(fake_yt.queries) == 3
+    assert fake_yt.queries[-1].startswith('project: cd')
+
+    settings.app_config.batch_cache_ttl = 0
+    await get_batch_scope_overrun_data(translator=_, settings=settings, projects=['id'], components=['Core'], **DATES)
+    assert len(fake_yt.queries) == 4
+
+
+@pytest.mark.asyncio
+async def test_issue_limit_is_total_over_projects(monkeypatch, settings: Settings, fake_yt: FakeYouTrack):
+    monkeypatch.setattr(YouTrackHelper, 'MAX_ISSUE_COUNT', 2)
+    await get_batch_scope_increase_data(translator=_, settings=settings, projects=['id'], components=[], **DATES)
+    requests = len(fake_yt.requests)
+
+    # В каждом проекте не больше 2 задач, но вместе их 4: активности не запрашиваются
+    with pytest.raises(TooMuchIssuesInBatchError):
+        await get_batch_scope_increase_data(translator=_, settings=settings, projects=['id', 'ab', 'cd'], components=[], **DATES)
+    assert len(fake_yt.requests) == requests
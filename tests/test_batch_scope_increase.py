@@ -0,0 +1,225 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from aiohttp import ClientResponseError
+from starlette.requests import Request
+from statistics import mean, median
+import asyncio
+import json
+import pytest
+
+from app.batch import get_batch_scope_increase_data, get_batch_scope_increase_events, BadDatesError
+from app.batch.scope_increase import ScopeIncreaseStats, IssueResult
+from app.batch.batch_shared import BATCH_CONCURRENCY
+from app.settings import Settings
+from app.utils.disconnect import ClientDisconnectedError, cancel_on_disconnect
+from app.utils.metrics import metrics
+from app.utils.sse import format_event
+from youtrack.entities import ProjectExt
+from youtrack.utils.exceptions import UpstreamUnavailableError
+from youtrack.instance import YouTrackInstanceConfig
+
+from .fake_youtrack import FakeYouTrack, make_batch_issue, make_scope_activities
+
+
+# id задачи -> изменения Scope (минуты до/после)
+SCOPE_CHANGES: dict[str, list[tuple[int, int]]] = {
+    'id-1': [],
+    'id-2': [(480, 960)],
+    'id-3': [(480, 600), (600, 540), (540, 1200)],
+    'id-4': [(960, 480)],
+    'id-5': [(60, 120)],
+}
+REPORT_PARAMS = dict(projects=['id'], components=['Core'], begin='2025-04-01', end='2025-05-01')
+
+
+def _(text: str) -> str:
+    return text
+
+
+@pytest.fixture
+def settings(make_settings):
+    project = ProjectExt(short_name='id', name='Project', id='0-1', components=['Core'])
+    return make_settings(YouTrackInstanceConfig(projects={'id': project}))
+
+
+@pytest.fixture
+def fake_yt(fake_youtrack):
+    issues = {i: make_batch_issue(i) for i in SCOPE_CHANGES}
+    activities = {i: make_scope_activities(changes) for i, changes in SCOPE_CHANGES.items()}
+    return fake_youtrack(issues, activities)
+
+
+def test_stats_match_statistics_module():
+    values = [0, 600, 120, 0, 3600, 60, 60]
+    stats = ScopeIncreaseStats(count_total=len(values) + 1)
+    for i, value in enumerate(values):
+        stats.add(IssueResult(entry={'id': f'id-{i}'}, increase_sec=value))
+    stats.add(IssueResult(entry={'id': 'id-404'}, error='Not found'))
+    increases = [i for i in values if i > 0]
+
+    assert stats.count_processed == len(values) + 1
+    assert stats.count_fail == len(increases)
+    assert stats.increases.mean == mean(increases)
+    assert stats.increases.median == median(increases)
+    assert stats.to_dict()['count_ok'] == 2
+    assert stats.failures == [{'id': 'id-404', 'text': 'Not found'}]
+
+
+@pytest.mark.asyncio
+async def test_report(settings: Settings, fake_yt: FakeYouTrack):
+    data = await get_batch_scope_increase_data(translator=_, settings=settings, **REPORT_PARAMS)
+
+    dataset = data['dataset']
+    assert sorted(i['id'] for i in dataset['entries']) == ['id-2', 'id-3', 'id-5']
+    assert dataset['stats']['count_total'] == 5
+    assert dataset['stats']['count_fail'] == 3
+    assert dataset['stats']['median_scope_increase'] == '1d'  # 1d = 8h
+
+
+@pytest.mark.asyncio
+async def test_events_match_report(settings: Settings, fake_yt: FakeYouTrack):
+    fake_yt.delays = {'id-2': 0.05, 'id-3': 0.02}
+    report = await get_batch_scope_increase_data(translator=_, settings=settings, **REPORT_PARAMS)
+
+    events = [i async for i in get_batch_scope_increase_events(translator=_, settings=settings, **REPORT_PARAMS)]
+
+    names = [name for name, _ in events]
+    assert names == ['start'] + ['progress'] * 5 + ['done']
+    assert events[0][1]['stats']['count_processed'] == 0
+    # Медленные задачи приходят последними
+    progress = [data for name, data in events if name == 'progress']
+    assert [i['row']['id'] for i in progress if i['row']][-2:] == ['id-3', 'id-2']
+    assert [i['stats']['count_processed'] for i in progress] == [1, 2, 3, 4, 5]
+    # Квантили - только в итоговой статистике
+    assert 'p90_scope_increase' not in progress[-1]['stats']
+    assert events[-1][1]['stats'] == progress[-1]['stats'] | {'p90_scope_increase': events[-1][1]['stats']['p90_scope_increase'],
+                                                              'p99_scope_increase': events[-1][1]['stats']['p99_scope_increase']}
+
+    rows = sorted((i['row'] for i in progress if i['row']), key=lambda x: x['id'])
+    assert rows == sorted(report['dataset']['entries'], key=lambda x: x['id'])
+    final_stats = events[-1][1]['stats']
+    assert final_stats == report['dataset']['stats']
+    assert all(i['failure'] is None for i in progress)
+
+
+@pytest.mark.asyncio
+async def test_activities_after_period_are_not_downloaded(settings: Settings, fake_yt: FakeYouTrack):
+    after_period = 1748736000000  # 2025-06-01
+    noise_types = ['WorkItemActivityItem', 'CommentActivityItem', 'CustomFieldActivityItem']
+    noise = [{'$type': noise_types[i % 3], 'targetMember': None, 'timestamp': after_period + i,
+              'author': {'name': 'Bob'}, 'removed': None, 'added': None} for i in range(300)]
+    # Правка Scope после решения задачи и после конца периода
+    noise.append({'$type': 'CustomFieldActivityItem', 'targetMember': '__CUSTOM_FIELD__Estimation_19',
+                  'timestamp': after_period, 'author': {'name': 'Bob'}, 'removed': 960, 'added': 4800})
+    fake_yt.activities['id-2'] += noise
+
+    data = await get_batch_scope_increase_data(translator=_, settings=settings, **REPORT_PARAMS)
+
+    id_2 = next(i for i in data['dataset']['entries'] if i['id'] == 'id-2')
+    assert id_2['increased_total_value'] == 8 * 3600
+    activity_requests = [i for i in fake_yt.requests if i.path.endswith('/activities')]
+    assert all(int(i.query['end']) < after_period for i in activity_requests)
+    # «Шум» после периода не передаётся
+    assert fake_yt.activities_bytes['id-2'] == len(json.dumps(make_scope_activities(SCOPE_CHANGES['id-2'])))
+
+
+@pytest.mark.asyncio
+async def test_failed_issue_does_not_abort_report(settings: Settings, fake_yt: FakeYouTrack):
+    fake_yt.errors['id-3'] = ClientResponseError(request_info=None, history=(), status=403)
+    fake_yt.errors['id-4'] = RuntimeError('Boom')
+
+    data = await get_batch_scope_increase_data(translator=_, settings=settings, **REPORT_PARAMS)
+
+    dataset = data['dataset']
+    assert sorted(i['id'] for i in dataset['entries']) == ['id-2', 'id-5']
+    assert sorted(dataset['failures'], key=lambda x: x['id']) == [{'id': 'id-3', 'text': 'batch.issue_error.forbidden'},
+                                                                  {'id': 'id-4', 'text': 'Boom'}]
+    assert dataset['stats']['count_errors'] == 2
+    assert dataset['stats']['count_ok'] + dataset['stats']['count_fail'] + dataset['stats']['count_errors'] == 5
+
+
+@pytest.mark.asyncio
+async def test_slow_issue_does_not_block_others(settings: Settings, fake_youtrack):
+    issues = {f'id-{i}': make_batch_issue(f'id-{i}') for i in range(1, 151)}
+    activities = {i: make_scope_activities([(480, 960)]) for i in issues}
+    fake_yt = fake_youtrack(issues, activities)
+    fake_yt.delays = {i: 0.001 for i in issues} | {'id-1': 0.3}
+
+    events = [i async for i in get_batch_scope_increase_events(translator=_, settings=settings, **REPORT_PARAMS)]
+
+    rows = [data['row']['id'] for name, data in events if name == 'progress']
+    # Раньше задачи обрабатывались пачками по 100 и id-101..id-150 ждали id-1
+    assert rows[-1] == 'id-1'
+    assert len(rows) == 150
+    assert fake_yt.max_in_flight <= BATCH_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_events_bad_params(settings: Settings, fake_yt: FakeYouTrack):
+    with pytest.raises(BadDatesError):
+        async for _event in get_batch_scope_increase_events(translator=_, settings=settings,
+                                                            **(REPORT_PARAMS | dict(begin='2025-05-02'))):
+            pass
+    assert fake_yt.queries == []
+
+
+def test_format_event():
+    assert format_event('done', {'text': 'Готово'}) == 'event: done\ndata: {"text": "Готово"}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_disconnect_stops_activity_requests(settings: Settings, fake_youtrack):
+    issues = {f'id-{i}': make_batch_issue(f'id-{i}') for i in range(1, 201)}
+    activities = {i: make_scope_activities([(480, 960)]) for i in issues}
+    fake_yt = fake_youtrack(issues, activities)
+    fake_yt.delays = {i: 0.01 for i in issues}
+    cancelled = metrics.counter('batch_issues_cancelled_total', '').get()
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    request = Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': []}, receive)
+    report = asyncio.create_task(cancel_on_disconnect(request=request,
+                                                      work=get_batch_scope_increase_data(translator=_, settings=settings, **REPORT_PARAMS),
+                                                      name='scope-increase'))
+    await asyncio.sleep(0.03)
+    disconnected.set()
+    with pytest.raises(ClientDisconnectedError):
+        await report
+
+    requested = len([i for i in fake_yt.requests if i.path.endswith('/activities')])
+    assert 0 < requested < len(issues)
+    assert fake_yt.in_flight == 0
+    await asyncio.sleep(0.05)
+    # После отмены к YouTrack больше не обращаемся
+    assert len([i for i in fake_yt.requests if i.path.endswith('/activities')]) == requested
+    assert metrics.counter('batch_issues_cancelled_total', '').get() - cancelled == len(issues) - requested + BATCH_CONCURRENCY
+
+
+@pytest.mark.asyncio
+async def test_unavailable_youtrack_aborts_report(settings: Settings, fake_youtrack):
+    issues = {f'id-{i}': make_batch_issue(f'id-{i}') for i in range(1, 101)}
+    activities = {i: make_scope_activities([(480, 960)]) for i in issues}
+    fake_yt = fake_youtrack(issues, activities)
+    fake_yt.errors = {i: UpstreamUnavailableError(endpoint='activities', retry_after=15) for i in issues}
+
+    with pytest.raises(UpstreamUnavailableError):
+        await get_batch_scope_increase_data(translator=_, settings=settings, **REPORT_PARAMS)
+    # Не сотня отказов по задачам: отчёт прерван после первых
+    assert len([i for i in fake_yt.requests if i.path.endswith('/activities')]) <= BATCH_CONCURRENCY
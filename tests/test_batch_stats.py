@@ -0,0 +1,106 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import random
+import numpy
+import pytest
+
+from app.batch.stats import StreamingStats
+from app.batch.scope_overrun import get_overrun_stats
+
+
+VALUES = [0, 600, 120, 3600, 60, 60, 28800, 7, 54000, 900]
+
+
+def test_exact_matches_numpy():
+    stats = StreamingStats()
+    for i in VALUES:
+        stats.add(i)
+
+    assert stats.is_exact
+    assert stats.count == len(VALUES)
+    assert stats.mean == numpy.mean(VALUES)
+    assert stats.median == numpy.median(VALUES)
+    for q in (0, 0.25, 0.9, 0.99, 1):
+        assert stats.quantile(q) == pytest.approx(numpy.quantile(VALUES, q))
+    assert (stats.min, stats.max) == (0, 54000)
+
+
+def test_empty():
+    stats = StreamingStats()
+    assert (stats.mean, stats.median, stats.quantile(0.99)) == (0, 0, 0)
+
+
+def test_negative_value():
+    with pytest.raises(ValueError):
+        StreamingStats().add(-1)
+
+
+def test_histogram():
+    stats = StreamingStats(histogram_edges=(60, 3600))
+    for i in VALUES:
+        stats.add(i)
+    assert stats.histogram() == [(60, 4), (3600, 4), (None, 2)]
+
+
+def test_sketch_relative_accuracy():
+    rnd = random.Random(42)
+    values = [int(rnd.lognormvariate(9, 1.5)) for _ in range(20000)]
+    stats = StreamingStats(exact_limit=1000, relative_accuracy=0.01)
+    for i in values:
+        stats.add(i)
+
+    assert not stats.is_exact
+    assert stats.mean == pytest.approx(numpy.mean(values))
+    for q in (0.5, 0.9, 0.99):
+        # Соседние значения могут попасть в разные ранги, поэтому сравниваем с квантилями соседей
+        low, high = numpy.quantile(values, [max(q - 0.001, 0), min(q + 0.001, 1)], method='lower')
+        assert low * 0.99 <= stats.quantile(q) <= high * 1.01
+
+
+def test_merge_matches_single_pass():
+    rnd = random.Random(7)
+    values = [rnd.randint(0, 100000) for _ in range(3000)]
+    single = StreamingStats(exact_limit=1000)
+    parts = [StreamingStats(exact_limit=1000) for _ in range(3)]
+    for i, value in enumerate(values):
+        single.add(value)
+        parts[i % 3].add(value)
+    merged = StreamingStats(exact_limit=1000)
+    for part in parts:
+        merged.merge(part)
+
+    assert merged.count == single.count
+    assert merged.mean == pytest.approx(single.mean)
+    assert merged.histogram() == single.histogram()
+    for q in (0.5, 0.9, 0.99):
+        assert merged.quantile(q) == single.quantile(q)
+
+    small = StreamingStats()
+    small.add(5)
+    small.merge(StreamingStats())
+    assert (small.count, small.is_exact, small.median) == (1, True, 5)
+
+
+def test_overrun_stats():
+    output = [{'scope_overrun_value': i} for i in (3600, 7200, 0)]
+    stats = get_overrun_stats(input=[{}] * 5, output=output)
+    assert stats['count_scope_ok'] == 2
+    assert stats['mean_overrun'] == '1h 30m'
+    assert stats['median_overrun'] == '1h 30m'
+    assert stats['p90_overrun'] == '1h 54m'
+    # Только потерянный Scope — превышений нет
+    assert get_overrun_stats(input=[{}], output=[{'scope_overrun_value': 0}])['mean_overrun'] == '0m'
@@ -339,6 +339,77 @@ class TestUtilityMethods:
         assert real_simple_handlers['handler2'] not in simple_callback_manager
 
 
+class TestEmit:
+    """Тесты заранее собранного диспетчера emit."""
+
+    def test_bool(self, simple_callback_manager, real_simple_handlers):
+        """Пустой менеджер ложен, чтобы не готовить аргументы впустую."""
+        assert not simple_callback_manager
+        simple_callback_manager += real_simple_handlers['handler1']
+        assert simple_callback_manager
+        simple_callback_manager.clear()
+        assert not simple_callback_manager
+
+    def test_emit_empty_manager(self, simple_callback_manager):
+        """Тест emit без коллбеков."""
+        simple_callback_manager.emit(1, 2)
+
+    def test_emit_single_callback_is_called_directly(self, simple_callback_manager):
+        """Единственный коллбек вызывается без промежуточной обёртки."""
+        calls = []
+
+        def handler(x: int, y: int) -> None:
+            calls.append((x, y))
+
+        simple_callback_manager += handler
+        assert simple_callback_manager.emit is handler
+        simple_callback_manager.emit(x=1, y=2)
+        assert calls == [(1, 2)]
+
+    def test_emit_follows_registration_changes(self, simple_callback_manager):
+        """emit пересобирается при добавлении, удалении и очистке."""
+        call_order = []
+
+        def handler1(x: int, y: int) -> None:
+            call_order.append('handler1')
+
+        def handler2(x: int, y: int) -> None:
+            call_order.append('handler2')
+
+        simple_callback_manager += handler1
+        simple_callback_manager += handler2
+        simple_callback_manager.emit(1, 2)
+        assert call_order == ['handler1', 'handler2']
+
+        call_order.clear()
+        simple_callback_manager -= handler1
+        simple_callback_manager.emit(1, 2)
+        assert call_order == ['handler2']
+
+        call_order.clear()
+        simple_callback_manager.clear()
+        simple_callback_manager.emit(1, 2)
+        assert call_order == []
+
+    def test_emit_exception_stops_execution(self, simple_callback_manager):
+        """Исключение в коллбеке останавливает выполнение остальных, как и в __call__."""
+        call_order = []
+
+        def failing_handler(x: int, y: int) -> None:
+            call_order.append('failing')
+            raise RuntimeError("Handler failed")
+
+        def handler(x: int, y: int) -> None:
+            call_order.append('handler')
+
+        simple_callback_manager += failing_handler
+        simple_callback_manager += handler
+
+        with pytest.raises(RuntimeError, match="Handler failed"):
+            simple_callback_manager.emit(1, 2)
+        assert call_order == ['failing']
+
+
 class TestIntegration:
     """Интеграционные тесты полного workflow."""
 
@@ -0,0 +1,94 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from yarl import URL
+import time
+import pytest
+
+from youtrack.utils.circuit_breaker import CircuitBreakers, CircuitState, RetryBudget, get_endpoint_class
+from youtrack.utils.exceptions import UpstreamUnavailableError
+
+
+ISSUE_URL = URL('https://my-yt.myjetbrains.com/youtrack/api/issues/id-1')
+
+
+@pytest.mark.parametrize(
+    'expected, url', [('issue', 'https://my-yt.myjetbrains.com/youtrack/api/issues/id-1?fields=updated'),
+                      ('activities', 'https://my-yt.myjetbrains.com/youtrack/api/issues/id-1/activities?fields=id'),
+                      ('search', 'https://my-yt.myjetbrains.com/youtrack/api/issues?query=project:+id&$top=50'),
+                      ('count', 'https://my-yt.myjetbrains.com/youtrack/api/issuesGetter/count?fields=count'),
+                      ('admin', 'https://my-yt.myjetbrains.com/youtrack/api/admin/projects?fields=id')]
+)
+def test_endpoint_class(expected: str, url: str):
+    assert get_endpoint_class(URL(url)) == expected
+
+
+def test_opens_after_failures_and_recovers():
+    transitions: list[tuple[str, CircuitState]] = []
+
+    def on_state_changed(endpoint: str, state: CircuitState) -> None:
+        transitions.append((endpoint, state))
+
+    breakers = CircuitBreakers(failure_threshold=3, reset_timeout_sec=0.05)
+    breakers.cb_state_changed += on_state_changed
+    breaker = breakers.get(ISSUE_URL)
+    for _ in range(3):
+        breaker.check()
+        breaker.on_failure()
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.check()
+    # Другие эндпоинты не затронуты
+    breakers.get(ISSUE_URL / 'activities').check()
+
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.fail_fast()
+
+    time.sleep(0.06)
+    breaker.fail_fast()  # только проверка: пробный запрос не занимает
+    assert breaker.state == CircuitState.OPEN
+    breaker.check()  # пробный запрос
+    assert breaker.state == CircuitState.HALF_OPEN
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.check()  # пока пробный запрос не завершился
+    breaker.on_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    time.sleep(0.06)
+    breaker.check()
+    breaker.on_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert [i[1] for i in transitions] == [CircuitState.OPEN, CircuitState.HALF_OPEN, CircuitState.OPEN,
+                                           CircuitState.HALF_OPEN, CircuitState.CLOSED]
+
+
+def test_success_resets_failures():
+    breaker = CircuitBreakers(failure_threshold=2).get(ISSUE_URL)
+    for _ in range(5):
+        breaker.on_failure()
+        breaker.on_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.25, min_per_sec=0, max_balance=2)
+    assert budget.try_retry() and budget.try_retry()
+    assert not budget.try_retry()
+    # 4 запроса - один повтор
+    for _ in range(4):
+        budget.on_request()
+    assert budget.try_retry()
+    assert not budget.try_retry()
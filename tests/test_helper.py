@@ -14,8 +14,23 @@
 # limitations under the License.
 
 
+from aiohttp import ClientResponseError
+from yarl import URL
 from youtrack.helper import YouTrackHelper
+from youtrack.utils.circuit_breaker import CircuitBreakers, CircuitState, RetryBudget
+from youtrack.utils.exceptions import UpstreamUnavailableError
+from youtrack.utils.limiter import Priority, PriorityLimiter
+from youtrack.utils.rate_limiter import SharedTokenBucket
+import asyncio
 import pytest
+import time
+
+
+@pytest.fixture(autouse=True)
+def upstream_state(monkeypatch):
+    """Размыкатели и бюджет повторов общие для процесса - у каждого теста свои"""
+    monkeypatch.setattr(YouTrackHelper, 'circuit_breakers', CircuitBreakers(failure_threshold=3, reset_timeout_sec=60))
+    monkeypatch.setattr(YouTrackHelper, 'retry_budget', RetryBudget())
 
 
 @pytest.fixture
@@ -38,3 +53,163 @@ def helper_auth_data():
 def test_parse_issue_id_from_request(helper_auth_data: dict[str, str], req: str, expected: str | None):
     a = YouTrackHelper(**helper_auth_data)
     assert a.extract_issue_id(req) == expected
+
+
+class FakeSession:
+    """aiohttp.ClientSession, отвечающий заданными статусами по очереди"""
+
+    class Response:
+        def __init__(self, status: int):
+            self.status = status
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return False
+
+        def raise_for_status(self):
+            if self.status >= 400:
+                raise ClientResponseError(request_info=None, history=(), status=self.status)
+
+        async def json(self):
+            return {'ok': True}
+
+    def __init__(self, statuses: list[int], limiter: asyncio.Semaphore):
+        self.statuses = statuses
+        self.limiter = limiter
+        self.calls = 0
+        self.locked_during_calls: list[bool] = []
+
+    def get(self, url, headers):
+        self.locked_during_calls.append(self.limiter.locked())
+        self.calls += 1
+        return FakeSession.Response(self.statuses.pop(0))
+
+
+@pytest.mark.parametrize(
+    'statuses, expected_calls, is_ok', [([200], 1, True),
+                                        ([503, 429, 200], 3, True),
+                                        ([403], 1, False),  # нет смысла повторять
+                                        ([404], 1, False),
+                                        ([500, 500, 500], 3, False)]
+)
+@pytest.mark.asyncio
+async def test_fetch_json_retries(helper_auth_data: dict[str, str], statuses: list[int], expected_calls: int, is_ok: bool):
+    helper = YouTrackHelper(**helper_auth_data)
+    limiter = asyncio.Semaphore(1)
+    session = FakeSession(statuses=statuses, limiter=limiter)
+    fetch = helper._YouTrackHelper__fetch_json_ex(session=session,
+                                                  fetch_sem=limiter,
+                                                  url=URL('https://my-yt.myjetbrains.com/youtrack/api/issues/id-1'),
+                                                  backoff_schedule=(0.01, 0.01, 0.01))
+    if is_ok:
+        assert await fetch == {'ok': True}
+    else:
+        with pytest.raises(ClientResponseError):
+            await fetch
+    assert session.calls == expected_calls
+    # Каждая попытка занимает слот, а после ответа (или ошибки) его освобождает
+    assert all(session.locked_during_calls)
+    assert not limiter.locked()
+
+
+@pytest.mark.asyncio
+async def test_fetch_json_backoff_releases_limiter(helper_auth_data: dict[str, str]):
+    helper = YouTrackHelper(**helper_auth_data)
+    limiter = asyncio.Semaphore(1)
+    session = FakeSession(statuses=[503, 200], limiter=limiter)
+    url = URL('https://my-yt.myjetbrains.com/youtrack/api/issues/id-1')
+    task = asyncio.create_task(helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url,
+                                                                     backoff_schedule=(0.2, 0.2, 0.2)))
+    while session.calls == 0:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    # Первая попытка неудачна, идёт бэкофф: слот свободен для других запросов
+    assert not limiter.locked()
+    assert await task == {'ok': True}
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast(helper_auth_data: dict[str, str]):
+    helper = YouTrackHelper(**helper_auth_data)
+    limiter = asyncio.Semaphore(1)
+    session = FakeSession(statuses=[503] * 3, limiter=limiter)
+    url = URL('https://my-yt.myjetbrains.com/youtrack/api/issues/id-1')
+    with pytest.raises(ClientResponseError):
+        await helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url, backoff_schedule=(0.01, 0.01, 0.01))
+
+    # Три отказа подряд: дальше YouTrack не спрашиваем, ни попыток, ни бэкоффов
+    with pytest.raises(UpstreamUnavailableError):
+        await helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url, backoff_schedule=(1, 1, 1))
+    assert session.calls == 3
+    # Активности - другой класс эндпоинтов, его размыкатель замкнут
+    session.statuses = [200]
+    assert await helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url / 'activities') == {'ok': True}
+
+
+@pytest.mark.asyncio
+async def test_circuit_recovers_after_reset_timeout(monkeypatch, helper_auth_data: dict[str, str]):
+    monkeypatch.setattr(YouTrackHelper, 'circuit_breakers', CircuitBreakers(failure_threshold=3, reset_timeout_sec=0.05))
+    helper = YouTrackHelper(**helper_auth_data)
+    limiter = asyncio.Semaphore(1)
+    session = FakeSession(statuses=[503] * 3, limiter=limiter)
+    url = URL('https://my-yt.myjetbrains.com/youtrack/api/issues/id-1')
+    breaker = YouTrackHelper.circuit_breakers.get(url)
+    with pytest.raises(ClientResponseError):
+        await helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url, backoff_schedule=(0.01, 0.01, 0.01))
+    assert breaker.state == CircuitState.OPEN
+
+    # Таймаут истёк, YouTrack восстановился: пробный запрос проходит и замыкает цепь
+    await asyncio.sleep(0.06)
+    session.statuses = [200, 200]
+    assert await helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url) == {'ok': True}
+    assert breaker.state == CircuitState.CLOSED
+    assert await helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url) == {'ok': True}
+    assert session.calls == 5
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_limits_retries(monkeypatch, helper_auth_data: dict[str, str]):
+    monkeypatch.setattr(YouTrackHelper, 'retry_budget', RetryBudget(ratio=0.5, min_per_sec=0, max_balance=1))
+    helper = YouTrackHelper(**helper_auth_data)
+    limiter = asyncio.Semaphore(1)
+    session = FakeSession(statuses=[503, 503, 200, 503, 200], limiter=limiter)
+    url = URL('https://my-yt.myjetbrains.com/youtrack/api/issues/id-1')
+
+    # Бюджета хватает на один повтор
+    with pytest.raises(ClientResponseError):
+        await helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url, backoff_schedule=(0.01, 0.01, 0.01))
+    assert session.calls == 2
+    # Каждый запрос пополняет бюджет на `ratio`
+    assert await helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url) == {'ok': True}
+    assert await helper._YouTrackHelper__fetch_json_ex(session=session, fetch_sem=limiter, url=url,
+                                                       backoff_schedule=(0.01, 0.01, 0.01)) == {'ok': True}
+    assert session.calls == 5
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_keeps_interactive_lane(monkeypatch, tmp_path, helper_auth_data: dict[str, str]):
+    rate = 20
+    limiter = PriorityLimiter(max_concurrent=2, reserved_interactive=1)
+    bucket = SharedTokenBucket(path=tmp_path / 'bucket', rate=rate, burst=1)
+    monkeypatch.setattr(YouTrackHelper, 'upstream_limiter', limiter)
+    monkeypatch.setattr(YouTrackHelper, 'rate_limiter', bucket)
+    helper = YouTrackHelper(**helper_auth_data)
+    session = FakeSession(statuses=[200] * 20, limiter=asyncio.Semaphore(1))
+    url = URL('https://my-yt.myjetbrains.com/youtrack/api/issues/id-1')
+    fetch = helper._YouTrackHelper__fetch_json
+
+    await fetch(session=session, url=url)  # расходуем запас
+    batch = [asyncio.create_task(fetch(session=session, url=url, priority=Priority.BATCH)) for _ in range(10)]
+    await asyncio.sleep(0.01)
+    # Ждущие токена batch-запросы не занимают слоты
+    assert limiter.active_by(Priority.BATCH) == 0
+
+    begin = time.monotonic()
+    assert await fetch(session=session, url=url, priority=Priority.INTERACTIVE) == {'ok': True}
+    assert time.monotonic() - begin < 2.5 / rate
+    for i in batch:
+        i.cancel()
+    await asyncio.gather(*batch, return_exceptions=True)
+    bucket.close()
@@ -0,0 +1,102 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from youtrack.entities import CustomFields
+from youtrack.helper import YouTrackHelper
+from youtrack.utils.anomalies import AnomaliesDetector
+from youtrack.utils.duration import Duration
+from youtrack.utils.exceptions import InvalidIssueIdError
+
+from .corpus import get_corpus_issues
+from .fake_youtrack import FakeYouTrack
+
+
+@pytest.fixture
+def helper(make_settings):
+    app_config = make_settings().app_config
+    return YouTrackHelper(instance_url=app_config.host, api_key=app_config.api_key)
+
+
+@pytest.fixture
+def fake_yt(fake_youtrack):
+    return fake_youtrack(*get_corpus_issues())
+
+
+def make_detector() -> AnomaliesDetector:
+    return AnomaliesDetector(review_thresshold=Duration.from_minutes(60 * 8 * 2))
+
+
+async def collect(helper: YouTrackHelper, ids: list[str], concurrency: int = 10):
+    return [i async for i in helper.get_summaries(ids=ids,
+                                                  anomaly_detector_factory=make_detector,
+                                                  custom_fields=CustomFields.default_config(),
+                                                  concurrency=concurrency)]
+
+
+@pytest.mark.asyncio
+async def test_get_summaries_single_summary_request(helper: YouTrackHelper, fake_yt: FakeYouTrack):
+    ids = list(fake_yt.issues.keys())
+    results = await collect(helper, ids)
+
+    assert sorted(i.id for i, _ in results) == sorted(ids)
+    summary_requests = [i for i in fake_yt.requests if i.path == '/youtrack/api/issues']
+    assert len(summary_requests) == 1
+    assert summary_requests[0].query['query'] == f'issue id: {", ".join(ids)}'
+    assert len(fake_yt.requests) == len(ids) + 1
+
+    # Отдельный детектор аномалий на каждую задачу
+    assert len({id(detector) for _, detector in results}) == len(ids)
+
+
+@pytest.mark.asyncio
+async def test_get_summaries_same_as_get_summary(helper: YouTrackHelper, fake_yt: FakeYouTrack):
+    results = await collect(helper, ['id-2'])
+    single = await helper.get_summary(id='id-2', anomaly_detector=make_detector(), custom_fields=CustomFields.default_config())
+
+    assert len(results) == 1
+    bulk = results[0][0]
+    assert [str(i) for i in bulk.work_items] == [str(i) for i in single.work_items]
+    assert bulk.assignees == single.assignees
+    assert bulk.started_datetime == single.started_datetime
+
+
+@pytest.mark.asyncio
+async def test_get_summaries_yields_as_completed(helper: YouTrackHelper, fake_yt: FakeYouTrack):
+    fake_yt.delays = {'id-1': 0.2, 'id-2': 0.1}
+    results = await collect(helper, ['id-1', 'id-2', 'id-3'])
+    assert [i.id for i, _ in results] == ['id-3', 'id-2', 'id-1']
+
+
+@pytest.mark.asyncio
+async def test_get_summaries_respects_concurrency(helper: YouTrackHelper, fake_yt: FakeYouTrack):
+    fake_yt.delays = {i: 0.05 for i in fake_yt.issues}
+    await collect(helper, list(fake_yt.issues), concurrency=2)
+    assert fake_yt.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_get_summaries_skips_unknown(helper: YouTrackHelper, fake_yt: FakeYouTrack):
+    results = await collect(helper, ['id-1', 'id-404'])
+    assert [i.id for i, _ in results] == ['id-1']
+
+
+@pytest.mark.asyncio
+async def test_get_summaries_invalid_id(helper: YouTrackHelper, fake_yt: FakeYouTrack):
+    with pytest.raises(InvalidIssueIdError):
+        await collect(helper, ['id-1', 'not an id'])
+    assert fake_yt.requests == []
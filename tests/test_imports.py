@@ -0,0 +1,43 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import subprocess
+import sys
+import pytest
+
+
+HEAVY_MODULES = ('pandas', 'numpy', 'plotly')
+
+
+def get_imported_heavy_modules(code: str) -> list[str]:
+    """Запуск в отдельном процессе: в этом тесты уже могли всё импортировать"""
+    code += f'\nimport sys; print(",".join(i for i in {HEAVY_MODULES!r} if i in sys.modules))'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return [i for i in result.stdout.strip().split(',') if i]
+
+
+@pytest.mark.parametrize('module', ['youtrack.helper', 'app.main'])
+def test_startup_does_not_import_heavy_modules(module: str):
+    assert get_imported_heavy_modules(f'import {module}') == []
+
+
+def test_working_minutes_import_pandas_on_demand():
+    code = '''
+from datetime import datetime
+from youtrack.utils.timeutils import count_working_minutes
+assert count_working_minutes(datetime(2025, 4, 7, 6, 0), datetime(2025, 4, 7, 7, 0)) == 60
+'''
+    assert 'pandas' in get_imported_heavy_modules(code)
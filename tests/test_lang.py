@@ -14,9 +14,16 @@
 # limitations under the License.
 
 
+import asyncio
+import httpx
+import jinja2
 import pytest
-from app.language_middleware import get_link_for_lang
+from app.language_middleware import get_link_for_lang, LanguageMiddleware, language_context
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.templating import Jinja2Templates
 from starlette.datastructures import URL
+from starlette.middleware.sessions import SessionMiddleware
 # from app.language_middleware import get_lang_from_url, LanguageMiddleware
 # from fastapi import FastAPI, Request, HTTPException, status, Depends, Response
 # from fastapi.testclient import TestClient
@@ -56,6 +63,67 @@ def test_change_url_lang(base: str, target_lang: str, expected: str):
     asUrl = get_link_for_lang(url=URL(url=base), lang=target_lang)
     assert asUrl == expectedUrl
 
+
+@pytest.fixture
+def lang_app() -> FastAPI:
+    templates = Jinja2Templates(env=jinja2.Environment(loader=jinja2.DictLoader({'page': "{{ lang }}:{{ _('batch.refresh') }}"})),
+                                context_processors=[language_context])
+    app = FastAPI()
+    app.add_middleware(LanguageMiddleware, skip_paths=('/assets',))
+    app.add_middleware(SessionMiddleware, secret_key='secret')
+
+    @app.get('/{lang}/page')
+    async def page(request: Request):
+        await asyncio.sleep(0.01)  # запросы на разных языках перемешиваются
+        return templates.TemplateResponse(request=request, name='page', context={})
+
+    @app.get('/assets/app.js')
+    async def asset(request: Request):
+        return PlainTextResponse(request.state.lang)
+
+    @app.get('/page')
+    async def page_without_lang(request: Request):
+        return templates.TemplateResponse(request=request, name='page', context={})
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_keep_own_language(lang_app: FastAPI):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=lang_app), base_url='http://test') as client:
+        responses = await asyncio.gather(*[client.get(f'/{lang}/page') for lang in ['en', 'ru'] * 10])
+    assert [i.text for i in responses] == ['en:Refresh', 'ru:Обновить'] * 10
+
+
+@pytest.mark.asyncio
+async def test_language_from_session_and_header(lang_app: FastAPI):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=lang_app), base_url='http://test') as client:
+        assert (await client.get('/page', headers={'Accept-Language': 'ru-RU,ru;q=0.9'})).text == 'ru:Обновить'
+        # Язык из URL запоминается в сессии и важнее заголовка
+        await client.get('/en/page')
+        assert (await client.get('/page', headers={'Accept-Language': 'ru-RU,ru;q=0.9'})).text == 'en:Refresh'
+
+
+@pytest.mark.asyncio
+async def test_session_is_written_only_on_change(lang_app: FastAPI):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=lang_app), base_url='http://test') as client:
+        assert 'set-cookie' in (await client.get('/ru/page')).headers
+        assert 'set-cookie' not in (await client.get('/ru/page')).headers
+        # Без языка в URL сессия не меняется, даже если заголовок просит другой язык
+        response = await client.get('/page', headers={'Accept-Language': 'en'})
+        assert (response.text, 'set-cookie' in response.headers) == ('ru:Обновить', False)
+        assert 'set-cookie' in (await client.get('/en/page')).headers
+
+
+@pytest.mark.asyncio
+async def test_skipped_paths_do_not_depend_on_language(lang_app: FastAPI):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=lang_app), base_url='http://test') as client:
+        await client.get('/ru/page')
+        response = await client.get('/assets/app.js', headers={'Accept-Language': 'ru'})
+    # Ни сессия, ни заголовок не влияют на ответ: он не зависит от cookie
+    assert (response.text, 'set-cookie' in response.headers) == ('en', False)
+    assert 'cookie' not in response.headers.get('vary', '').lower()
+
 # TODO later
 # @pytest.mark.parametrize(
 #     'link, expected', [
@@ -0,0 +1,81 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import pytest
+
+from youtrack.utils.limiter import Priority, PriorityLimiter
+
+
+async def hold(limiter: PriorityLimiter, priority: Priority, release: asyncio.Event, order: list[str], name: str) -> None:
+    async with limiter.slot(priority):
+        order.append(name)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_interactive_overtakes_queued_batch():
+    limiter = PriorityLimiter(max_concurrent=1, reserved_interactive=0)
+    release = asyncio.Event()
+    order: list[str] = []
+    tasks = [asyncio.create_task(hold(limiter, Priority.BATCH, release, order, f'batch-{i}')) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(hold(limiter, Priority.INTERACTIVE, release, order, 'interactive')))
+    await asyncio.sleep(0.01)
+    assert limiter.queued == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ['batch-0', 'interactive', 'batch-1', 'batch-2']
+    assert (limiter.active, limiter.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_reserved_slots_are_not_given_to_batch():
+    limiter = PriorityLimiter(max_concurrent=4, reserved_interactive=2)
+    release = asyncio.Event()
+    order: list[str] = []
+    batch = [asyncio.create_task(hold(limiter, Priority.BATCH, release, order, f'batch-{i}')) for i in range(5)]
+    await asyncio.sleep(0.01)
+    assert limiter.active_by(Priority.BATCH) == 2
+    assert limiter.queued == 3
+
+    # Интерактивный запрос не ждёт, хотя batch-запросы стоят в очереди
+    async with limiter.slot(Priority.INTERACTIVE):
+        assert limiter.active == 3
+    release.set()
+    await asyncio.gather(*batch)
+    assert (limiter.active, limiter.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    limiter = PriorityLimiter(max_concurrent=1, reserved_interactive=0)
+    release = asyncio.Event()
+    order: list[str] = []
+    first = asyncio.create_task(hold(limiter, Priority.BATCH, release, order, 'first'))
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(hold(limiter, Priority.INTERACTIVE, release, order, 'cancelled'))
+    last = asyncio.create_task(hold(limiter, Priority.BATCH, release, order, 'last'))
+    await asyncio.sleep(0.01)
+
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+    assert limiter.queued == 1
+    release.set()
+    await asyncio.gather(first, last)
+    assert order == ['first', 'last']
+    assert (limiter.active, limiter.queued) == (0, 0)
@@ -0,0 +1,108 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from youtrack.entities import CustomFields, IssueInfo, WorkItem
+from youtrack.parser import IssueParser
+from youtrack.utils.duration import Duration
+from youtrack.utils.issue_state import IssueState
+from youtrack.utils.parser_context import ParserContext
+
+from .corpus import CORPUS
+
+
+class EventRecorder:
+    """Записывает все события парсера в порядке их появления"""
+
+    def __init__(self):
+        self.events: list[list[str]] = []
+
+    @staticmethod
+    def __ctx(ctx: ParserContext) -> list[str]:
+        return [ctx.timestamp.format_iso8601(), ctx.assignee, str(ctx.state)]
+
+    def on_pause_added(self, item: WorkItem) -> None:
+        self.events.append(['pause', item.timestamp.format_iso8601(), item.name])
+
+    def on_tag_added(self, ctx: ParserContext, tag: str) -> None:
+        self.events.append(['tag', *self.__ctx(ctx), tag])
+
+    def on_work_added(self, ctx: ParserContext, item: WorkItem) -> None:
+        self.events.append(['work', *self.__ctx(ctx), item.name])
+
+    def on_scope_changed(self, ctx: ParserContext, before: Duration, after: Duration, author: str) -> None:
+        self.events.append(['scope', *self.__ctx(ctx), before.format_yt(), after.format_yt(), author])
+
+    def on_state_changed(self, ctx: ParserContext, state: IssueState) -> None:
+        self.events.append(['state', *self.__ctx(ctx), str(state)])
+
+
+def summarize(issue: IssueInfo, events: list[list[str]]) -> dict:
+    def work_items(items: list[WorkItem]) -> list[list[str]]:
+        return [[i.timestamp.format_iso8601(), i.name, i.duration.format_yt(), str(i.state)] for i in items]
+
+    return {
+        'assignees': [[i.timestamp.format_iso8601(), i.value] for i in issue.assignees],
+        'started': issue.started_datetime.format_iso8601() if issue.started_datetime else None,
+        'resolved': issue.resolve_datetime.format_iso8601() if issue.resolve_datetime else None,
+        'work_items': work_items(issue.work_items),
+        'pauses': work_items(issue.pauses),
+        'yt_errors': [i.kind.name for i in issue.yt_errors.get()],
+        'events': events
+    }
+
+
+def parse(entry: dict, pages: list[list[dict]], single_call: bool = False) -> dict:
+    recorder = EventRecorder()
+    parser = IssueParser(CustomFields.default_config())
+    parser.cb_pause_added += recorder.on_pause_added
+    parser.cb_tag_added += recorder.on_tag_added
+    parser.cb_work_added += recorder.on_work_added
+    parser.cb_scope_changed += recorder.on_scope_changed
+    parser.cb_state_changed += recorder.on_state_changed
+
+    parser.parse_custom_fields(entry['issue'])
+    if single_call:
+        parser.parse_activities(pages[0])
+    else:
+        for page in pages:
+            parser.parse_activities_page(page)
+    return summarize(parser.get_result(), recorder.events)
+
+
+def split(seq: list, n: int) -> list[list]:
+    return [seq[i:i + n] for i in range(0, len(seq), n)] or [[]]
+
+
+@pytest.mark.parametrize('name', CORPUS.keys())
+def test_single_pass_matches_recorded(name: str):
+    entry = CORPUS[name]
+    assert parse(entry, [entry['activities']], single_call=True) == entry['expected']
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 100])
+@pytest.mark.parametrize('name', CORPUS.keys())
+def test_page_by_page_matches_recorded(name: str, page_size: int):
+    entry = CORPUS[name]
+    assert parse(entry, split(entry['activities'], page_size)) == entry['expected']
+
+
+def test_empty_activities():
+    entry = next(iter(CORPUS.values()))
+    result = parse(entry, [[]], single_call=True)
+    assert len(result['assignees']) == 1
+    assert result['work_items'] == []
@@ -0,0 +1,129 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from pathlib import Path
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+import pytest
+
+from youtrack.utils.limiter import Priority
+from youtrack.utils.rate_limiter import SharedTokenBucket, get_shared_bucket_path
+
+
+RATE = 200
+BURST = 5
+
+
+def take_times(path: Path, count: int, queue) -> None:
+    """В отдельном процессе: когда (monotonic) удалось взять каждый из `count` токенов"""
+    bucket = SharedTokenBucket(path=path, rate=RATE, burst=BURST)
+    times = []
+    while len(times) < count:
+        if (delay := bucket.try_take()) > 0:
+            time.sleep(delay)
+        else:
+            times.append(time.monotonic())
+    bucket.close()
+    queue.put(times)
+
+
+def test_bucket_path_depends_on_key():
+    assert get_shared_bucket_path('host key-1') == get_shared_bucket_path('host key-1')
+    assert get_shared_bucket_path('host key-1') != get_shared_bucket_path('host key-2')
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_bucket_path_is_private():
+    path = get_shared_bucket_path('host key-1')
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+    assert path.parent.stat().st_uid == os.getuid()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='O_NOFOLLOW')
+def test_bucket_file_is_not_followed(tmp_path: Path):
+    (tmp_path / 'bucket').symlink_to(tmp_path / 'target')
+    with pytest.raises(OSError):
+        SharedTokenBucket(path=tmp_path / 'bucket', rate=RATE, burst=BURST)
+    assert not (tmp_path / 'target').exists()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_takes_no_token(tmp_path: Path):
+    bucket = SharedTokenBucket(path=tmp_path / 'bucket', rate=10, burst=1)
+    await bucket.acquire()
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    # Отменённое ожидание ничего не заняло: следующий токен появится в срок
+    assert bucket.try_take() <= 0.1
+    bucket.close()
+
+
+@pytest.mark.asyncio
+async def test_interactive_is_not_queued_behind_batch(tmp_path: Path):
+    rate = 20
+    bucket = SharedTokenBucket(path=tmp_path / 'bucket', rate=rate, burst=1)
+    await bucket.acquire()
+    batch = [asyncio.create_task(bucket.acquire(Priority.BATCH)) for _ in range(10)]
+    await asyncio.sleep(0.01)
+
+    begin = time.monotonic()
+    await bucket.acquire(Priority.INTERACTIVE)
+    # Лимит насыщен, но ждём только следующий токен, а не 10 batch-запросов перед нами (0.5 сек)
+    assert time.monotonic() - begin < 2.5 / rate
+    assert sum(i.done() for i in batch) <= 1
+    for i in batch:
+        i.cancel()
+    await asyncio.gather(*batch, return_exceptions=True)
+    bucket.close()
+
+
+@pytest.mark.asyncio
+async def test_burst_then_rate(tmp_path: Path):
+    bucket = SharedTokenBucket(path=tmp_path / 'bucket', rate=RATE, burst=BURST)
+    begin = time.monotonic()
+    for _ in range(BURST + 10):
+        await bucket.acquire()
+    elapsed = time.monotonic() - begin
+    bucket.close()
+    assert 10 / RATE * 0.9 <= elapsed < 10 / RATE + 0.1
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fcntl is required for sharing between processes')
+@pytest.mark.parametrize('processes', [1, 4])
+def test_rate_is_shared_between_processes(tmp_path: Path, processes: int):
+    requests = 100
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    workers = [context.Process(target=take_times, args=(tmp_path / 'bucket', requests // processes, queue)) for _ in range(processes)]
+    for i in workers:
+        i.start()
+    times = sorted(sum((queue.get(timeout=10) for _ in workers), []))
+    for i in workers:
+        i.join()
+
+    assert len(times) == requests
+    # Сколько бы ни было процессов, общая частота не выше RATE (плюс начальный запас BURST)
+    window = 0.1
+    for i, begin in enumerate(times):
+        in_window = sum(1 for t in times[i:] if t < begin + window)
+        assert in_window <= BURST + RATE * window + 1
+    assert times[-1] - times[0] >= (requests - BURST) / RATE * 0.95
@@ -0,0 +1,37 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from starlette.testclient import TestClient
+
+from app import main
+from youtrack.helper import YouTrackHelper
+
+
+def test_worker_uses_preloaded_settings(monkeypatch, make_settings):
+    settings = make_settings()
+    builds = []
+
+    async def get_instance_settings(helper):
+        raise AssertionError('Instance settings should be loaded once, before the workers start')
+
+    monkeypatch.setattr(YouTrackHelper, 'get_instance_settings', get_instance_settings)
+    monkeypatch.setattr(main, 'build_assets', builds.append)
+    monkeypatch.setattr(main.app.state, 'settings', settings, raising=False)
+
+    with TestClient(main.app) as client:
+        assert client.get('/metrics').status_code == 200
+        assert main.app.state.settings is settings
+    assert builds == [main.assets]  # статика в этом процессе ещё не собрана
@@ -0,0 +1,179 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from datetime import timezone, timedelta
+import asyncio
+import pytest
+import time
+
+from app import timeline
+from app.settings import Settings
+from app.utils.compute import ComputePool
+
+from .corpus import get_corpus_issues
+from .fake_youtrack import FakeYouTrack
+
+
+TZ = timezone(timedelta(hours=3))
+
+
+@pytest.fixture
+def settings(make_settings):
+    return make_settings()
+
+
+@pytest.fixture
+def fake_yt(fake_youtrack):
+    return fake_youtrack(*get_corpus_issues())
+
+
+@pytest.mark.parametrize('kind', ['inline', 'thread', 'process'])
+@pytest.mark.asyncio
+async def test_timeline_page_data(kind: str, settings: Settings, fake_yt: FakeYouTrack):
+    pool = ComputePool(kind=kind, max_workers=1)
+    try:
+        data = await timeline.get_timeline_page_data(lang='en', issue_id='id-2', tz=TZ, settings=settings, compute_pool=pool)
+    finally:
+        pool.shutdown()
+
+    assert data['id'] == 'id-2'
+    assert 'plotly' in data['graph_div']
+    assert len(data['tables']['detailed']) > 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_timelines_are_not_serialized(monkeypatch, settings: Settings, fake_yt: FakeYouTrack):
+    build_duration_sec = 0.3
+
+    def slow_build(**kwargs):
+        time.sleep(build_duration_sec)  # CPU-тяжёлая часть, блокирующая поток
+        return kwargs['issue_id']
+
+    monkeypatch.setattr(timeline, 'build_timeline_page_data', slow_build)
+
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    pool = ComputePool(kind='thread', max_workers=4)
+    beat = asyncio.create_task(heartbeat())
+    try:
+        begin = time.monotonic()
+        results = await asyncio.gather(*[
+            timeline.get_timeline_page_data(lang='en', issue_id=i, tz=TZ, settings=settings, compute_pool=pool)
+            for i in ('id-1', 'id-2', 'id-3')
+        ])
+        elapsed = time.monotonic() - begin
+    finally:
+        beat.cancel()
+        pool.shutdown()
+
+    assert results == ['id-1', 'id-2', 'id-3']
+    # Последовательно было бы 0.9 сек
+    assert elapsed < build_duration_sec * 2
+    # Event loop всё это время оставался свободен
+    assert ticks >= 10
+
+
+async def get_chunks(app, path: str, query: str) -> list[tuple[float, str]]:
+    """Запрос напрямую в ASGI-приложение: тело ответа по частям с временем получения каждой"""
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+             'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+             'headers': [(b'host', b'testserver')], 'client': ('127.0.0.1', 1), 'server': ('testserver', 80)}
+    chunks: list[tuple[float, str]] = []
+    begin = time.monotonic()
+
+    async def receive():
+        await asyncio.sleep(60)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.body' and message.get('body'):
+            chunks.append((time.monotonic() - begin, message['body'].decode()))
+
+    await app(scope, receive, send)
+    return chunks
+
+
+@pytest.fixture
+def web_app(settings: Settings):
+    from app import main
+    pool = ComputePool(kind='thread', max_workers=2)
+    main.app.state.settings = settings
+    main.app.state.compute_pool = pool
+    main.page_cache.clear()
+    yield main.app
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timeline_stream_sends_skeleton_before_data(web_app, fake_yt: FakeYouTrack):
+    fetch_delay_sec = 0.3
+    fake_yt.delays['id-2'] = fetch_delay_sec
+
+    chunks = await get_chunks(web_app, '/en/timeline', 'issue=id-2')
+    page = ''.join(i[1] for i in chunks)
+
+    skeleton_at = next(t for t, text in chunks if 'timeline-skeleton' in text)
+    tables_at = next(t for t, text in chunks if 'id="details-table"' in text)
+    assert skeleton_at < fetch_delay_sec <= tables_at
+    # Каркас -> таблицы -> график
+    assert page.index('timeline-skeleton') < page.index('id="details-table"') < page.index('graph-stream')
+    assert 'plotly' in page[page.index('graph-stream'):]
+    assert page.rstrip().endswith('</html>')
+
+
+@pytest.mark.asyncio
+async def test_timeline_stream_error(web_app, fake_yt: FakeYouTrack):
+    chunks = await get_chunks(web_app, '/en/timeline', 'issue=id-404')
+    page = ''.join(i[1] for i in chunks)
+
+    assert 'alert-danger' in page
+    assert 'id="details-table"' not in page
+    assert 'graph-stream' not in page
+    assert page.rstrip().endswith('</html>')
+
+
+@pytest.mark.asyncio
+async def test_timeline_page_is_cached_until_issue_changes(web_app, fake_yt: FakeYouTrack):
+    fake_yt.issues['id-2'] = fake_yt.issues['id-2'] | {'updated': 1}
+    first = ''.join(i[1] for i in await get_chunks(web_app, '/en/timeline', 'issue=id-2'))
+    assert 'graph-stream' in first
+
+    # Из кэша: только проверка времени изменения задачи
+    fake_yt.requests.clear()
+    assert ''.join(i[1] for i in await get_chunks(web_app, '/en/timeline', 'issue=id-2')) == first
+    assert [i.query['fields'] for i in fake_yt.requests] == ['updated']
+
+    fake_yt.issues['id-2'] = fake_yt.issues['id-2'] | {'updated': 2}
+    fake_yt.requests.clear()
+    await get_chunks(web_app, '/en/timeline', 'issue=id-2')
+    assert any(i.path.endswith('/activities') for i in fake_yt.requests)
+
+
+@pytest.mark.asyncio
+async def test_unfinished_issue_page_is_not_cached(web_app, fake_yt: FakeYouTrack):
+    fake_yt.issues['id-1'] = fake_yt.issues['id-1'] | {'updated': 1}
+    await get_chunks(web_app, '/en/timeline', 'issue=id-1')
+
+    # Длительности открытых интервалов растут со временем: страница строится заново
+    fake_yt.requests.clear()
+    await get_chunks(web_app, '/en/timeline', 'issue=id-1')
+    assert any(i.path.endswith('/activities') for i in fake_yt.requests)
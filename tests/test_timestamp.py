@@ -98,3 +98,7 @@ def test_sub():
     val1 = Timestamp.now()
     val2 = Timestamp(datetime.fromisoformat('2024-04-19T15:40:36.970+00:00'))
     assert val1 - val2
+
+
+def test_to_yt():
+    assert Timestamp.from_yt('1733769636970').to_yt() == 1733769636970
@@ -0,0 +1,68 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import logging
+import pytest
+from unittest.mock import Mock
+
+from app.timeline import parse_timeline_issue
+from youtrack.utils import anomalies
+from youtrack.utils.tracing import EventTracer, Lazy
+
+from .corpus import CORPUS
+
+
+@pytest.fixture
+def trace_logger():
+    logger = logging.getLogger('youtrack-analysis-test-tracing')
+    yield logger
+    logger.setLevel(logging.NOTSET)
+
+
+def test_disabled_tracer_never_evaluates_lazy(trace_logger: logging.Logger):
+    trace_logger.setLevel(logging.INFO)
+    expensive = Mock(return_value='1d')
+
+    tracer = EventTracer(trace_logger)
+    tracer('%s', Lazy(expensive))
+
+    assert tracer.enabled is False
+    expensive.assert_not_called()
+
+
+def test_enabled_tracer_formats_lazily(trace_logger: logging.Logger, caplog: pytest.LogCaptureFixture):
+    trace_logger.setLevel(logging.DEBUG)
+    expensive = Mock(return_value='1d')
+
+    tracer = EventTracer(trace_logger)
+    with caplog.at_level(logging.DEBUG, logger=trace_logger.name):
+        tracer('[Pause] %s by %s', Lazy(expensive), 'Alice')
+
+    assert tracer.enabled is True
+    assert caplog.messages == ['[Pause] 1d by Alice']
+    expensive.assert_called()
+
+
+@pytest.mark.parametrize('level, is_traced', [(logging.INFO, False), (logging.DEBUG, True)])
+def test_parsing_traces_anomalies_only_for_debug(make_settings, caplog: pytest.LogCaptureFixture, level: int, is_traced: bool):
+    issue = CORPUS['starts_on_hold']  # есть ревью с паузой
+    anomalies.anomaly_logger.setLevel(level)
+    try:
+        with caplog.at_level(level, logger=anomalies.anomaly_logger.name):
+            parse_timeline_issue(summary=issue['issue'], activities=issue['activities'], app_config=make_settings().app_config)
+    finally:
+        anomalies.anomaly_logger.setLevel(logging.NOTSET)
+    assert any('TooLongReview: WorkItem ADD' in i for i in caplog.messages) == is_traced
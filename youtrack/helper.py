@@ -16,6 +16,7 @@
 
 from asyncio import sleep, Semaphore
 from collections import defaultdict
+from contextlib import nullcontext
 from dataclasses import dataclass
 from itertools import chain
 from starlette import status
@@ -31,7 +32,10 @@ from .parser import IssueParser
 from .utils import yt_logger
 from .utils.anomalies import AnomaliesDetector
 from .utils.timestamp import Timestamp
+from .utils.circuit_breaker import CircuitBreakers, RetryBudget
 from .utils.exceptions import InvalidIssueIdError, TooMuchIssuesInBatchError, UnableToCountIssues
+from .utils.limiter import Priority, PriorityLimiter
+from .utils.rate_limiter import SharedTokenBucket
 from .utils.others import is_valid_issue_id, extract_issue_id_from_url
 from .utils.timeutils import is_next_day
 
@@ -44,9 +48,9 @@ def _is_retriable(exc: BaseException) -> bool:
         return True
 
     if isinstance(exc, aiohttp.ClientResponseError):
+        # Остальные коды (403, 404...) повтором не исправить
         code = exc.status
-        if code == status.HTTP_429_TOO_MANY_REQUESTS or 500 <= code < 600:
-            return True
+        return code == status.HTTP_429_TOO_MANY_REQUESTS or 500 <= code < 600
 
     if isinstance(exc, aiohttp.ClientError):
         # Любая сетевая ошибка aiohttp (соединение, DNS, reset и т.п.)
@@ -59,11 +63,27 @@ def _is_retriable(exc: BaseException) -> bool:
     return False
 
 
+def _is_upstream_failure(exc: BaseException) -> bool:
+    """
+    Отказ самого YouTrack (для размыкателя). 429 - не отказ: сервис работает, но просит реже.
+    """
+    if isinstance(exc, aiohttp.ClientResponseError) and exc.status == status.HTTP_429_TOO_MANY_REQUESTS:
+        return False
+    return _is_retriable(exc)
+
+
 class YouTrackHelper:
     BATCH_SIZE = 50
     MAX_ISSUE_COUNT = 500
     MAX_RECONNECTION_ATTEMPTS = 3
     CONNECTION_TIMEOUT_SEC = 10
+    # Общий для всех экземпляров: все запросы процесса к YouTrack, интерактивные - вне очереди
+    upstream_limiter = PriorityLimiter()
+    # Ограничение частоты запросов с API-ключом, общее для процессов на машине (None - без ограничения)
+    rate_limiter: SharedTokenBucket|None = None
+    # Во время отказа YouTrack запросы завершаются сразу, а повторы не умножают нагрузку
+    circuit_breakers = CircuitBreakers()
+    retry_budget = RetryBudget()
 
     def __init__(self, instance_url: str, api_key: str):
         self.__instance_url = instance_url
@@ -80,18 +100,38 @@ class YouTrackHelper:
     async def __fetch_json(self,
                            session: aiohttp.ClientSession,
                            url: URL,
-                           backoff_schedule: t.Sequence[float] = (0.5, 1.0, 2.0)) -> t.Any:
+                           backoff_schedule: t.Sequence[float] = (0.5, 1.0, 2.0),
+                           limiter: Semaphore|None = None,
+                           priority: Priority = Priority.INTERACTIVE) -> t.Any:
+        """
+        `limiter` (если есть) и слот `upstream_limiter` с приоритетом `priority` занимаются
+        на каждую попытку отдельно: пока ждём бэкофф, слоты достаются другим запросам.
+        Каждая попытка тратит токен `rate_limiter` (с тем же приоритетом, до занятия слотов),
+        повтор - ещё и из `retry_budget`.
+        При разомкнутом размыкателе эндпоинта - сразу `UpstreamUnavailableError`.
+        """
         assert len(backoff_schedule) == self.MAX_RECONNECTION_ATTEMPTS, 'backoff size must be equal to MAX_RECONNECTION_ATTEMPTS'
+
+        async def get() -> t.Any:
+            async with asyncio.timeout(self.CONNECTION_TIMEOUT_SEC):
+                async with session.get(url, headers=self.__get_header()) as response:
+                    response.raise_for_status()
+                    return await response.json()
+
+        breaker = self.circuit_breakers.get(url)
+        self.retry_budget.on_request()
         for attempt in range(1, self.MAX_RECONNECTION_ATTEMPTS + 1):
             try:
-                async with asyncio.timeout(self.CONNECTION_TIMEOUT_SEC):
-                    async with session.get(url, headers=self.__get_header()) as response:
-                        response.raise_for_status()
-                        return await response.json()
+                breaker.fail_fast()  # не ждём своей очереди, если ответ и так известен
+                # Токен - до слотов: ожидание токена не должно занимать слот, зарезервированный под свой приоритет
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire(priority)
+                async with limiter or nullcontext(), self.upstream_limiter.slot(priority):
+                    return await self.__call_upstream(url=url, request=get)
             except asyncio.CancelledError:
                 raise
             except Exception as e:
-                if not _is_retriable(e) or attempt == self.MAX_RECONNECTION_ATTEMPTS:
+                if not _is_retriable(e) or attempt == self.MAX_RECONNECTION_ATTEMPTS or not self.retry_budget.try_retry():
                     raise
                 # Экспоненциальный бэкофф с фулл-джиттером
                 base = backoff_schedule[attempt - 1]
@@ -103,6 +143,26 @@ class YouTrackHelper:
                     raise
         raise RuntimeError('Something went wrong while fetching data from backend')
 
+    async def __call_upstream(self, url: URL, request: t.Callable[[], t.Awaitable[t.Any]]) -> t.Any:
+        """
+        Одна попытка запроса через размыкатель эндпоинта `url`
+        """
+        breaker = self.circuit_breakers.get(url)
+        breaker.check()
+        try:
+            ret = await request()
+        except asyncio.CancelledError:
+            breaker.on_cancel()
+            raise
+        except Exception as e:
+            if _is_upstream_failure(e):
+                breaker.on_failure()
+            else:
+                breaker.on_success()
+            raise
+        breaker.on_success()
+        return ret
+
     async def __fetch_json_ex(self,
                               session: aiohttp.ClientSession,
                               fetch_sem: Semaphore,
@@ -112,11 +172,13 @@ class YouTrackHelper:
         Получает данные с ограничением на конкурентность (fetch_sem),
         повторами и таймаутом на каждую попытку.
         Fail-fast в случае фатальной ошибки, иначе пытается до `YouTrackHelper.MAX_RECONNECTION_ATTEMPTS` раз.
+        Каждый повтор заново встаёт в очередь `fetch_sem`. Это массовые выгрузки, поэтому приоритет - batch.
         """
-        async with fetch_sem:
-            return await self.__fetch_json(session=session,
-                                           url=url,
-                                           backoff_schedule=backoff_schedule)
+        return await self.__fetch_json(session=session,
+                                       url=url,
+                                       backoff_schedule=backoff_schedule,
+                                       limiter=fetch_sem,
+                                       priority=Priority.BATCH)
 
     def extract_issue_id(self, text: str) -> str | None:
         # Try as ID
@@ -125,10 +187,30 @@ class YouTrackHelper:
         # Try as URL
         return extract_issue_id_from_url(text, self.__instance_url)
 
-    async def get_summary(self, id: str, anomaly_detector: AnomaliesDetector, custom_fields: CustomFields) -> IssueInfo:
-        if (issue_id := self.extract_issue_id(id)) is None:
-            raise InvalidIssueIdError(id=id)
+    @staticmethod
+    def __get_issue_summary_fields() -> list[str]:
+        issue_summary_fields = [
+            'idReadable',
+            'summary',
+            'created',
+            'project(id,name,shortName)',
+            'reporter(fullName)',
+            'customFields(id,name,value(minutes,fullName,name))',
+            'tags(id,color(background,foreground),name)',
+            'comments(author(fullName),created,text)'
+        ]
+        issue_links_fields = [
+            'id',
+            'idReadable',
+            'direction',
+            'linkType(name,localizedName,sourceToTarget,targetToSource,directed,aggregation)',
+            f'issues({",".join(issue_summary_fields)})'
+        ]
+        issue_summary_fields.append(f'links({",".join(issue_links_fields)})')
+        issue_summary_fields.append('updated')  # только у самой задачи: для проверки актуальности страницы
+        return issue_summary_fields
 
+    def __get_summary_activities_url(self, issue_id: str) -> URL:
         activities_categories: list[str] = [
             'CommentsCategory',
             'CustomFieldCategory',
@@ -148,63 +230,130 @@ class YouTrackHelper:
             'authorGroup(id,name)',
             'field(presentation,name)'
         ]
-        issue_summary_fields = [
-            'idReadable',
-            'summary',
-            'created',
-            'project(id,name,shortName)',
-            'reporter(fullName)',
-            'customFields(id,name,value(minutes,fullName,name))',
-            'tags(id,color(background,foreground),name)',
-            'comments(author(fullName),created,text)'
-        ]
-        issue_links_fields = [
-            'id',
-            'idReadable',
-            'direction',
-            'linkType(name,localizedName,sourceToTarget,targetToSource,directed,aggregation)',
-            f'issues({",".join(issue_summary_fields)})'
-        ]
-        issue_summary_fields.append(f'links({",".join(issue_links_fields)})')
+        return URL.build(scheme='https',
+                         host=self.__instance_url,
+                         path=f'/youtrack/api/issues/{issue_id}/activities',
+                         query={'fields': ','.join(activities_fields),
+                                'categories': ','.join(activities_categories)})
+
+    @staticmethod
+    def parse_summary(summary: t.Any,
+                      activities: t.Any,
+                      anomaly_detector: AnomaliesDetector,
+                      custom_fields: CustomFields) -> IssueInfo:
+        """
+        Разбор ответов `get_raw_summary`. Не делает запросов, поэтому может
+        выполняться в отдельном потоке или процессе.
+        """
+        parser = IssueParser(custom_fields)
+        parser.cb_pause_added += anomaly_detector.on_pause_added
+        parser.cb_tag_added += anomaly_detector.on_tag_added
+        parser.cb_work_added += anomaly_detector.on_work_added
+        parser.cb_assignee_changed += anomaly_detector.on_assignee_changed
+        parser.cb_scope_changed += anomaly_detector.on_scope_changed
+        parser.cb_state_changed += anomaly_detector.on_state_changed
+        parser.cb_parsing_finished += anomaly_detector.on_parsing_finished
 
-        custom_fields_query = {
-            'fields': ",".join(issue_summary_fields)
-        }
-        activities_query = {
-            'fields': ','.join(activities_fields),
-            'categories': ','.join(activities_categories)
-        }
+        parser.parse_custom_fields(summary)
+        parser.parse_activities(activities)
+        return parser.get_result()
+
+    async def get_raw_summary(self, id: str) -> tuple[t.Any, t.Any]:
+        """
+        Сырые ответы YouTrack для `parse_summary`: (summary, активности)
+        """
+        if (issue_id := self.extract_issue_id(id)) is None:
+            raise InvalidIssueIdError(id=id)
 
-        issues_endpoint = '/youtrack/api/issues'
         urls = [
             # Custom fields
             URL.build(scheme='https',
                       host=self.__instance_url,
-                      path=f'{issues_endpoint}/{issue_id}',
-                      query=custom_fields_query),
+                      path=f'/youtrack/api/issues/{issue_id}',
+                      query={'fields': ','.join(self.__get_issue_summary_fields())}),
             # Activities
-            URL.build(scheme='https',
-                      host=self.__instance_url,
-                      path=f'{issues_endpoint}/{issue_id}/activities',
-                      query=activities_query)
+            self.__get_summary_activities_url(issue_id)
         ]
 
         async with aiohttp.ClientSession() as session:
             tasks = [self.__fetch_json(session, url) for url in urls]
-            results = await asyncio.gather(*tasks)
+            summary, activities = await asyncio.gather(*tasks)
+        return summary, activities
 
-        parser = IssueParser(custom_fields)
-        parser.cb_pause_added += anomaly_detector.on_pause_added
-        parser.cb_tag_added += anomaly_detector.on_tag_added
-        parser.cb_work_added += anomaly_detector.on_work_added
-        parser.cb_assignee_changed += anomaly_detector.on_assignee_changed
-        parser.cb_scope_changed += anomaly_detector.on_scope_changed
-        parser.cb_state_changed += anomaly_detector.on_state_changed
-        parser.cb_parsing_finished += anomaly_detector.on_parsing_finished
+    async def get_issue_updated(self, id: str) -> int|None:
+        """
+        Время последнего изменения задачи (мс) - дешёвый запрос, чтобы понять, устарели ли данные
+        """
+        if (issue_id := self.extract_issue_id(id)) is None:
+            raise InvalidIssueIdError(id=id)
+        url = URL.build(scheme='https',
+                        host=self.__instance_url,
+                        path=f'/youtrack/api/issues/{issue_id}',
+                        query={'fields': 'updated'})
+        async with aiohttp.ClientSession() as session:
+            return (await self.__fetch_json(session, url)).get('updated')
 
-        parser.parse_custom_fields(results[0])
-        parser.parse_activities(results[1])
-        return parser.get_result()
+    async def get_summary(self, id: str, anomaly_detector: AnomaliesDetector, custom_fields: CustomFields) -> IssueInfo:
+        summary, activities = await self.get_raw_summary(id)
+        return self.parse_summary(summary=summary,
+                                  activities=activities,
+                                  anomaly_detector=anomaly_detector,
+                                  custom_fields=custom_fields)
+
+    async def get_summaries(self,
+                            ids: t.Sequence[str],
+                            anomaly_detector_factory: t.Callable[[], AnomaliesDetector],
+                            custom_fields: CustomFields,
+                            concurrency: int = 10) -> t.AsyncIterator[tuple[IssueInfo, AnomaliesDetector]]:
+        """
+        Полная информация (как в `get_summary`) сразу по нескольким задачам.
+        Summary всех задач запрашиваются одним запросом, активности - параллельно
+        с ограничением `concurrency`. Результаты отдаются по мере готовности,
+        задачи, которых нет в ответе (удалены, нет прав), пропускаются.
+        """
+        issue_ids: list[str] = []
+        for i in ids:
+            if (issue_id := self.extract_issue_id(i)) is None:
+                raise InvalidIssueIdError(id=i)
+            if issue_id not in issue_ids:
+                issue_ids.append(issue_id)
+
+        if len(issue_ids) == 0:
+            return
+        if len(issue_ids) > self.MAX_ISSUE_COUNT:
+            raise TooMuchIssuesInBatchError(count=len(issue_ids))
+
+        summaries_url = URL.build(scheme='https',
+                                  host=self.__instance_url,
+                                  path='/youtrack/api/issues',
+                                  query={'query': f'issue id: {", ".join(issue_ids)}',
+                                         'fields': ','.join(self.__get_issue_summary_fields()),
+                                         '$top': len(issue_ids)})
+
+        async with aiohttp.ClientSession() as session:
+            summaries = await self.__fetch_json(session=session, url=summaries_url, priority=Priority.BATCH)
+            if len(summaries) != len(issue_ids):
+                yt_logger.warning(f'Requested {len(issue_ids)} issues, but got only {len(summaries)}')
+
+            sem = Semaphore(concurrency)
+
+            async def fetch(summary: t.Any) -> tuple[t.Any, t.Any]:
+                url = self.__get_summary_activities_url(summary['idReadable'])
+                return summary, await self.__fetch_json_ex(session=session, fetch_sem=sem, url=url)
+
+            tasks = [asyncio.create_task(fetch(summary)) for summary in summaries]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    summary, activities = await next_done
+                    anomaly_detector = anomaly_detector_factory()
+                    yield self.parse_summary(summary=summary,
+                                             activities=activities,
+                                             anomaly_detector=anomaly_detector,
+                                             custom_fields=custom_fields), anomaly_detector
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
     async def get_raw_issues_by_query(self,
                                       query: str,
@@ -232,7 +381,7 @@ class YouTrackHelper:
                                           '$skip': i,
                                           '$top': YouTrackHelper.BATCH_SIZE
                                       }))
-            tasks = [self.__fetch_json(session, url) for url in urls]
+            tasks = [self.__fetch_json(session, url, priority=Priority.BATCH) for url in urls]
             data = await asyncio.gather(*tasks)
             return list(chain.from_iterable(data))
 
@@ -242,20 +391,26 @@ class YouTrackHelper:
                         path='/youtrack/api/issuesGetter/count',
                         query={'fields': 'count'})
 
+        async def post() -> t.Any:
+            async with session.post(url, headers=self.__get_header(), json={'query': query}) as response:
+                response.raise_for_status()
+                return await response.json()
+
         # From docs:
         # If this number equals -1, it means that YouTrack hasn't finished counting the issues yet.
         # Wait for a bit and repeat the request.
         for i in range(self.MAX_RECONNECTION_ATTEMPTS):
-            async with session.post(url, headers=self.__get_header(), json={'query': query}) as response:
-                response.raise_for_status()
-                res: dict[str, t.Any] = await response.json()
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(Priority.BATCH)
+            async with self.upstream_limiter.slot(Priority.BATCH):
+                res: dict[str, t.Any] = await self.__call_upstream(url=url, request=post)
                 count = res.get('count', None)
 
-                if count is not None and count != -1:
-                    return count
+            if count is not None and count != -1:
+                return count
 
-                if i < (self.MAX_RECONNECTION_ATTEMPTS - 1):
-                    await sleep(0.2 * i)
+            if i < (self.MAX_RECONNECTION_ATTEMPTS - 1):
+                await sleep(0.2 * i)
         return None
 
     async def get_issue_activities(self,
@@ -263,12 +418,22 @@ class YouTrackHelper:
                                    sem: Semaphore,
                                    issue_id: str,
                                    fields: list[str],
-                                   categories: list[str]) -> t.Any:
+                                   categories: list[str],
+                                   start: Timestamp|None = None,
+                                   end: Timestamp|None = None) -> t.Any:
+        """
+        Активности задачи. `start`/`end` (включительно) отсекают лишнее на стороне YouTrack
+        """
+        query = {'fields': ','.join(fields),
+                 'categories': ','.join(categories)}
+        if start is not None:
+            query['start'] = start.to_yt()
+        if end is not None:
+            query['end'] = end.to_yt()
         url = URL.build(scheme='https',
                         host=self.__instance_url,
                         path=f'/youtrack/api/issues/{issue_id}/activities',
-                        query={'fields': ','.join(fields),
-                               'categories': ','.join(categories)})
+                        query=query)
         return await self.__fetch_json_ex(session=session, url=url, fetch_sem=sem)
 
     def get_issues_search_url(self, query: str) -> URL:
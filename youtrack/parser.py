@@ -28,6 +28,7 @@ from .entities import (
     CustomField
 )
 from .utils import yt_logger
+from .utils.tracing import EventTracer
 from .utils.duration import Duration
 from .utils.timestamp import Timestamp
 from .utils.others import is_empty
@@ -81,6 +82,8 @@ class IssueParser:
         # Settings
         self.__custom_fields: CustomFields = custom_fields
 
+        self.__trace = EventTracer(yt_logger)
+
         # Callbacks
         self.cb_pause_added = CallbackManager(PauseAddedCallback)
         self.cb_tag_added = CallbackManager(TagAddedCallback)
@@ -94,6 +97,9 @@ class IssueParser:
         self.__parser_previous_on_hold_begin: Timestamp | None = None
         self.__parser_current_state: IssueState | None = None
         self.__parser_process_links: bool = False
+        self.__parser_activities_started: bool = False
+        self.__parser_initial_values_known: bool = False
+        self.__parser_pending_activities: list = list()
 
         # Data
         self.__id: str | None = None
@@ -136,30 +142,30 @@ class IssueParser:
         finally:
             self.__parser_process_links = original_value
 
-    def __pre_parse_activities(self, json) -> None:
+    def __pre_parse_activity(self, entry) -> None:
         # Проблемы которые не удалось решить парсингом в один проход:
         # + Кому засчитывать время (паузы) если смен Assignee до этого не было
         # + Какой вид активности засчитывать если смен State до этого не было
         # Чтобы решить эти неоднозначности (без обратных проходов с исправлением уже готовых записей)
-        # собираем информацию до основного парсинга
-        assert self.__current_assignee is not None
-        assert self.__state is not None
-        assert self.__creation_datetime is not None, '__creation_datetime is empty'
+        # откладываем разбор записей, пока не найдём первые смены Assignee и State
+        if entry['$type'] != 'CustomFieldActivityItem':
+            return
 
-        for entry in json:
-            if entry['$type'] != 'CustomFieldActivityItem':
-                continue
+        target_member = entry['targetMember']
+        if is_empty(self.__assignees) and target_member == '__CUSTOM_FIELD__Assignee_3':
+            before: str = UNASSIGNED_NAME if is_empty(entry['removed']) else entry['removed'][0]['name']
+            self.__add_assignee(timestamp=self.__creation_datetime, name=before)
+        elif self.__parser_current_state is None and target_member == '__CUSTOM_FIELD__State_2':
+            before = IssueState.parse(entry['removed'][0]['name'])
+            self.__add_state(timestamp=self.__creation_datetime, state=before)
 
-            target_member = entry['targetMember']
-            if is_empty(self.__assignees) and target_member == '__CUSTOM_FIELD__Assignee_3':
-                before: str = UNASSIGNED_NAME if is_empty(entry['removed']) else entry['removed'][0]['name']
-                self.__add_assignee(timestamp=self.__creation_datetime, name=before)
-            elif self.__parser_current_state is None and target_member == '__CUSTOM_FIELD__State_2':
-                before = IssueState.parse(entry['removed'][0]['name'])
-                self.__add_state(timestamp=self.__creation_datetime, state=before)
+    def __is_initial_values_found(self) -> bool:
+        return not is_empty(self.__assignees) and self.__parser_current_state is not None
 
-            if not is_empty(self.__assignees) and self.__parser_current_state is not None:
-                break
+    def __complete_initial_values(self) -> None:
+        """Фиксирует начальные Assignee/State и разбирает отложенные записи"""
+        if self.__parser_initial_values_known:
+            return
 
         # HACK: Если смен Assignee не было, то берём текущего
         if is_empty(self.__assignees):
@@ -178,6 +184,11 @@ class IssueParser:
         if self.__parser_current_state.is_in_work():
             self.__add_started(timestamp=self.__creation_datetime)
 
+        self.__parser_initial_values_known = True
+        pending, self.__parser_pending_activities = self.__parser_pending_activities, list()
+        for entry in pending:
+            self.__parse_activity(entry)
+
     def __write_yt_error(self, kind: ProblemKind, msg='') -> None:
         if self.__parser_process_links and kind == ProblemKind.NullScope:
             return
@@ -279,9 +290,9 @@ class IssueParser:
                                 name=entry['author']['name'])
 
         elif entry_type == 'TagsActivityItem' and not is_empty(entry['added']):
-            ctx = ParserContext(timestamp=timestamp, assignee=self.__get_current_assignee(), state=self.__parser_current_state)
-            tag = entry['added'][0]['name']
-            self.cb_tag_added(ctx=ctx, tag=tag)
+            if self.cb_tag_added:
+                tag = entry['added'][0]['name']
+                self.cb_tag_added.emit(ctx=self.__get_context(timestamp), tag=tag)
 
         elif entry_type == 'WorkItemActivityItem':
             duration = Duration.from_minutes(int(entry['added'][0]['duration']['minutes']))
@@ -322,17 +333,42 @@ class IssueParser:
                                           f"Detected Scope change, but the value before is unknown (Empty->{after.format_yt()})")
                     return
 
-                self.cb_scope_changed(ctx=self.__get_context(timestamp),
-                                      before=Duration.from_minutes(entry['removed'] or 0),
-                                      after=after,
-                                      author=entry['author']['name'])
+                if self.cb_scope_changed:
+                    self.cb_scope_changed.emit(ctx=self.__get_context(timestamp),
+                                               before=Duration.from_minutes(entry['removed'] or 0),
+                                               after=after,
+                                               author=entry['author']['name'])
+
+    def parse_activities_page(self, json) -> None:
+        """Разбор очередной страницы активностей (в хронологическом порядке)
+
+        Записи до первых смен Assignee и State откладываются, т.к. до этого момента
+        неизвестны начальные значения. Остальные разбираются сразу, без повторного прохода.
+        """
+        assert self.__current_assignee is not None
+        assert self.__state is not None
+        assert self.__creation_datetime is not None, '__creation_datetime is empty'
+        self.__parser_activities_started = True
 
-    def parse_activities(self, json) -> None:
-        self.__pre_parse_activities(json)
         for entry in json:
-            self.__parse_activity(entry)
+            if self.__parser_initial_values_known:
+                self.__parse_activity(entry)
+                continue
+
+            self.__pre_parse_activity(entry)
+            self.__parser_pending_activities.append(entry)
+            if self.__is_initial_values_found():
+                self.__complete_initial_values()
+
+    def parse_activities(self, json) -> None:
+        self.parse_activities_page(json)
+        self.__complete_initial_values()
 
     def __finalize(self) -> None:
+        # Последняя страница могла не содержать смен Assignee/State
+        if self.__parser_activities_started:
+            self.__complete_initial_values()
+
         if self.__is_in_pause():
             self.__end_pause(timestamp=Timestamp.now())
 
@@ -360,7 +396,7 @@ class IssueParser:
             buffer_or_onhold = elem0.state.is_buffer() or elem0.state.is_hold()
             if buffer_or_onhold and elem0.duration == Duration.from_minutes(1):
                 elem0.state = self.__work_items[1].state
-                yt_logger.debug('Fixed 1m buffer')
+                self.__trace('Fixed 1m buffer')
 
         # !!! Эта операция всегда должна быть последней !!!
         # !!! Иначе сломаются фиксы выше                !!!
@@ -391,16 +427,16 @@ class IssueParser:
             component=self.__component,
             project=self.__project,
         )
-        self.cb_parsing_finished(issue=ret)
+        self.cb_parsing_finished.emit(issue=ret)
         return ret
 
     def __add_state(self, timestamp: Timestamp, state: IssueState) -> None:
         assert isinstance(timestamp, Timestamp)
         assert isinstance(state, IssueState)
         if self.__parser_current_state is None:
-            yt_logger.debug(f"{timestamp} [State] {state}")
+            self.__trace('%s [State] %s', timestamp, state)
         else:
-            yt_logger.debug(f"{timestamp} [State] {self.__parser_current_state} -> {state}")
+            self.__trace('%s [State] %s -> %s', timestamp, self.__parser_current_state, state)
         self.__parser_current_state = state
 
     def __switch_state(self, timestamp: Timestamp, before: IssueState, after: IssueState) -> None:
@@ -441,23 +477,24 @@ class IssueParser:
         if self.__resolve_datetime is not None and after.is_active():
             self.__resolve_datetime = None
         self.__add_state(timestamp=timestamp, state=after)
-        self.cb_state_changed(ctx=self.__get_context(timestamp), state=after)
+        if self.cb_state_changed:
+            self.cb_state_changed.emit(ctx=self.__get_context(timestamp), state=after)
 
     def __add_started(self, timestamp: Timestamp) -> None:
         assert not is_empty(self.__assignees)
         self.__started_datetime = timestamp
-        yt_logger.debug(f"{timestamp} [Started] by {self.__get_current_assignee()}")
+        self.__trace('%s [Started] by %s', timestamp, self.__get_current_assignee())
 
     def __add_created(self, timestamp: Timestamp, name: str) -> None:
         assert isinstance(timestamp, Timestamp)
         self.__author = name
         self.__creation_datetime = timestamp
-        yt_logger.debug(f"{timestamp} [Created] by {self.__author}")
+        self.__trace('%s [Created] by %s', timestamp, self.__author)
 
     def __add_resolved(self, timestamp: Timestamp, name: str) -> None:
         assert isinstance(timestamp, Timestamp)
         self.__resolve_datetime = timestamp
-        yt_logger.debug(f"{timestamp} [Resolved] by {name}")
+        self.__trace('%s [Resolved] by %s', timestamp, name)
 
     def __add_work_item(self, timestamp: Timestamp, name: str, duration: Duration, state: IssueState) -> None:
         assert isinstance(timestamp, Timestamp)
@@ -468,8 +505,9 @@ class IssueParser:
                         duration=duration,
                         state=state)
         self.__work_items.append(temp)
-        yt_logger.debug(f"{timestamp} [Time] {temp}")
-        self.cb_work_added(ctx=self.__get_context(timestamp), item=temp)
+        self.__trace('%s [Time] %s', timestamp, temp)
+        if self.cb_work_added:
+            self.cb_work_added.emit(ctx=self.__get_context(timestamp), item=temp)
 
     def __is_in_pause(self) -> bool:
         return self.__parser_previous_on_hold_begin is not None
@@ -494,15 +532,15 @@ class IssueParser:
                             duration=delta_with_previous,
                             state=IssueState(IssueState.Pre.OnHold))
             self.__pauses.append(temp)
-            yt_logger.debug(f"{self.__parser_previous_on_hold_begin} [Pause] {temp}")
-            self.cb_pause_added(item=temp)
+            self.__trace('%s [Pause] %s', self.__parser_previous_on_hold_begin, temp)
+            self.cb_pause_added.emit(item=temp)
         self.__parser_previous_on_hold_begin = None
 
     def __add_assignee(self, timestamp: Timestamp, name: str):
         if is_empty(self.__assignees):
-            yt_logger.debug(f"{timestamp} [Assignee] {name}")
+            self.__trace('%s [Assignee] %s', timestamp, name)
         else:
-            yt_logger.debug(f"{timestamp} [Assignee] {self.__get_current_assignee()} -> {name}")
+            self.__trace('%s [Assignee] %s -> %s', timestamp, self.__get_current_assignee(), name)
         self.__assignees.append(ValueChangeEvent(timestamp=timestamp,
                                                  value=name))
 
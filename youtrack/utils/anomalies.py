@@ -18,6 +18,7 @@ from dataclasses import dataclass
 from .timestamp import Timestamp
 from .duration import Duration
 from youtrack.utils.parser_context import ParserContext
+from youtrack.utils.tracing import EventTracer
 from youtrack.entities import IssueInfo, WorkItem, IssueState
 import logging
 from abc import ABC, abstractmethod
@@ -91,6 +92,7 @@ class AnomaliesDetector:
 
     def __init__(self, review_thresshold: Duration):
         self.__data: list[Anomaly] = list()
+        self.__trace = EventTracer(anomaly_logger)
 
         # Review anomaly
         self.__review_thresshold: Duration = review_thresshold
@@ -102,10 +104,13 @@ class AnomaliesDetector:
         return self.__data
 
     def on_pause_added(self, item: WorkItem) -> None:
-        anomaly_logger.debug("[Anomaly Detector] OnPause")
+        self.__trace("[Anomaly Detector] OnPause")
         if item.name == self.__review_current_user:
-            anomaly_logger.debug(f"[Anomaly Detector] TooLongReview: OnPause ADD {item.business_duration.format_yt()}")
-            self.__review_current_user_duration_with_hold += item.business_duration
+            # Длительность нужна в любом случае, Lazy ничего не сэкономит
+            business_duration = item.business_duration
+            if self.__trace.enabled:
+                self.__trace('[Anomaly Detector] TooLongReview: OnPause ADD %s', business_duration.format_yt())
+            self.__review_current_user_duration_with_hold += business_duration
 
     def on_tag_added(self, ctx: ParserContext, tag: str) -> None:
         if tag == 'Overdue':
@@ -130,15 +135,17 @@ class AnomaliesDetector:
         if item.state.is_review() and from_current_assignee:
             if self.__review_current_user is None:
                 # начинаем поиск слишком долгих ревью
-                anomaly_logger.debug(f"[Anomaly Detector] TooLongReview: Begin for '{item.name}'")
+                self.__trace("[Anomaly Detector] TooLongReview: Begin for '%s'", item.name)
                 self.__review_current_user = item.name
 
-            anomaly_logger.debug(f"[Anomaly Detector] TooLongReview: WorkItem ADD {item.business_duration.format_yt()}")
-            self.__review_current_user_duration += item.business_duration
+            business_duration = item.business_duration
+            if self.__trace.enabled:
+                self.__trace('[Anomaly Detector] TooLongReview: WorkItem ADD %s', business_duration.format_yt())
+            self.__review_current_user_duration += business_duration
             self.__review_current_user_duration_with_hold += item.duration
 
     def on_assignee_changed(self, ctx: ParserContext, assignee: str) -> None:
-        anomaly_logger.debug("[Anomaly Detector] OnAssigneeChanged")
+        self.__trace("[Anomaly Detector] OnAssigneeChanged")
         if self.__review_current_user is not None and self.__review_current_user != assignee:
             self.__check_too_long_review_anomaly(current_timestamp=ctx.timestamp)
 
@@ -150,13 +157,13 @@ class AnomaliesDetector:
                                                      after=after))
 
     def on_state_changed(self, ctx: ParserContext, state: IssueState) -> None:
-        anomaly_logger.debug("[Anomaly Detector] OnStateChanged")
+        self.__trace("[Anomaly Detector] OnStateChanged")
         if self.__review_current_user is not None:
             if not state.is_hold() and not state.is_review():
                 self.__check_too_long_review_anomaly(current_timestamp=ctx.timestamp)
 
     def on_parsing_finished(self, issue: IssueInfo) -> None:
-        anomaly_logger.debug("[Anomaly Detector] OnParsingFinished")
+        self.__trace("[Anomaly Detector] OnParsingFinished")
         latest_timestamp = issue.resolve_datetime or Timestamp.now()
 
         if issue.scope and issue.spent_time_yt and issue.spent_time_yt > issue.scope:
@@ -170,20 +177,20 @@ class AnomaliesDetector:
             self.__check_too_long_review_anomaly(latest_timestamp)
 
     def __check_too_long_review_anomaly(self, current_timestamp: Timestamp):
-        anomaly_logger.debug("[Anomaly Detector] TooLongReview: Check")
+        self.__trace("[Anomaly Detector] TooLongReview: Check")
         is_too_long = self.__review_current_user_duration > self.__review_thresshold
         is_too_long_with_hold = self.__review_current_user_duration_with_hold > self.__review_thresshold
         with_hold_is_longer = self.__review_current_user_duration_with_hold > self.__review_current_user_duration
 
         if is_too_long or is_too_long_with_hold:
-            anomaly_logger.debug("[Anomaly Detector] TooLongReview: Found")
+            self.__trace("[Anomaly Detector] TooLongReview: Found")
             actual_time = self.__review_current_user_duration_with_hold if with_hold_is_longer else self.__review_current_user_duration
             self.__data.append(TooLongReviewAnomaly(timestamp=current_timestamp,
                                                     responsible=self.__review_current_user,
                                                     fragmented=with_hold_is_longer,
                                                     expected_time=self.__review_thresshold,
                                                     actual_time=actual_time))
-        anomaly_logger.debug("[Anomaly Detector] TooLongReview: Reset")
+        self.__trace("[Anomaly Detector] TooLongReview: Reset")
         self.__review_current_user = None
         self.__review_current_user_duration = Duration()
         self.__review_current_user_duration_with_hold = Duration()
@@ -14,13 +14,17 @@
 # limitations under the License.
 
 
-from typing import TypeVar, Generic, List, Type, Any, Self
+from typing import TypeVar, Generic, List, Type, Any, Self, Callable
 import inspect
 
 
 P = TypeVar('P')
 
 
+def _no_callbacks(*args, **kwargs) -> None:
+    pass
+
+
 class CallbackManager(Generic[P]):
     """
     Менеджер callback-функций с типизацией и проверкой сигнатур
@@ -38,6 +42,7 @@ def handler1(x: int, y: int) -> None:
 callbacks = CallbackManager(ButtonClickHandler)
 callbacks += handler1
 callbacks(100, 200)  # Вызовет handler с проверкой типов аргументов
+callbacks.emit(100, 200)  # То же через заранее собранный диспетчер (для горячих мест)
     ```
     """
 
@@ -49,6 +54,7 @@ callbacks(100, 200)  # Вызовет handler с проверкой типов 
 
         self._protocol_type = protocol_type
         self._callbacks: List[P] = []
+        self.emit: Callable[..., None] = _no_callbacks
         self._expected_signature = inspect.signature(protocol_type.__call__)
 
     def append(self, callback: P) -> None:
@@ -61,13 +67,33 @@ callbacks(100, 200)  # Вызовет handler с проверкой типов 
             raise ValueError("Callback is already registered")
         self._validate_callback_signature(callback)
         self._callbacks.append(callback)
+        self._compile_dispatch()
         return self
 
     def __isub__(self, callback: P) -> Self:
         """Удаляет коллбек."""
         self._callbacks = [cb for cb in self._callbacks if cb is not callback]
+        self._compile_dispatch()
         return self
 
+    def _compile_dispatch(self) -> None:
+        """Собирает `emit` под текущий набор коллбеков.
+
+        Вызывается только при регистрации/удалении. Единственный коллбек
+        вызывается напрямую, без промежуточного кадра и упаковки аргументов.
+        """
+        callbacks = tuple(self._callbacks)
+        if len(callbacks) == 0:
+            self.emit = _no_callbacks
+        elif len(callbacks) == 1:
+            self.emit = callbacks[0]
+        else:
+            def fan_out(*args, **kwargs) -> None:
+                for callback in callbacks:
+                    # Исключения пробрасываются сразу
+                    callback(*args, **kwargs)
+            self.emit = fan_out
+
     def _validate_callback_signature(self, callback: Any) -> None:
         """Проверяет соответствие сигнатуры коллбека ожидаемой."""
         try:
@@ -133,6 +159,7 @@ callbacks(100, 200)  # Вызовет handler с проверкой типов 
     def clear(self) -> None:
         """Удаляет все коллбеки."""
         self._callbacks.clear()
+        self._compile_dispatch()
 
     def __len__(self) -> int:
         """Возвращает количество зарегистрированных коллбеков."""
@@ -0,0 +1,201 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from enum import IntEnum
+from typing import NoReturn, Protocol, runtime_checkable
+from yarl import URL
+import time
+
+from . import yt_logger
+from .callback_manager import CallbackManager
+from .exceptions import UpstreamUnavailableError
+
+
+class CircuitState(IntEnum):
+    CLOSED = 0  # запросы идут как обычно
+    HALF_OPEN = 1  # пробный запрос: успех закроет, неудача снова откроет
+    OPEN = 2  # запросы сразу завершаются ошибкой
+
+
+# Классы эндпоинтов YouTrack: отказ одного (например, тяжёлых активностей) не должен блокировать остальные
+ENDPOINT_CLASSES = ('issue', 'search', 'count', 'activities', 'admin')
+
+
+def get_endpoint_class(url: URL) -> str:
+    if url.path.endswith('/activities'):
+        return 'activities'
+    if url.path.endswith('/issuesGetter/count'):
+        return 'count'
+    if '/admin/' in url.path:
+        return 'admin'
+    if url.path.endswith('/issues') and 'query' in url.query:
+        return 'search'
+    return 'issue'
+
+
+@runtime_checkable
+class CircuitStateChangedCallback(Protocol):
+    def __call__(endpoint: str, state: CircuitState) -> None: ...
+
+
+@runtime_checkable
+class CircuitRejectedCallback(Protocol):
+    def __call__(endpoint: str) -> None: ...
+
+
+@runtime_checkable
+class RetryCallback(Protocol):
+    def __call__(allowed: bool) -> None: ...
+
+
+class CircuitBreaker:
+    """
+    Размыкатель для одного класса эндпоинтов.
+
+    После `failure_threshold` отказов подряд (таймауты, 5xx, сетевые ошибки) размыкается: запросы
+    сразу получают `UpstreamUnavailableError`, не тратя время на попытки и бэкоффы. Через `reset_timeout_sec`
+    пропускает один пробный запрос: успех замыкает цепь, отказ снова размыкает.
+    """
+
+    def __init__(self, endpoint: str, failure_threshold: int = 5, reset_timeout_sec: float = 15, registry: 'CircuitBreakers|None' = None):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_sec = reset_timeout_sec
+        self.__registry = registry
+        self.__state = CircuitState.CLOSED
+        self.__failures = 0
+        self.__opened_at = 0.0
+        self.__probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        return self.__state
+
+    @property
+    def retry_after(self) -> float:
+        return max(self.__opened_at + self.reset_timeout_sec - time.monotonic(), 0.0)
+
+    def check(self) -> None:
+        """
+        Непосредственно перед попыткой: `UpstreamUnavailableError`, если запрос делать не стоит.
+        Может занять пробный запрос, поэтому за вызовом обязан последовать `on_success`/`on_failure`/`on_cancel`.
+        """
+        if self.__state == CircuitState.OPEN and self.retry_after == 0:
+            self.__set_state(CircuitState.HALF_OPEN)
+        if self.__state == CircuitState.CLOSED:
+            return
+        if self.__state == CircuitState.HALF_OPEN and not self.__probe_in_flight:
+            self.__probe_in_flight = True
+            return
+        self.__reject()
+
+    def fail_fast(self) -> None:
+        """
+        Без изменения состояния: `UpstreamUnavailableError`, только пока цепь разомкнута и таймаут не истёк.
+        Для проверки до ожидания очереди; пробный запрос занимает только `check`.
+        """
+        if self.__state == CircuitState.OPEN and self.retry_after > 0:
+            self.__reject()
+
+    def __reject(self) -> NoReturn:
+        if self.__registry is not None:
+            self.__registry.cb_rejected.emit(self.endpoint)
+        raise UpstreamUnavailableError(endpoint=self.endpoint, retry_after=max(self.retry_after, 1.0))
+
+    def on_success(self) -> None:
+        """YouTrack ответил (в т.ч. ошибкой вроде 404: сам сервис работает)"""
+        self.__failures = 0
+        self.__probe_in_flight = False
+        if self.__state != CircuitState.CLOSED:
+            self.__set_state(CircuitState.CLOSED)
+
+    def on_failure(self) -> None:
+        self.__failures += 1
+        self.__probe_in_flight = False
+        if self.__state == CircuitState.HALF_OPEN or \
+                (self.__state == CircuitState.CLOSED and self.__failures >= self.failure_threshold):
+            self.__opened_at = time.monotonic()
+            self.__set_state(CircuitState.OPEN)
+
+    def on_cancel(self) -> None:
+        """Попытка отменена (например, клиент ушёл): ни успех, ни отказ, но пробный запрос можно повторить"""
+        self.__probe_in_flight = False
+
+    def __set_state(self, state: CircuitState) -> None:
+        log = yt_logger.warning if state == CircuitState.OPEN else yt_logger.info
+        log(f"Circuit breaker for '{self.endpoint}' requests: {self.__state.name} -> {state.name}")
+        self.__state = state
+        if self.__registry is not None:
+            self.__registry.cb_state_changed.emit(self.endpoint, state)
+
+
+class CircuitBreakers:
+    """Размыкатели по классам эндпоинтов (`get_endpoint_class`). Параметры можно менять на ходу"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_sec: float = 15):
+        self.cb_state_changed = CallbackManager(CircuitStateChangedCallback)
+        self.cb_rejected = CallbackManager(CircuitRejectedCallback)
+        self.__breakers = {i: CircuitBreaker(endpoint=i, registry=self) for i in ENDPOINT_CLASSES}
+        self.configure(failure_threshold=failure_threshold, reset_timeout_sec=reset_timeout_sec)
+
+    def configure(self, failure_threshold: int, reset_timeout_sec: float) -> None:
+        for i in self.__breakers.values():
+            i.failure_threshold = failure_threshold
+            i.reset_timeout_sec = reset_timeout_sec
+
+    def get(self, url: URL) -> CircuitBreaker:
+        return self.__breakers[get_endpoint_class(url)]
+
+    def states(self) -> dict[str, CircuitState]:
+        return {k: v.state for k, v in self.__breakers.items()}
+
+
+class RetryBudget:
+    """
+    Общий бюджет повторов: не больше `ratio` от числа запросов (каждый запрос добавляет `ratio` токена,
+    повтор тратит один), плюс `min_per_sec` в секунду, чтобы повторы были возможны и при малом трафике.
+    Во время отказа YouTrack повторы быстро исчерпывают бюджет и не умножают нагрузку.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_sec: float = 1.0, max_balance: float = 20):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.max_balance = max_balance
+        self.cb_retry = CallbackManager(RetryCallback)
+        self.__balance = max_balance
+        self.__updated_at = time.monotonic()
+
+    @property
+    def balance(self) -> float:
+        self.__refill()
+        return self.__balance
+
+    def on_request(self) -> None:
+        """Первая попытка запроса"""
+        self.__balance = min(self.__balance + self.ratio, self.max_balance)
+
+    def try_retry(self) -> bool:
+        self.__refill()
+        allowed = self.__balance >= 1
+        if allowed:
+            self.__balance -= 1
+        self.cb_retry.emit(allowed)
+        return allowed
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.__balance = min(self.__balance + (now - self.__updated_at) * self.min_per_sec, self.max_balance)
+        self.__updated_at = now
@@ -33,3 +33,10 @@ class TooMuchIssuesInBatchError(RuntimeError):
 class UnableToCountIssues(RuntimeError):
     def __init__(self, *args):
         super().__init__(*args)
+
+
+class UpstreamUnavailableError(RuntimeError):
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"YouTrack is unavailable ('{endpoint}' requests are failing), retry after {retry_after:.0f} sec")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
@@ -0,0 +1,104 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from itertools import count
+import asyncio
+import heapq
+import typing as t
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # страница, которую пользователь ждёт прямо сейчас (timeline)
+    BATCH = 1  # массовая выгрузка (batch-отчёты, предрасчёт)
+
+
+class PriorityLimiter:
+    """
+    Ограничение числа одновременных запросов процесса к YouTrack с приоритетами.
+
+    Освободившийся слот достаётся ожидающему с наивысшим приоритетом (при равном - первому пришедшему),
+    т.е. интерактивные запросы обгоняют очередь batch-запросов. Кроме того, `reserved_interactive` слотов
+    batch-запросам недоступны: даже когда batch-отчёт занял всё, что мог, интерактивный запрос не ждёт.
+    Параметры можно менять на ходу.
+    """
+
+    def __init__(self, max_concurrent: int = 16, reserved_interactive: int = 4):
+        self.max_concurrent = max_concurrent
+        self.reserved_interactive = reserved_interactive
+        self.__active: dict[Priority, int] = {i: 0 for i in Priority}
+        self.__queued: dict[Priority, int] = {i: 0 for i in Priority}
+        self.__waiters: list[tuple[Priority, int, asyncio.Future]] = []  # куча: приоритет, порядок прихода
+        self.__order = count()
+
+    @property
+    def active(self) -> int:
+        return sum(self.__active.values())
+
+    def active_by(self, priority: Priority) -> int:
+        return self.__active[priority]
+
+    @property
+    def queued(self) -> int:
+        return sum(self.__queued.values())
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> t.AsyncIterator[None]:
+        await self.__acquire(priority)
+        try:
+            yield
+        finally:
+            self.__active[priority] -= 1
+            self.__wake()
+
+    def __can_run(self, priority: Priority) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        return priority == Priority.INTERACTIVE or \
+            self.__active[Priority.BATCH] < max(self.max_concurrent - self.reserved_interactive, 1)
+
+    async def __acquire(self, priority: Priority) -> None:
+        if self.__can_run(priority) and not any(self.__queued[i] for i in Priority if i <= priority):
+            self.__active[priority] += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.__waiters, (priority, next(self.__order), waiter))
+        self.__queued[priority] += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Слот уже выдан - отдаём следующему
+                self.__active[priority] -= 1
+                self.__wake()
+            else:
+                waiter.cancel()  # из кучи удалится при следующем `__wake`
+                self.__queued[priority] -= 1
+            raise
+
+    def __wake(self) -> None:
+        while self.__waiters:
+            priority, _, waiter = self.__waiters[0]
+            if waiter.done():
+                heapq.heappop(self.__waiters)  # отменённый
+                continue
+            if not self.__can_run(priority):
+                break
+            heapq.heappop(self.__waiters)
+            self.__queued[priority] -= 1
+            self.__active[priority] += 1
+            waiter.set_result(None)
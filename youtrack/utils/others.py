@@ -14,7 +14,12 @@
 # limitations under the License.
 
 
+from pathlib import Path
+import getpass
+import os
 import re
+import stat
+import tempfile
 from urllib.parse import urlparse, parse_qs
 
 
@@ -100,3 +105,21 @@ def issue_id_to_key(id: str) -> tuple[str, int]:
 def is_valid_iso8601_date(value: str) -> bool:
     pattern = r'\d{4}-[01]\d-[0-3]\d' # check only format
     return re.fullmatch(pattern, value) is not None
+
+
+def get_private_runtime_dir() -> Path:
+    """
+    Каталог для файлов, общих для процессов приложения на машине. Лежит во временном каталоге,
+    но доступен только владельцу (0700): иначе любой локальный пользователь мог бы создать файл первым.
+    """
+    owner = os.getuid() if hasattr(os, 'getuid') else getpass.getuser()
+    path = Path(tempfile.gettempdir()) / f'youtrack-analysis-{owner}'
+    try:
+        path.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    info = path.lstat()
+    if not stat.S_ISDIR(info.st_mode) or \
+            (hasattr(os, 'getuid') and (info.st_uid != os.getuid() or info.st_mode & 0o077)):
+        raise PermissionError(f'{path} is not a private directory of the current user')
+    return path
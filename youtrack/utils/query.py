@@ -28,7 +28,7 @@ class SearchQueryBuilder:
     only_resolved: bool = False
     sort_by: str|None = None
 
-    def Build(self) -> str:
+    def Build(self, with_sort: bool = True) -> str:
         ret = ''
 
         def append(text: str):
@@ -48,9 +48,20 @@ class SearchQueryBuilder:
             append('#Resolved')
         if self.only_started:
             append('Spent time: 1m .. *')
-        append(f'sort by: {self.sort_by if self.sort_by else "updated"}')
+        if with_sort:
+            append(f'sort by: {self.sort_by if self.sort_by else "updated"}')
         return ret
 
+    @staticmethod
+    def BuildAny(builders: list['SearchQueryBuilder']) -> str:
+        """Задачи, подходящие под любой из запросов (например, по нескольким проектам). Сортировка — от первого"""
+        assert len(builders), 'At least one query required'
+        if len(builders) == 1:
+            return builders[0].Build()
+        sort_by = builders[0].sort_by
+        conditions = ' or '.join(f'({i.Build(with_sort=False)})' for i in builders)
+        return f'{conditions} sort by: {sort_by if sort_by else "updated"}'
+
     @staticmethod
     def __escape_component_name(component: str) -> str:
         if component.find(' ') != -1:
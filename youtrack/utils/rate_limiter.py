@@ -0,0 +1,118 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from contextlib import contextmanager
+from itertools import count
+from pathlib import Path
+import asyncio
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from . import yt_logger
+from .limiter import Priority
+from .others import get_private_runtime_dir
+
+
+# Состояние корзины: токены, время последнего пополнения (monotonic)
+_STATE = struct.Struct('dd')
+
+
+def get_shared_bucket_path(key: str) -> Path:
+    """Файл корзины для ключа (например, хост + API-ключ): один и тот же у всех процессов пользователя на машине"""
+    return get_private_runtime_dir() / f'rate-{hashlib.sha256(key.encode()).hexdigest()[:16]}'
+
+
+class SharedTokenBucket:
+    """
+    Token bucket, общий для всех процессов на машине (например, воркеров uvicorn).
+
+    Состояние лежит в файле (`mmap`), изменяется под `flock`, поэтому суммарная частота запросов
+    всех процессов с одним файлом не превышает `rate` в секунду (с начальным запасом `burst`).
+    Токен берётся, только когда он есть: заранее их никто не занимает, поэтому очередь batch-запросов
+    не отодвигает интерактивные. Внутри процесса токен достаётся ожидающему с наивысшим приоритетом
+    (при равном - первому пришедшему), между процессами - тому, кто первым обратится.
+    CLOCK_MONOTONIC общий для всех процессов (Linux), поэтому время пополнения сравнимо между ними.
+
+    Каждый процесс открывает файл сам (после fork): блокировка `flock` общая у унаследованных дескрипторов.
+    Без `fcntl` (Windows) корзина работает только в пределах процесса.
+    """
+
+    def __init__(self, path: Path, rate: float, burst: int = 10):
+        assert rate > 0 and burst >= 1
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.__thread_lock = threading.Lock()  # flock не различает потоки одного процесса
+        self.__waiters: list[tuple[Priority, int]] = []  # куча: приоритет, порядок прихода
+        self.__order = count()
+        # Не идём по символической ссылке: файл мог подложить кто-то другой
+        self.__fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+        with self.__locked():
+            if os.fstat(self.__fd).st_size < _STATE.size:
+                os.ftruncate(self.__fd, _STATE.size)
+                os.pwrite(self.__fd, _STATE.pack(float(burst), time.monotonic()), 0)
+        self.__state = mmap.mmap(self.__fd, _STATE.size)
+        if fcntl is None:
+            yt_logger.warning('fcntl is not available, the rate limit is applied to each process separately')
+
+    def close(self) -> None:
+        self.__state.close()
+        os.close(self.__fd)
+
+    def try_take(self) -> float:
+        """Взять токен, если он есть (0), иначе - через сколько секунд он появится"""
+        with self.__locked():
+            tokens, updated_at = _STATE.unpack_from(self.__state)
+            now = time.monotonic()
+            tokens = min(float(self.burst), tokens + max(now - updated_at, 0.0) * self.rate)
+            taken = tokens >= 1
+            _STATE.pack_into(self.__state, 0, tokens - 1 if taken else tokens, now)
+        return 0.0 if taken else (1 - tokens) / self.rate
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        waiter = (priority, next(self.__order))
+        heapq.heappush(self.__waiters, waiter)
+        try:
+            while True:
+                # Токен пробует взять только первый в очереди процесса, остальные ждут своей очереди
+                delay = self.try_take() if self.__waiters[0] == waiter else 1 / self.rate
+                if delay == 0:
+                    return
+                await asyncio.sleep(delay)
+        finally:
+            self.__waiters.remove(waiter)
+            heapq.heapify(self.__waiters)
+
+    @contextmanager
+    def __locked(self):
+        with self.__thread_lock:
+            if fcntl is not None:
+                fcntl.flock(self.__fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self.__fd, fcntl.LOCK_UN)
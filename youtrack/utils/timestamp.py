@@ -69,6 +69,10 @@ class Timestamp:
         assert isinstance(timestamp_msec, (int, str))
         return Timestamp(datetime.fromtimestamp(float(timestamp_msec) / 1000, tz=timezone.utc))
 
+    def to_yt(self) -> int:
+        """Миллисекунды, как в API YouTrack"""
+        return (self.__internal - datetime.fromtimestamp(0, tz=timezone.utc)) // timedelta(milliseconds=1)
+
     @staticmethod
     def now() -> 'Timestamp':
         return Timestamp(datetime.now(tz=timezone.utc))
@@ -14,7 +14,6 @@
 # limitations under the License.
 
 
-import pandas as pd
 import datetime as dt
 
 
@@ -29,11 +28,12 @@ class UTC_BUSINESS_DAY_CONSTANTS:
     HOUR_END = 15
 
 
-def is_working_hour(dt: pd.Timestamp) -> bool:
+def is_working_hour(moment: dt.datetime) -> bool:
     """Функция проверки что timestamp входит в рабочее время"""
-    if dt.weekday() >= 5:  # Суббота и Воскресенье
+    if moment.weekday() >= 5:  # Суббота и Воскресенье
         return False
-    return (dt.hour >= UTC_BUSINESS_DAY_CONSTANTS.HOUR_BEGIN and dt.hour < UTC_BUSINESS_DAY_CONSTANTS.HOUR_LUNCH_BEGIN) or (dt.hour >= UTC_BUSINESS_DAY_CONSTANTS.HOUR_LUNCH_END and dt.hour < UTC_BUSINESS_DAY_CONSTANTS.HOUR_END)
+    return (UTC_BUSINESS_DAY_CONSTANTS.HOUR_BEGIN <= moment.hour < UTC_BUSINESS_DAY_CONSTANTS.HOUR_LUNCH_BEGIN) or \
+        (UTC_BUSINESS_DAY_CONSTANTS.HOUR_LUNCH_END <= moment.hour < UTC_BUSINESS_DAY_CONSTANTS.HOUR_END)
 
 
 def count_working_minutes(begin: dt.datetime, end: dt.datetime) -> int:
@@ -42,11 +42,12 @@ def count_working_minutes(begin: dt.datetime, end: dt.datetime) -> int:
     if begin == end:
         return 0
 
-    time_index: pd.Timestamp = pd.date_range(start=pd.to_datetime(begin),
-                                             end=pd.to_datetime(end),
-                                             freq='min',
-                                             inclusive='left')
-    return sum([is_working_hour(dt) for dt in time_index])
+    import pandas as pd  # тяжёлый импорт - только при первом подсчёте
+    time_index: pd.DatetimeIndex = pd.date_range(start=pd.to_datetime(begin),
+                                                 end=pd.to_datetime(end),
+                                                 freq='min',
+                                                 inclusive='left')
+    return sum([is_working_hour(i) for i in time_index])
 
 
 def is_next_day(current: dt.date, next: dt.date):
@@ -0,0 +1,60 @@
+# Copyright 2025 Mikhail Gelvikh
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import Any, Callable
+import logging
+
+
+class Lazy:
+    """Значение, которое вычисляется только при форматировании сообщения
+
+    Нужно для дорогих свойств (например, `WorkItem.business_duration`),
+    которые не должны вычисляться ради отладочного вывода.
+    """
+    __slots__ = ('__func',)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.__func = func
+
+    def __str__(self) -> str:
+        return str(self.__func())
+
+
+class EventTracer:
+    """Трассировка событий парсера, которая ничего не стоит при выключенном DEBUG
+
+    Уровень логгера проверяется один раз при создании (парсер живёт один запрос),
+    сообщение форматируется самим логгером только если запись будет выведена.
+    Аргументы, которые приходится создавать ради трассировки (`Lazy`, строки), - только под `if tracer.enabled`.
+
+    Пример использования:
+
+    ```
+tracer = EventTracer(yt_logger)
+tracer('%s [State] %s', timestamp, state)
+if tracer.enabled:
+    tracer('%s [Pause] %s', timestamp, Lazy(lambda: item.business_duration.format_yt()))
+    ```
+    """
+    __slots__ = ('__logger', 'enabled')
+
+    def __init__(self, logger: logging.Logger):
+        self.__logger = logger
+        self.enabled: bool = logger.isEnabledFor(logging.DEBUG)
+
+    def __call__(self, msg: str, *args: Any) -> None:
+        if self.enabled:
+            self.__logger.debug(msg, *args)